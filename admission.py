@@ -0,0 +1,383 @@
+"""
+Admission control for model generations.
+
+At most `max_concurrent` generations run at once; further requests wait in a bounded queue ordered by
+priority class (interactive chat before one-shot pages before batch analyses) and arrival. Each session's
+requests are also rate limited per priority class with a token bucket. When a request could not be served in
+time (the queue is full, or the estimated wait exceeds the queue timeout) it is rejected at once with
+`Overloaded` rather than left to time out.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from config import admission_settings
+
+# Number of per-session rate limit buckets kept before idle ones are dropped.
+MAX_BUCKETS = 10000
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is rejected by admission control.
+
+    Attributes:
+        reason (str): Why the request was rejected ("rate_limited", "queue_full", "wait_too_long", "shed" or
+            "timeout").
+        retry_after (float): Suggested number of seconds before trying again.
+    """
+
+    def __init__(self, reason, retry_after):
+        """
+        Initializes the error.
+
+        Parameters:
+            reason (str): Why the request was rejected.
+            retry_after (float): Suggested number of seconds before trying again.
+        """
+        self.reason = reason
+        self.retry_after = retry_after
+        seconds = math.ceil(retry_after)
+        super().__init__(
+            f"The career coach is busy right now ({reason.replace('_', ' ')}); "
+            f"please try again in {seconds} second{'' if seconds == 1 else 's'}."
+        )
+
+
+class TokenBucket:
+    """
+    A token bucket: `burst` requests at once, refilled at `per_minute` requests per minute.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens.
+        tokens (float): Tokens currently available.
+    """
+
+    def __init__(self, per_minute, burst):
+        """
+        Initializes a full bucket.
+
+        Parameters:
+            per_minute (float): Refill rate in requests per minute.
+            burst (int): Bucket capacity.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """
+        Takes one token if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class Ticket:
+    """
+    A request's place in the admission queue.
+
+    Attributes:
+        priority (str): The priority class.
+        session_id (str): The session that sent the request, if any.
+        admitted (bool): Whether the request may run.
+        rejection (Overloaded): Why the request was removed from the queue, if it was shed.
+        enqueued (float): When the request arrived (time.monotonic()).
+    """
+
+    def __init__(self, controller, priority, rank, sequence, session_id):
+        self.controller = controller
+        self.priority = priority
+        self.rank = rank
+        self.sequence = sequence
+        self.session_id = session_id
+        self.admitted = False
+        self.rejection = None
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.rank, self.sequence) < (other.rank, other.sequence)
+
+    @property
+    def position(self):
+        """
+        Returns the request's position in the queue.
+
+        Returns:
+            int: 1 for the next request to run, or None once admitted or rejected.
+        """
+        return self.controller.position(self)
+
+    def withdraw(self):
+        """
+        Takes the request out of the queue (e.g., its job was cancelled); the waiting caller gets Overloaded.
+        """
+        self.controller.withdraw(self)
+
+
+class AdmissionController:
+    """
+    Limits concurrent generations and queues, rate limits and sheds the rest.
+
+    Attributes:
+        max_concurrent (int): Maximum number of generations running at once.
+        max_queue (int): Maximum number of waiting requests.
+        queue_timeout (float): Longest a request may wait before it is rejected.
+        priorities (dict): Maps each priority class to its rank (lower runs first).
+        rate_limits (dict): Maps priority classes to {"per_minute", "burst"} per session; classes not listed
+            are not rate limited.
+        running (int): Generations currently running.
+        admitted (int): Requests admitted.
+        rejected (dict): Rejected request counts by reason.
+        average_seconds (float): Moving average of how long a generation holds its slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=2,
+        max_queue=24,
+        queue_timeout=60,
+        priorities=None,
+        rate_limits=None,
+    ):
+        """
+        Initializes the controller.
+
+        Parameters:
+            max_concurrent (int): Maximum number of generations running at once (default is 2).
+            max_queue (int): Maximum number of waiting requests (default is 24).
+            queue_timeout (float): Longest a request may wait, in seconds (default is 60).
+            priorities (dict, optional): Maps priority classes to ranks (default is interactive, standard, batch).
+            rate_limits (dict, optional): Per-session token bucket settings by priority class.
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.priorities = priorities or {"interactive": 0, "standard": 1, "batch": 2}
+        self.rate_limits = rate_limits or {}
+        self.running = 0
+        self.admitted = 0
+        self.rejected = {}
+        self.average_seconds = None
+        self._queue = []
+        self._buckets = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, priority="standard", session_id=None, on_queued=None):
+        """
+        Holds a generation slot for the enclosed block, waiting in the queue if none is free.
+
+        Parameters:
+            priority (str): The priority class of the request (default is "standard").
+            session_id (str, optional): The session sending the request, for rate limiting.
+            on_queued (callable, optional): Called with the Ticket when the request has to wait, so its queue
+                position can be shown.
+
+        Yields:
+            Ticket: The admitted request.
+
+        Raises:
+            Overloaded: If the request is rate limited, the queue is full, the estimated wait is too long, a
+                higher-priority request took its place or it waited longer than the queue timeout.
+        """
+        ticket = self.acquire(priority, session_id, on_queued)
+        start = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            self.release(time.monotonic() - start)
+
+    def acquire(self, priority="standard", session_id=None, on_queued=None):
+        """
+        Admits a request, waiting in the queue if no slot is free; call `release` when it finishes.
+
+        Parameters:
+            priority (str): The priority class of the request (default is "standard").
+            session_id (str, optional): The session sending the request, for rate limiting.
+            on_queued (callable, optional): Called with the Ticket when the request has to wait.
+
+        Returns:
+            Ticket: The admitted request.
+
+        Raises:
+            Overloaded: See `slot`.
+        """
+        rank = self.priorities[priority]
+        with self._condition:
+            self._check_rate(priority, session_id)
+            ticket = Ticket(self, priority, rank, next(self._sequence), session_id)
+            if self.running < self.max_concurrent and not self._queue:
+                return self._admit(ticket)
+            self._enqueue(ticket)
+        if on_queued is not None:
+            on_queued(ticket)
+        deadline = ticket.enqueued + self.queue_timeout
+        with self._condition:
+            while not ticket.admitted and ticket.rejection is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    raise self._reject("timeout", self._estimated_wait(len(self._queue)))
+                self._condition.wait(remaining)
+            if ticket.rejection is not None:
+                raise ticket.rejection
+            return ticket
+
+    def release(self, seconds=None):
+        """
+        Frees the slot of a finished request and admits the next waiting ones.
+
+        Parameters:
+            seconds (float, optional): How long the request held its slot, for the wait estimate.
+        """
+        with self._condition:
+            self.running -= 1
+            if seconds is not None:
+                self.average_seconds = (
+                    seconds
+                    if self.average_seconds is None
+                    else 0.8 * self.average_seconds + 0.2 * seconds
+                )
+            while self._queue and self.running < self.max_concurrent:
+                self._admit(heapq.heappop(self._queue))
+            self._condition.notify_all()
+
+    def position(self, ticket):
+        """
+        Returns a waiting request's position in the queue.
+
+        Parameters:
+            ticket (Ticket): The request.
+
+        Returns:
+            int: 1 for the next request to run, or None if the request is not waiting.
+        """
+        with self._condition:
+            if ticket.admitted or ticket.rejection is not None:
+                return None
+            return 1 + sum(1 for other in self._queue if other < ticket)
+
+    def withdraw(self, ticket):
+        """
+        Removes a waiting request from the queue; its caller is woken with an Overloaded("cancelled") error.
+
+        Parameters:
+            ticket (Ticket): The request.
+        """
+        with self._condition:
+            if ticket.admitted or ticket.rejection is not None:
+                return
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            ticket.rejection = Overloaded("cancelled", 0)
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Returns the admission counters.
+
+        Returns:
+            dict: Running and waiting requests, admissions, rejections by reason and the average slot time.
+        """
+        with self._condition:
+            return {
+                "running": self.running,
+                "waiting": len(self._queue),
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "average_seconds": self.average_seconds,
+            }
+
+    def _check_rate(self, priority, session_id):
+        limit = self.rate_limits.get(priority)
+        if limit is None or session_id is None:
+            return
+        if len(self._buckets) > MAX_BUCKETS:
+            # Forget sessions whose bucket has refilled; a new bucket starts full anyway
+            now = time.monotonic()
+            self._buckets = {
+                key: b
+                for key, b in self._buckets.items()
+                if b.tokens + (now - b.updated) * b.rate < b.capacity
+            }
+        bucket = self._buckets.get((session_id, priority))
+        if bucket is None:
+            bucket = self._buckets[(session_id, priority)] = TokenBucket(
+                limit["per_minute"], limit["burst"]
+            )
+        retry_after = bucket.take()
+        if retry_after:
+            raise self._reject("rate_limited", retry_after)
+
+    def _enqueue(self, ticket):
+        # Rejects the request up front if it could not be served within the queue timeout
+        ahead = 1 + sum(1 for other in self._queue if other < ticket)
+        wait = self._estimated_wait(ahead)
+        if wait > self.queue_timeout:
+            raise self._reject("wait_too_long", wait)
+        if len(self._queue) >= self.max_queue:
+            lowest = max(self._queue, key=lambda t: (t.rank, t.sequence))
+            if not ticket < lowest:
+                raise self._reject("queue_full", self._estimated_wait(len(self._queue)))
+            # Make room by shedding the lowest-priority waiting request
+            self._queue.remove(lowest)
+            heapq.heapify(self._queue)
+            lowest.rejection = self._reject("shed", self._estimated_wait(len(self._queue)))
+            self._condition.notify_all()
+        heapq.heappush(self._queue, ticket)
+
+    def _admit(self, ticket):
+        ticket.admitted = True
+        self.running += 1
+        self.admitted += 1
+        return ticket
+
+    def _estimated_wait(self, position):
+        # Seconds until the request at `position` in the queue gets a slot
+        if not self.average_seconds:
+            return 0.0
+        return math.ceil(position / self.max_concurrent) * self.average_seconds
+
+    def _reject(self, reason, retry_after):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return Overloaded(reason, max(retry_after, 1.0))
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """
+    Returns the process-wide AdmissionController, creating it on first use.
+
+    Returns:
+        AdmissionController: The controller configured from `config.admission_settings`.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                max_concurrent=admission_settings["max_concurrent"],
+                max_queue=admission_settings["max_queue"],
+                queue_timeout=admission_settings["queue_timeout_seconds"],
+                priorities=admission_settings["priorities"],
+                rate_limits=admission_settings["rate_limits"],
+            )
+        return _controller
@@ -0,0 +1,595 @@
+"""
+Headless HTTP/JSON API exposing the career coach agents.
+
+Every endpoint takes a JSON body and runs its agent on the shared job engine, so generations are admitted,
+coalesced and cached exactly as for the Streamlit app, while the event loop only relays the output:
+
+    POST /api/v1/action-plan       industry, experience, current_role, target_role
+    POST /api/v1/resume-analysis   resume_text, or resume_base64 and filename; job_description (optional)
+    POST /api/v1/market-research   role, location
+    POST /api/v1/skills-plan       skills, timeframe_months
+    POST /api/v1/interview         position, question_type, answer (omit the answer to start an interview)
+    POST /api/v1/networking        goal, platform
+    POST /api/v1/ask               message
+    GET  /api/v1/health
+    GET  /api/v1/stats
+
+A response is JSON ({"session_id": ..., "response": ...}) unless the request sends `Accept: text/event-stream`
+or `?stream=1`, in which case it is a server-sent event stream: `queued` events with the position in the
+admission queue, unnamed events with {"delta": ...} for each chunk, then a `done` or `error` event. The
+interview and chat endpoints keep their conversation per session: pass the `X-Session-Id` header returned by
+the first response to continue it. A request turned away by admission control gets 503 with Retry-After.
+
+With --workers the server forks several processes sharing the listening socket; sessions are then saved to
+a shared SQLite file (`api_settings["session_path"]`) so a conversation can continue on any worker.
+
+Usage:
+    python api_server.py --port 8000
+    python api_server.py --port 8000 --workers 4
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import contextvars
+import json
+import logging
+import math
+import os
+import time
+import uuid
+from collections import OrderedDict
+import tornado.httpserver
+import tornado.iostream
+import tornado.netutil
+import tornado.process
+import tornado.web
+from cache import DiskCache
+from config import api_settings, career_coach_memory, interview_memory
+from jobs import CANCELLED, DONE, REJECTED, get_job_engine
+from logging_setup import configure_logging
+from memory import ConversationMemory
+from registry import get_registry
+from resume_ingest import get_resume_ingestor
+from startup import start_background_warm_up
+from telemetry import span
+from workers import share_worker_processes
+
+OPENING_QUESTION = "Let's begin your interview! Tell me about yourself"
+
+# The conversation memories kept in a session, with their settings
+SESSION_MEMORIES = {
+    "interview_memory": interview_memory,
+    "career_coach_memory": career_coach_memory,
+}
+
+
+class SessionStore:
+    """
+    The API's client sessions, each with its own per-session application and conversation memories.
+
+    Sessions are kept in least-recently-used order; the oldest are dropped beyond `max_sessions` and any
+    session unused for `ttl_seconds` expires. Each session holds its own set of agents (see
+    `CareerCoachApp.for_session`), about 15 KB for the six agents and their model copies on top of its
+    conversations, so the default 10000 sessions keep roughly 150 MB of agents per worker process; lower
+    `api_settings["max_sessions"]` or `session_ttl_seconds` to bound it further. With a shared store, the store holds the latest state of each
+    session's conversations: handlers `load` them before and `save` them after every request, since the
+    previous request may have been served by another worker process.
+
+    Attributes:
+        max_sessions (int): Maximum number of sessions kept.
+        ttl_seconds (float): Idle time after which a session expires.
+        store (DiskCache): Storage shared with the other worker processes, or None.
+    """
+
+    def __init__(self, max_sessions=10000, ttl_seconds=7200, store=None):
+        """
+        Initializes an empty store.
+
+        Parameters:
+            max_sessions (int): Maximum number of sessions kept (default is 10000).
+            ttl_seconds (float): Idle time after which a session expires (default is 7200).
+            store (DiskCache, optional): Storage shared with the other worker processes.
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._sessions = OrderedDict()
+
+    def get(self, session_id=None):
+        """
+        Returns a session's state, creating the session if it is unknown or expired.
+
+        Only called from the event loop thread, so no locking is needed.
+
+        Parameters:
+            session_id (str, optional): The session requested by the client.
+
+        Returns:
+            dict: The session state; "session_id" holds the session's (possibly new) identifier.
+        """
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest["last_used"] < self.ttl_seconds and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+        state = self._sessions.get(session_id) if session_id else None
+        if state is None:
+            session_id = session_id or uuid.uuid4().hex
+            state = self._sessions[session_id] = {
+                "session_id": session_id,
+                "lock": asyncio.Lock(),
+            }
+        self._sessions.move_to_end(session_id)
+        state["last_used"] = now
+        return state
+
+    def save(self, state):
+        """
+        Saves a session's conversations to the shared store, if there is one.
+
+        Parameters:
+            state (dict): The session state.
+        """
+        if self.store is None:
+            return
+        saved = {
+            name: state[name].snapshot() for name in SESSION_MEMORIES if name in state
+        }
+        self.store.set(self._key(state["session_id"]), json.dumps(saved))
+
+    def load(self, state):
+        """
+        Replaces a session's conversations with the ones in the shared store, if there is one.
+
+        Parameters:
+            state (dict): The session state.
+        """
+        if self.store is None:
+            return
+        saved = self.store.get(self._key(state["session_id"]))
+        for name, snapshot in json.loads(saved or "{}").items():
+            memory = state[name] = ConversationMemory.from_config(SESSION_MEMORIES[name])
+            memory.restore(snapshot)
+
+    @staticmethod
+    def _key(session_id):
+        return f"session:{session_id}"
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    """
+    Shared JSON parsing, session handling and error responses of the API handlers.
+    """
+
+    def prepare(self):
+        self.set_header("Content-Type", "application/json")
+        self.session_id = None
+        self.retry_after = None
+        self.body = {}
+        if self.request.body:
+            try:
+                self.body = json.loads(self.request.body)
+            except ValueError:
+                raise tornado.web.HTTPError(400, "Request body is not valid JSON")
+            if not isinstance(self.body, dict):
+                raise tornado.web.HTTPError(400, "Request body must be a JSON object")
+
+    def field(self, name, default=None, required=True):
+        """
+        Returns a field of the JSON body.
+
+        Parameters:
+            name (str): The field name.
+            default: The value used when the field is missing and not required.
+            required (bool): Whether a missing or empty field is an error (default is True).
+
+        Returns:
+            The field value.
+        """
+        value = self.body.get(name, default)
+        if required and value in (None, ""):
+            raise tornado.web.HTTPError(400, "Missing field: %s", name)
+        return value
+
+    def write_error(self, status_code, **kwargs):
+        # send_error has cleared the headers; the message travels in the body, not the reason phrase
+        self.set_header("Content-Type", "application/json")
+        if self.session_id:
+            self.set_header("X-Session-Id", self.session_id)
+        if status_code == 503 and self.retry_after:
+            self.set_header("Retry-After", str(math.ceil(self.retry_after)))
+        error = self._reason
+        exc_info = kwargs.get("exc_info")
+        if exc_info and isinstance(exc_info[1], tornado.web.HTTPError) and exc_info[1].log_message:
+            e = exc_info[1]
+            error = e.log_message % e.args if e.args else e.log_message
+        self.finish(json.dumps({"error": error}))
+
+
+class HealthHandler(BaseHandler):
+    def get(self):
+        self.write({"status": "ok"})
+
+
+class StatsHandler(BaseHandler):
+    async def get(self):
+        app = await asyncio.get_running_loop().run_in_executor(
+            None, get_registry().get_app
+        )
+        self.write(
+            {
+                "registry": get_registry().stats(),
+                "jobs": get_job_engine().stats(),
+                "admission": app.admission.stats() if app.admission else None,
+                "coalescing": app.single_flight.stats(),
+                "endpoints": app.endpoint_pool.stats(),
+                "sessions": len(self.application.settings["sessions"]),
+            }
+        )
+
+
+class AgentHandler(BaseHandler):
+    """
+    Runs one agent for a POST request and returns or streams its response.
+
+    Subclasses set `agent_key` and implement `build_prompt`; conversational endpoints also override
+    `complete` to record the exchange in the session's memory and `abandon` to forget the user's turn when
+    there is no reply to go with it.
+    """
+
+    agent_key = None
+
+    async def post(self):
+        sessions = self.application.settings["sessions"]
+        state = sessions.get(self.request.headers.get("X-Session-Id"))
+        self.session_id = state["session_id"]
+        self.set_header("X-Session-Id", self.session_id)
+        self.streaming = self.get_argument("stream", "0") not in ("0", "false") or (
+            "text/event-stream" in self.request.headers.get("Accept", "")
+        )
+        self.job = None
+        self.completed = False
+        with span("page", page=f"api/{self.agent_key}"):
+            async with state["lock"]:
+                loop = asyncio.get_running_loop()
+                app = await loop.run_in_executor(None, get_registry().session_app, state)
+                if sessions.store is not None:
+                    await loop.run_in_executor(None, sessions.load, state)
+                try:
+                    with span("prompt_build", page=f"api/{self.agent_key}"):
+                        prompt = await self.build_prompt(app, state)
+                    if prompt is not None:
+                        self.job = get_job_engine().submit(app, self.agent_key, prompt)
+                        await self.relay(self.job, state)
+                finally:
+                    if self.job is not None and not self.completed:
+                        # Rejected, failed or abandoned by the client: a retry must not repeat the turn
+                        self.abandon(state)
+                    if sessions.store is not None:
+                        await loop.run_in_executor(None, sessions.save, state)
+
+    async def build_prompt(self, app, state):
+        """
+        Builds the agent's prompt from the request (and the session state).
+
+        Parameters:
+            app (CareerCoachApp): The session's application.
+            state (dict): The session state.
+
+        Returns:
+            str: The prompt, or None if the handler already wrote the response.
+        """
+
+    def complete(self, state, text):
+        """
+        Called with the full response once the agent has finished successfully.
+
+        Parameters:
+            state (dict): The session state.
+            text (str): The response.
+        """
+
+    def abandon(self, state):
+        """
+        Called instead of `complete` when the agent was rejected, failed or the client went away.
+
+        Parameters:
+            state (dict): The session state.
+        """
+
+    def on_connection_close(self):
+        # The client went away; stop the generation (other identical requests keep theirs)
+        if self.job is not None:
+            self.job.cancel()
+
+    async def relay(self, job, state):
+        """
+        Sends the job's output to the client as it arrives, as JSON or as server-sent events.
+
+        Parameters:
+            job (Job): The running job.
+            state (dict): The session state.
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        job.add_listener(lambda: loop.call_soon_threadsafe(changed.set))
+        if self.streaming:
+            self.set_header("Content-Type", "text/event-stream")
+            self.set_header("Cache-Control", "no-cache")
+        index, position = 0, None
+        while True:
+            changed.clear()
+            done = job.done
+            chunks = job.chunks[index:]
+            index += len(chunks)
+            if self.streaming:
+                try:
+                    if job.queue_position != position:
+                        position = job.queue_position
+                        if position is not None:
+                            self.send_event({"position": position}, "queued")
+                    for chunk in chunks:
+                        self.send_event({"delta": chunk})
+                    await self.flush()
+                except tornado.iostream.StreamClosedError:
+                    job.cancel()
+                    return
+            if done and index >= len(job.chunks):
+                break
+            await changed.wait()
+
+        if job.status == DONE:
+            self.complete(state, job.text)
+            self.completed = True
+        if self.streaming:
+            if job.status == DONE:
+                self.send_event({"session_id": state["session_id"]}, "done")
+            else:
+                self.send_event(
+                    {"error": job.error or job.status, "retry_after": job.retry_after}, "error"
+                )
+            self.finish()
+        elif job.status == DONE:
+            self.finish({"session_id": state["session_id"], "response": job.text})
+        elif job.status == CANCELLED:
+            # Only the client's disconnect cancels an API job, so there is nobody left to answer
+            return
+        elif job.status == REJECTED:
+            self.retry_after = job.retry_after
+            raise tornado.web.HTTPError(503, "%s", job.error)
+        else:
+            raise tornado.web.HTTPError(500, "%s", job.error or job.status)
+
+    def send_event(self, data, event=None):
+        """
+        Writes one server-sent event.
+
+        Parameters:
+            data (dict): The event payload, sent as JSON.
+            event (str, optional): The event name.
+        """
+        if event:
+            self.write(f"event: {event}\n")
+        self.write(f"data: {json.dumps(data)}\n\n")
+
+
+class ActionPlanHandler(AgentHandler):
+    agent_key = "skills_developer"
+
+    async def build_prompt(self, app, state):
+        return app.action_plan_prompt(
+            self.field("industry"),
+            self.field("experience", 0, required=False),
+            self.field("current_role"),
+            self.field("target_role"),
+        )
+
+
+class ResumeAnalysisHandler(AgentHandler):
+    agent_key = "resume_analyzer"
+
+    async def build_prompt(self, app, state):
+        resume_text = self.field("resume_text", required=False)
+        if not resume_text:
+            try:
+                data = base64.b64decode(self.field("resume_base64"), validate=True)
+            except (binascii.Error, TypeError):
+                raise tornado.web.HTTPError(400, "resume_base64 is not valid base64")
+            filename = self.field("filename")
+            try:
+                resume_text = await asyncio.get_running_loop().run_in_executor(
+                    None, get_resume_ingestor().ingest, data, filename
+                )
+            except Exception as e:
+                logging.warning("Could not convert uploaded resume %s: %s", filename, e)
+                raise tornado.web.HTTPError(400, "The resume could not be read")
+        # Matching and compaction are CPU-bound, so they run off the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            contextvars.copy_context().run,
+            app.resume_prompt,
+            resume_text,
+            self.field("job_description", required=False),
+        )
+
+
+class MarketResearchHandler(AgentHandler):
+    agent_key = "market_researcher"
+
+    async def build_prompt(self, app, state):
+        return app.market_research_prompt(self.field("role"), self.field("location"))
+
+
+class SkillsPlanHandler(AgentHandler):
+    agent_key = "skills_developer"
+
+    async def build_prompt(self, app, state):
+        return app.learning_plan_prompt(
+            self.field("skills"), self.field("timeframe_months", 3, required=False)
+        )
+
+
+class NetworkingHandler(AgentHandler):
+    agent_key = "networking_strategist"
+
+    async def build_prompt(self, app, state):
+        return app.networking_prompt(
+            self.field("goal"), self.field("platform", "LinkedIn", required=False)
+        )
+
+
+class InterviewHandler(AgentHandler):
+    """
+    One turn of a mock interview. Without an answer a new interview starts with the opening question.
+    """
+
+    agent_key = "interview_coach"
+
+    async def build_prompt(self, app, state):
+        memory = state.get("interview_memory")
+        answer = self.field("answer", required=False)
+        restart = memory is None or not answer
+        header = None
+        if restart or memory.header == "" or "position" in self.body:
+            # Later turns may leave out the position to keep the interview's header. The fields are read
+            # before the session's interview is touched, so an invalid request leaves it as it was
+            header = app.interview_header(
+                self.field("position"),
+                self.field("question_type", "Behavioral", required=False),
+            )
+        if restart:
+            memory = state["interview_memory"] = ConversationMemory.from_config(interview_memory)
+            memory.add("assistant", OPENING_QUESTION)
+        if header is not None:
+            memory.set_header(header)
+        if not answer:
+            self.finish({"session_id": state["session_id"], "response": OPENING_QUESTION})
+            return None
+        self.previous_memory = memory.snapshot()
+        memory.add("user", answer)
+        return app.interview_prompt(memory)
+
+    def complete(self, state, text):
+        state["interview_memory"].add("assistant", text)
+
+    def abandon(self, state):
+        state["interview_memory"].restore(self.previous_memory)
+
+
+class AskHandler(AgentHandler):
+    agent_key = "ask_career_coach"
+
+    async def build_prompt(self, app, state):
+        memory = state.get("career_coach_memory")
+        if memory is None:
+            memory = state["career_coach_memory"] = ConversationMemory.from_config(
+                career_coach_memory
+            )
+        message = self.field("message")
+        self.previous_memory = memory.snapshot()
+        memory.add("user", message)
+        return app.ask_prompt(memory)
+
+    def complete(self, state, text):
+        state["career_coach_memory"].add("assistant", text)
+
+    def abandon(self, state):
+        state["career_coach_memory"].restore(self.previous_memory)
+
+
+def make_app(sessions=None, shared_sessions=False):
+    """
+    Builds the tornado application with every API route.
+
+    Parameters:
+        sessions (SessionStore, optional): The session store (default from `api_settings`).
+        shared_sessions (bool): Whether the default session store saves sessions for other worker processes
+            (default is False).
+
+    Returns:
+        tornado.web.Application: The application.
+    """
+    if sessions is None:
+        store = None
+        if shared_sessions:
+            store = DiskCache(
+                api_settings["session_path"], ttl_seconds=api_settings["session_ttl_seconds"]
+            )
+        sessions = SessionStore(
+            api_settings["max_sessions"], api_settings["session_ttl_seconds"], store
+        )
+    return tornado.web.Application(
+        [
+            (r"/api/v1/health", HealthHandler),
+            (r"/api/v1/stats", StatsHandler),
+            (r"/api/v1/action-plan", ActionPlanHandler),
+            (r"/api/v1/resume-analysis", ResumeAnalysisHandler),
+            (r"/api/v1/market-research", MarketResearchHandler),
+            (r"/api/v1/skills-plan", SkillsPlanHandler),
+            (r"/api/v1/interview", InterviewHandler),
+            (r"/api/v1/networking", NetworkingHandler),
+            (r"/api/v1/ask", AskHandler),
+        ],
+        sessions=sessions,
+    )
+
+
+async def serve(sockets, shared_sessions=False):
+    """
+    Serves the API on already bound sockets until the process is stopped.
+
+    Parameters:
+        sockets (list): The listening sockets (see `tornado.netutil.bind_sockets`).
+        shared_sessions (bool): Whether sessions are shared with other worker processes (default is False).
+    """
+    server = tornado.httpserver.HTTPServer(
+        make_app(shared_sessions=shared_sessions),
+        max_body_size=api_settings["max_body_bytes"],
+    )
+    server.add_sockets(sockets)
+    # Build the model client and agents now rather than on the first request
+    start_background_warm_up()
+    addresses = ", ".join("http://%s:%s" % s.getsockname()[:2] for s in sockets)
+    logging.info("API listening on %s", addresses)
+    await asyncio.Event().wait()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=api_settings["host"], help="interface to bind")
+    parser.add_argument("--port", type=int, default=api_settings["port"], help="port to listen on")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=api_settings["workers"],
+        help="server processes sharing the port (0 for one per core)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs the API server from the command line.
+    """
+    args = parse_args(argv)
+    sockets = tornado.netutil.bind_sockets(args.port, args.host)
+    if args.workers != 1:
+        # Fork before any thread, event loop or database connection exists; the parent only supervises
+        tornado.process.fork_processes(args.workers)
+        # Workers rotating one shared log file would rename it out from under each other
+        configure_logging(per_process_files=True)
+        # Each worker starts its own conversion pool; together they use the configured number of processes
+        share_worker_processes(args.workers or os.cpu_count() or 1)
+    else:
+        configure_logging()
+    asyncio.run(serve(sockets, shared_sessions=args.workers != 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,18 @@
-import os
-import time
 import logging
 import streamlit as st
-from docling.document_converter import DocumentConverter
-from career_coach import CareerCoachApp
+from config import career_coach_memory, interview_memory
+from jobs import DONE, REJECTED, get_job_engine
+from logging_setup import configure_logging
+from memory import ConversationMemory, trim_history
+from registry import get_registry
+from resume_ingest import get_resume_ingestor
+from startup import start_background_warm_up
+from telemetry import span
 
 
 st.set_page_config(page_title="AI Career Coach", page_icon="💼")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(module)s - %(asctime)s - %(levelname)s - %(funcName)s - %(lineno)d - %(message)s",
-    filename="career_coach_log.log",
-)
+configure_logging()
 
 
 class StreamlitInterface:
@@ -20,8 +20,122 @@ class StreamlitInterface:
     A class to encapsulate the Streamlit-based user interface for the AI Career Coach application.
     This class provides methods to render different pages of the application, such as Dashboard,
     Resume Analysis, Job Market Research, etc. Each method corresponds to a specific feature of the app.
+
+    Agent runs are submitted to the background job engine and their handles are kept in the session state,
+    so a generation keeps running, and its result stays visible, across reruns and page switches.
+
+    Each script run is recorded as a "page" span, with child spans for prompt building and rendering.
     """
 
+    @staticmethod
+    def submit_job(app, job_key, agent_key, prompt):
+        """
+        Submits an agent run to the job engine and stores its handle in the session state.
+
+        Any job previously stored under the same key is cancelled.
+
+        Parameters:
+            app (CareerCoachApp): The session's CareerCoachApp instance.
+            job_key (str): The session state key under which the job is stored.
+            agent_key (str): The attribute name of the agent (e.g., "market_researcher").
+            prompt (str): The input prompt.
+
+        Returns:
+            Job: The handle of the submitted job.
+        """
+        previous = st.session_state.get(job_key)
+        if previous is not None and not previous.done:
+            previous.cancel()
+        job = get_job_engine().submit(app, agent_key, prompt)
+        st.session_state[job_key] = job
+        return job
+
+    @staticmethod
+    def render_job(job_key, spinner_text):
+        """
+        Renders the response of the job stored under `job_key`, streaming it while the job is running.
+
+        A Cancel button is shown while the job has not finished.
+
+        Parameters:
+            job_key (str): The session state key under which the job is stored.
+            spinner_text (str): The message shown while waiting for the response.
+        """
+        job = st.session_state.get(job_key)
+        if job is None:
+            return
+        with span("render", agent=job.agent_key, streamed=not job.done):
+            if not job.done:
+                if st.button("Cancel", key=f"{job_key}_cancel"):
+                    job.cancel()
+                with st.spinner(spinner_text):
+                    StreamlitInterface.show_queue_position(job)
+                    st.write_stream(job.iter_chunks())
+            else:
+                st.write(job.text)
+        if job.status == REJECTED:
+            st.warning(job.error)
+        elif job.error:
+            st.error(f"Something went wrong: {job.error}")
+        elif job.cancelled:
+            st.info("Generation cancelled.")
+
+    @staticmethod
+    def show_queue_position(job, poll_seconds=0.5):
+        """
+        Shows the job's place in the admission queue until its response starts.
+
+        Parameters:
+            job (Job): The job being rendered.
+            poll_seconds (float): How often the position is refreshed (default is 0.5).
+        """
+        placeholder = st.empty()
+        while not job.wait_started(poll_seconds):
+            position = job.queue_position
+            if position is not None:
+                placeholder.info(
+                    f"Many people are using the coach right now. You are number {position} in the queue."
+                )
+        placeholder.empty()
+
+    @staticmethod
+    def render_chat_job(job_key, messages, memory=None):
+        """
+        Streams the pending assistant reply stored under `job_key` into a chat message.
+
+        Once the reply is complete it is appended to the chat history (and to the conversation memory, if
+        given) and the job is removed from the session state. If the job was rejected or failed, the user
+        message it answers is removed instead, and the memory is restored from the snapshot stored under
+        `f"{job_key}_memory"` before that message was added, so a retry does not repeat it. If the script is
+        interrupted by a rerun, the reply is rendered again from the start.
+
+        Parameters:
+            job_key (str): The session state key under which the job is stored.
+            messages (list): The chat history the reply is appended to.
+            memory (ConversationMemory, optional): The conversation memory the reply is added to.
+        """
+        job = st.session_state.get(job_key)
+        if job is None:
+            return
+        with span("render", agent=job.agent_key), st.chat_message("assistant"):
+            StreamlitInterface.show_queue_position(job)
+            response_text = st.write_stream(job.iter_chunks())
+            if job.status == REJECTED:
+                st.warning(job.error)
+            elif job.error:
+                st.error(f"Something went wrong: {job.error}")
+        previous_memory = st.session_state.pop(f"{job_key}_memory", None)
+        if job.status == DONE:
+            messages.append({"role": "assistant", "content": response_text})
+            if memory is not None:
+                memory.add("assistant", response_text)
+        else:
+            if messages and messages[-1]["role"] == "user":
+                messages.pop()
+            if memory is not None and previous_memory is not None:
+                memory.restore(previous_memory)
+        del st.session_state[job_key]
+
     @staticmethod
     def dashboard(app):
         """
@@ -54,13 +168,13 @@ class StreamlitInterface:
 
         st.subheader("Weekly Action Items")
         if st.button("Generate Action Plan"):
-            with st.spinner("Creating your action plan..."):
-                action_plan = app.skills_developer.run(
-                    f"Create a weekly action plan for a {current_role} targeting {target_role} role "
-                    f"in {industry} with {experience} years of experience. Format document as a clear markdown document with headers and subheaders",
-                    stream=False,
-                )
-                st.write(action_plan.content)
+            StreamlitInterface.submit_job(
+                app,
+                "dashboard_job",
+                "skills_developer",
+                app.action_plan_prompt(industry, experience, current_role, target_role),
+            )
+        StreamlitInterface.render_job("dashboard_job", "Creating your action plan...")
 
     @staticmethod
     def resume_analysis(app):
@@ -84,33 +198,36 @@ class StreamlitInterface:
         resume_file = st.file_uploader(
             "Upload your resume file here:", type=["pdf", "docx", "doc"]
         )
+        resume_text = None
         if resume_file is not None:
             logging.info("Resume file uploaded")
-            temp_file_path = f"temp_{resume_file.name}"
-            with open(temp_file_path, "wb") as f:
-                f.write(resume_file.getvalue())
-
-            converter = DocumentConverter()
-            result = converter.convert(temp_file_path)
-            logging.info("Resume converted")
-            resume_text = result.document.export_to_text()
-            os.remove(temp_file_path)
+            progress = st.empty()
+            preview = st.empty()
+
+            def show_progress(pages_done, page_count, text):
+                # Only called while converting; cached resumes return at once
+                progress.progress(
+                    pages_done / page_count, text=f"Reading page {pages_done} of {page_count}..."
+                )
+                preview.caption(text[-500:])
+
+            resume_text = get_resume_ingestor().ingest(
+                resume_file.getvalue(), resume_file.name, on_progress=show_progress
+            )
+            progress.empty()
+            preview.empty()
         job_description = st.text_area(
             "Paste the job description (optional):", height=150
         )
 
         if st.button("Analyze Resume"):
-            with st.spinner("Analyzing your resume..."):
-                analysis = app.resume_analyzer.run(
-                    f"Analyze this resume:\n{resume_text}\n"
-                    + (
-                        f"Compare with job description:\n{job_description}"
-                        if job_description
-                        else ""
-                    ),
-                    stream=False,
-                )
-                st.write(analysis.content)
+            if resume_text is None:
+                st.warning("Please upload your resume first.")
+                return
+            with span("prompt_build", page="resume_analysis"):
+                prompt = app.resume_prompt(resume_text, job_description)
+            StreamlitInterface.submit_job(app, "resume_job", "resume_analyzer", prompt)
+        StreamlitInterface.render_job("resume_job", "Analyzing your resume...")
 
     @staticmethod
     def job_market_research(app):
@@ -133,13 +250,13 @@ class StreamlitInterface:
         location = st.text_input("Location", placeholder="e.g., San Francisco")
 
         if st.button("Research Market"):
-            with st.spinner("Researching job market..."):
-                research = app.market_researcher.run(
-                    f"Research the job market for {role} in {location}. "
-                    "Include salary ranges, required skills, and market demand. Format document as a clear markdown document with headers and subheaders",
-                    stream=False,
-                )
-                st.write(research.content)
+            StreamlitInterface.submit_job(
+                app,
+                "market_job",
+                "market_researcher",
+                app.market_research_prompt(role, location),
+            )
+        StreamlitInterface.render_job("market_job", "Researching job market...")
 
     @staticmethod
     def skills_development(app):
@@ -161,12 +278,13 @@ class StreamlitInterface:
         timeframe = st.slider("Learning timeframe (months)", 1, 12, 3)
 
         if st.button("Create Learning Plan"):
-            with st.spinner("Creating your learning plan..."):
-                plan = app.skills_developer.run(
-                    f"Create a {timeframe}-month learning plan for: {target_skills}. Format document as a clear markdown document with headers and subheaders",
-                    stream=False,
-                )
-                st.write(plan.content)
+            StreamlitInterface.submit_job(
+                app,
+                "skills_job",
+                "skills_developer",
+                app.learning_plan_prompt(target_skills, timeframe),
+            )
+        StreamlitInterface.render_job("skills_job", "Creating your learning plan...")
 
     @staticmethod
     def interview_preparation(app):
@@ -197,21 +315,31 @@ class StreamlitInterface:
         if "interview_ongoing" not in st.session_state:
             st.session_state.interview_ongoing = False
 
+        # The prompt context sent to the agent; grows incrementally and is compacted past its token budget
+        if "interview_memory" not in st.session_state:
+            st.session_state.interview_memory = ConversationMemory.from_config(
+                interview_memory
+            )
+        memory = st.session_state.interview_memory
+
         # User inputs
         position = top_placeholder.text_input("Position you're interviewing for:")
         question_type = st.selectbox(
             "Question Type",
             ["Technical", "Behavioral", "Leadership", "Problem Solving"],
         )
+        memory.set_header(app.interview_header(position, question_type))
 
         if st.button("Start Mock Interview") and not st.session_state.interview_ongoing:
             st.session_state.interview_ongoing = True
+            opening_question = "Let's begin your interview! Tell me about yourself"
             st.session_state.interview_messages.append(
                 {
                     "role": "assistant",
-                    "content": "Let's begin your interview! Tell me about yourself",
+                    "content": opening_question,
                 }
             )
+            memory.add("assistant", opening_question)
             st.rerun()
 
         # Push content down
@@ -222,6 +350,11 @@ class StreamlitInterface:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
 
+        # Finish a reply that was still streaming when the script was last interrupted
+        StreamlitInterface.render_chat_job(
+            "interview_job", st.session_state.interview_messages, memory
+        )
+
         # Chat interaction
         if st.session_state.interview_ongoing:
             if prompt := st.chat_input("Your Answer:"):
@@ -233,37 +366,19 @@ class StreamlitInterface:
                 with st.chat_message("user"):
                     st.markdown(prompt)
 
-                # Construct dynamic prompt for the agent
-                conversation_history = "\n".join(
-                    [
-                        f"{msg['role']}: {msg['content']}"
-                        for msg in st.session_state.interview_messages
-                    ]
-                )
-                dynamic_prompt = (
-                    f"You are conducting a mock interview for a {position} position. "
-                    f"The question type is {question_type}. Here is the conversation so far:\n"
-                    f"{conversation_history}\n"
-                    "Based on the user's latest response, provide feedback and ask the next question. "
-                    "If this is the final question, provide a final assessment."
-                )
+                # Construct dynamic prompt for the agent: the stable conversation prefix plus the new answer
+                with span("prompt_build", page="interview_preparation"):
+                    st.session_state.interview_job_memory = memory.snapshot()
+                    memory.add("user", prompt)
+                    dynamic_prompt = app.interview_prompt(memory)
 
                 # Generate assistant's response
-                with st.chat_message("assistant"):
-                    placeholder = st.empty()
-                    response_text = ""
-
-                    for word in CareerCoachApp.response_generator(
-                        app.interview_coach,
-                        dynamic_prompt,
-                    ):
-                        response_text += word
-                        placeholder.markdown(response_text)
-                        time.sleep(0.01)
-
-                    st.session_state.interview_messages.append(
-                        {"role": "assistant", "content": response_text}
-                    )
+                StreamlitInterface.submit_job(
+                    app, "interview_job", "interview_coach", dynamic_prompt
+                )
+                StreamlitInterface.render_chat_job(
+                    "interview_job", st.session_state.interview_messages, memory
+                )
 
     @staticmethod
     def networking_strategy(app):
@@ -293,12 +408,15 @@ class StreamlitInterface:
         )
 
         if st.button("Generate Strategy"):
-            with st.spinner("Creating networking strategy..."):
-                strategy = app.networking_strategist.run(
-                    f"Create a networking strategy for {goal} focusing on {platform}. Format document as a clear markdown document with headers and subheaders",
-                    stream=False,
-                )
-                st.write(strategy.content)
+            StreamlitInterface.submit_job(
+                app,
+                "networking_job",
+                "networking_strategist",
+                app.networking_prompt(goal, platform),
+            )
+        StreamlitInterface.render_job(
+            "networking_job", "Creating networking strategy..."
+        )
 
     @staticmethod
     def ask_career_coach(app):
@@ -313,7 +431,7 @@ class StreamlitInterface:
 
         Features:
             - Interactive chat-based Q&A with the AI Career Coach.
-            - Maintains chat history for context-aware responses.
+            - Maintains chat history for context-aware responses, within a token budget and a per-session size cap.
         """
         logging.info("Ask Career Coach page")
         st.header("Ask Career Coach")
@@ -321,10 +439,26 @@ class StreamlitInterface:
         if "career_coach_messages" not in st.session_state:
             st.session_state.career_coach_messages = []
 
+        if "career_coach_memory" not in st.session_state:
+            st.session_state.career_coach_memory = ConversationMemory.from_config(
+                career_coach_memory
+            )
+        memory = st.session_state.career_coach_memory
+
+        trim_history(
+            st.session_state.career_coach_messages,
+            career_coach_memory["max_history_messages"],
+            career_coach_memory["max_history_chars"],
+        )
+
         for message in st.session_state.career_coach_messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
 
+        StreamlitInterface.render_chat_job(
+            "career_coach_job", st.session_state.career_coach_messages, memory
+        )
+
         if prompt := st.chat_input("Ask Anything to the Career Coach"):
             st.session_state.career_coach_messages.append(
                 {"role": "user", "content": prompt}
@@ -333,18 +467,15 @@ class StreamlitInterface:
             with st.chat_message("user"):
                 st.markdown(prompt)
 
-            with st.chat_message("assistant"):
-                placeholder = st.empty()
-                response_text = ""
-                for word in CareerCoachApp.response_generator(
-                    app.ask_career_coach, prompt
-                ):
-                    response_text += word
-                    placeholder.markdown(response_text)
-                    time.sleep(0.01)
-
-            st.session_state.career_coach_messages.append(
-                {"role": "assistant", "content": response_text}
+            with span("prompt_build", page="ask_career_coach"):
+                st.session_state.career_coach_job_memory = memory.snapshot()
+                memory.add("user", prompt)
+                coach_prompt = app.ask_prompt(memory)
+            StreamlitInterface.submit_job(
+                app, "career_coach_job", "ask_career_coach", coach_prompt
+            )
+            StreamlitInterface.render_chat_job(
+                "career_coach_job", st.session_state.career_coach_messages, memory
             )
 
 
@@ -353,7 +484,10 @@ def main():
     The entry point of the AI Career Development Coach application.
 
     This function initializes the Streamlit app, sets up the navigation sidebar,
-    and routes users to the selected service page. It also initializes the CareerCoachApp instance.
+    and routes users to the selected service page. The CareerCoachApp is built once per process by the
+    agent registry (started by the background warm-up after the first paint, with a loading spinner shown
+    until it is ready); each user session receives its own agents on top of the shared endpoint pool and
+    tools.
 
     Features:
         - Sets the page title and icon.
@@ -364,8 +498,6 @@ def main():
     st.title("AI Career Development Coach 💼")
     st.caption("Your personal AI-powered career development suite")
 
-    app = CareerCoachApp()
-
     # Main Navigation
     page = st.sidebar.selectbox(
         "Select Service",
@@ -380,26 +512,35 @@ def main():
         ],
     )
 
-    if page == "Dashboard":
-        StreamlitInterface.dashboard(app)
+    # The shell of the page is on screen; load the model client and agents in the background.
+    start_background_warm_up()
+
+    with span("page", page=page):
+        # The first session of a process waits here until the warm-up has built the application; the title
+        # and sidebar are already on screen, and the spinner shows the page is loading rather than stuck
+        with st.spinner("Loading the career coach..."):
+            app = get_registry().session_app(st.session_state)
+
+        if page == "Dashboard":
+            StreamlitInterface.dashboard(app)
 
-    elif page == "Resume Analysis":
-        StreamlitInterface.resume_analysis(app)
+        elif page == "Resume Analysis":
+            StreamlitInterface.resume_analysis(app)
 
-    elif page == "Job Market Research":
-        StreamlitInterface.job_market_research(app)
+        elif page == "Job Market Research":
+            StreamlitInterface.job_market_research(app)
 
-    elif page == "Skills Development":
-        StreamlitInterface.skills_development(app)
+        elif page == "Skills Development":
+            StreamlitInterface.skills_development(app)
 
-    elif page == "Interview Preparation":
-        StreamlitInterface.interview_preparation(app)
+        elif page == "Interview Preparation":
+            StreamlitInterface.interview_preparation(app)
 
-    elif page == "Networking Strategy":
-        StreamlitInterface.networking_strategy(app)
+        elif page == "Networking Strategy":
+            StreamlitInterface.networking_strategy(app)
 
-    elif page == "Ask Career Coach":
-        StreamlitInterface.ask_career_coach(app)
+        elif page == "Ask Career Coach":
+            StreamlitInterface.ask_career_coach(app)
 
 
 if __name__ == "__main__":
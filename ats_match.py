@@ -0,0 +1,310 @@
+"""
+Local ATS-style keyword matching between a resume and a job description.
+
+The job description is tokenized once into a weighted keyword index (cached by content), and each resume
+is scored against it in a single pass: weighted keyword coverage, TF-IDF cosine similarity and the most
+important missing terms. The compact result is added to the resume analyzer's prompt so the model does not
+spend tokens on lexical matching, and batch screening can rank resumes without calling the model at all.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from cache import content_key
+from config import ats_settings
+
+# Tokens keep the characters of names like "c++", "c#", "node.js" and "ci/cd".
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+# Punctuation ending a phrase; bigrams never span it.
+PHRASE_BREAK = re.compile(r"[,;:()\[\]|!?\n\u2022]|\.(?:\s|$)")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each etc few for from further had
+    has have having he her here hers him his how i if in into is it its itself just me more most my no
+    nor not now of off on once only or other our ours out over own per same she should so some such than
+    that the their theirs them then there these they this those through to too under until up upon us
+    very via was we were what when where which while who whom why will with within without would you
+    your yours
+    """.split()
+)
+
+# Words common to almost every job posting or resume; they count, but far less than specific skills, and are
+# never listed as matched or missing keywords.
+GENERIC_TERMS = frozenset(
+    """
+    ability able candidate company degree environment excellent experience experiences including job
+    knowledge looking must new plus position preferred required requirement requirements responsibilities
+    responsible role skill skills strong team teams work working year years
+    """.split()
+)
+
+# Inverse-document-frequency weights; without a reference corpus, generic terms get the low weight.
+SPECIFIC_TERM_IDF = 1.0
+GENERIC_TERM_IDF = 0.2
+
+
+def normalize_token(token):
+    """
+    Reduces a token to the form used for matching (trailing dots stripped, plural "s" removed from words).
+
+    Names with digits or symbols ("node.js", "c++", "s3") are only stripped of trailing dots.
+
+    Parameters:
+        token (str): A lower-case token.
+
+    Returns:
+        str: The normalized token.
+    """
+    token = token.rstrip(".")
+    if token.isalpha() and len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        if token.endswith("ies") and len(token) > 4:
+            return token[:-3] + "y"
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Splits text into normalized matching terms: unigrams without stopwords plus adjacent-word bigrams.
+
+    Bigrams ("machine learning", "distributed system") are only formed from words that are adjacent in the
+    same phrase and are not stopwords.
+
+    Parameters:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: The terms, in text order.
+    """
+    return [term for term, _ in _terms_with_labels(text)]
+
+
+def _terms_with_labels(text):
+    # Yields (term, surface form) pairs; the surface form is what the term is displayed as
+    for phrase in PHRASE_BREAK.split(text.lower()):
+        previous = None
+        for word in TOKEN_PATTERN.findall(phrase):
+            word = word.rstrip(".")
+            term = normalize_token(word)
+            if term in STOPWORDS or (len(term) < 2 and term not in ("c", "r")):
+                previous = None
+                continue
+            yield term, word
+            if previous is not None:
+                yield f"{previous[0]} {term}", f"{previous[1]} {word}"
+            previous = (term, word)
+
+
+def is_generic(term):
+    """
+    Returns whether a term contains a word common to almost every job posting (see `GENERIC_TERMS`).
+
+    Parameters:
+        term (str): A unigram or bigram.
+
+    Returns:
+        bool: True if any of its words is generic.
+    """
+    return any(word in GENERIC_TERMS for word in term.split())
+
+
+def term_weights(terms):
+    """
+    Computes TF-IDF weights for a list of terms (sublinear term frequency).
+
+    Parameters:
+        terms (list): The terms of a document.
+
+    Returns:
+        dict: Maps each distinct term to its weight.
+    """
+    weights = {}
+    for term, count in Counter(terms).items():
+        idf = GENERIC_TERM_IDF if is_generic(term) else SPECIFIC_TERM_IDF
+        weights[term] = (1 + math.log(count)) * idf
+    return weights
+
+
+class MatchResult:
+    """
+    The outcome of matching a resume against a job description.
+
+    Attributes:
+        coverage (float): Share (0-1) of the job description's keyword weight found in the resume.
+        similarity (float): Cosine similarity (0-1) of the TF-IDF vectors.
+        matched (list): The matched keywords, most important first.
+        missing (list): The missing keywords, most important first.
+    """
+
+    def __init__(self, coverage, similarity, matched, missing):
+        """
+        Initializes the result.
+
+        Parameters:
+            coverage (float): Share of the keyword weight found in the resume.
+            similarity (float): Cosine similarity of the TF-IDF vectors.
+            matched (list): The matched keywords, most important first.
+            missing (list): The missing keywords, most important first.
+        """
+        self.coverage = coverage
+        self.similarity = similarity
+        self.matched = matched
+        self.missing = missing
+
+    @property
+    def score(self):
+        """
+        Returns the overall ATS score used for ranking.
+
+        Returns:
+            float: A score from 0 to 100 weighting keyword coverage 70% and similarity 30%.
+        """
+        return round(100 * (0.7 * self.coverage + 0.3 * self.similarity), 1)
+
+    def to_dict(self, max_terms=None):
+        """
+        Returns the result as a JSON-serializable dictionary.
+
+        Parameters:
+            max_terms (int, optional): Maximum number of matched and missing terms included.
+
+        Returns:
+            dict: Score, coverage, similarity and the matched and missing terms.
+        """
+        return {
+            "score": self.score,
+            "coverage": round(self.coverage, 3),
+            "similarity": round(self.similarity, 3),
+            "matched": self.matched[:max_terms],
+            "missing": self.missing[:max_terms],
+        }
+
+    def to_prompt(self, max_terms=None):
+        """
+        Formats the result as a compact block for the resume analyzer's prompt.
+
+        Parameters:
+            max_terms (int, optional): Maximum number of matched and missing terms listed (default from
+                `ats_settings`).
+
+        Returns:
+            str: The pre-screen summary.
+        """
+        max_terms = max_terms or ats_settings["prompt_terms"]
+        return (
+            "ATS pre-screen (computed locally; use it instead of re-deriving keyword matches):\n"
+            f"Score: {self.score}/100 | keyword coverage: {self.coverage:.0%} | "
+            f"similarity: {self.similarity:.2f}\n"
+            f"Matched keywords: {', '.join(self.matched[:max_terms]) or 'none'}\n"
+            f"Missing keywords: {', '.join(self.missing[:max_terms]) or 'none'}\n"
+        )
+
+
+class JobDescriptionIndex:
+    """
+    The weighted keyword index of one job description, reused for every resume matched against it.
+
+    Attributes:
+        weights (dict): Maps each job-description term to its TF-IDF weight.
+        keywords (list): The terms ordered by weight, most important first.
+        labels (dict): Maps each term to the form it first appears in, used in the keyword lists.
+        norm (float): The Euclidean norm of the weight vector.
+    """
+
+    def __init__(self, job_description):
+        """
+        Tokenizes and weights the job description.
+
+        Parameters:
+            job_description (str): The job description text.
+        """
+        self.labels = {}
+        terms = []
+        for term, label in _terms_with_labels(job_description):
+            self.labels.setdefault(term, label)
+            terms.append(term)
+        self.weights = term_weights(terms)
+        self.keywords = sorted(self.weights, key=lambda t: (-self.weights[t], t))
+        self.norm = math.sqrt(sum(w * w for w in self.weights.values()))
+        self._total_weight = sum(self.weights.values())
+
+    def match(self, resume_text):
+        """
+        Scores a resume against the job description.
+
+        Every term counts toward coverage and similarity, but the keyword lists leave out generic terms, and
+        the missing list leaves out bigrams whose words the resume has separately (e.g., "aws s3" when both
+        "aws" and "s3" were matched).
+
+        Parameters:
+            resume_text (str): The text of the resume.
+
+        Returns:
+            MatchResult: Coverage, similarity and the matched and missing keywords.
+        """
+        resume_weights = term_weights(tokenize(resume_text))
+        matched = [t for t in self.keywords if t in resume_weights]
+        listed_matched = [self.labels[t] for t in matched if not is_generic(t)]
+        listed_missing = [
+            self.labels[t]
+            for t in self.keywords
+            if t not in resume_weights and not is_generic(t) and not _has_words(t, resume_weights)
+        ]
+        if not self._total_weight:
+            return MatchResult(0.0, 0.0, [], listed_missing)
+        coverage = sum(self.weights[t] for t in matched) / self._total_weight
+        resume_norm = math.sqrt(sum(w * w for w in resume_weights.values()))
+        dot = sum(self.weights[t] * resume_weights[t] for t in matched)
+        similarity = dot / (self.norm * resume_norm) if resume_norm else 0.0
+        return MatchResult(coverage, similarity, listed_matched, listed_missing)
+
+
+def _has_words(term, resume_weights):
+    # Whether a bigram's words each appear in the resume, even though not next to each other
+    words = term.split()
+    return len(words) > 1 and all(word in resume_weights for word in words)
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_job_description_index(job_description):
+    """
+    Returns the index of a job description, building it only the first time the text is seen.
+
+    Parameters:
+        job_description (str): The job description text.
+
+    Returns:
+        JobDescriptionIndex: The cached index.
+    """
+    key = content_key("job_description", job_description)
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = JobDescriptionIndex(job_description)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > ats_settings["index_cache_items"]:
+            _indexes.popitem(last=False)
+    return index
+
+
+def match_resume(resume_text, job_description):
+    """
+    Scores a resume against a job description using the cached job-description index.
+
+    Parameters:
+        resume_text (str): The text of the resume.
+        job_description (str): The job description text.
+
+    Returns:
+        MatchResult: Coverage, similarity and the matched and missing keywords.
+    """
+    return get_job_description_index(job_description).match(resume_text)
@@ -0,0 +1,334 @@
+"""
+Headless batch screening of many resumes against one job description.
+
+Resumes are converted in a process pool, analysed by the resume analyzer with a bounded number of model
+calls in flight, and each result is appended to a JSON-lines file as soon as it is ready. Resumes already
+analysed against the same job description in the output file are skipped, so an interrupted run can be
+restarted with the same command. Every result includes the local ATS pre-screen (see `ats_match`); with
+--rank-only the model is skipped and the resumes are only scored and ranked.
+
+Usage:
+    python batch_screen.py resumes/ --job-description job.txt --output screening.jsonl
+    python batch_screen.py resumes/ --job-description job.txt --output ranking.jsonl --rank-only
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from admission import Overloaded
+from ats_match import get_job_description_index
+from cache import content_key
+from config import batch_settings
+from logging_setup import configure_logging
+from resume_ingest import ResumeIngestor, get_resume_ingestor
+
+
+def convert_resume(data, filename):
+    """
+    Converts one resume to text (runs in a conversion worker process).
+
+    Uses the worker's ResumeIngestor, so resumes converted before (by the app or an earlier run) are read
+    from the shared cache.
+
+    Parameters:
+        data (bytes): The file contents.
+        filename (str): The file name, used by docling to detect the format.
+
+    Returns:
+        tuple: The text, the conversion time in seconds and where the text came from ("converted" or "cache").
+    """
+    start = time.perf_counter()
+    ingestor = get_resume_ingestor()
+    conversions = ingestor.conversions
+    text = ingestor.ingest(data, filename)
+    source = "converted" if ingestor.conversions > conversions else "cache"
+    return text, time.perf_counter() - start, source
+
+
+class BatchScreener:
+    """
+    Runs the resume analyzer over a batch of resumes.
+
+    Conversion and analysis overlap: as soon as a resume is converted its analysis is queued, and at most
+    `max_concurrent_llm` analyses run at once, each on its own per-session copy of the agents. In rank-only
+    mode a resume is finished as soon as it is converted and scored. Analyses run at the "batch" admission
+    priority, so interactive users go first; an analysis turned away by admission control is retried.
+
+    Attributes:
+        app (CareerCoachApp): The application whose resume analyzer is used.
+        conversion_workers (int): Number of conversion processes.
+        max_concurrent_llm (int): Maximum number of analyses in flight.
+        rank_only (bool): Whether resumes are only scored, without running the analyzer.
+        skipped (int): Resumes skipped because they were already in the output file.
+        completed (int): Resumes analysed successfully.
+        failed (int): Resumes whose conversion or analysis failed.
+    """
+
+    def __init__(self, app, conversion_workers=None, max_concurrent_llm=None, rank_only=False):
+        """
+        Initializes the screener.
+
+        Parameters:
+            app (CareerCoachApp): The application whose resume analyzer is used.
+            conversion_workers (int, optional): Number of conversion processes (default from `batch_settings`).
+            max_concurrent_llm (int, optional): Maximum number of analyses in flight (default from
+                `batch_settings`).
+            rank_only (bool): Whether to score the resumes without running the analyzer (default is False).
+        """
+        self.app = app
+        self.rank_only = rank_only
+        self.conversion_workers = conversion_workers or batch_settings["conversion_workers"]
+        self.max_concurrent_llm = max_concurrent_llm or batch_settings["max_concurrent_llm"]
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self._local = threading.local()
+
+    @staticmethod
+    def find_resumes(resume_dir, extensions=None):
+        """
+        Lists the resume files in a directory.
+
+        Parameters:
+            resume_dir (str): The directory to scan (not recursively).
+            extensions (list, optional): File extensions to include (default from `batch_settings`).
+
+        Returns:
+            list: The sorted file paths.
+        """
+        extensions = {e.lower() for e in extensions or batch_settings["extensions"]}
+        return sorted(
+            os.path.join(resume_dir, name)
+            for name in os.listdir(resume_dir)
+            if os.path.splitext(name)[1].lower() in extensions
+            and os.path.isfile(os.path.join(resume_dir, name))
+        )
+
+    @staticmethod
+    def load_completed(output_path, job_description_hash, rank_only=False):
+        """
+        Returns the resumes already analysed successfully against a job description.
+
+        Parameters:
+            output_path (str): The JSON-lines output of earlier runs (may not exist).
+            job_description_hash (str): The hash of the job description.
+            rank_only (bool): Whether scored-only results count as finished (default is False).
+
+        Returns:
+            set: The content hashes of the finished resumes.
+        """
+        completed = set()
+        if not output_path or not os.path.exists(output_path):
+            return completed
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by an interrupted run
+                    continue
+                if (
+                    record.get("status") == "ok"
+                    and record.get("job_description_hash") == job_description_hash
+                    and (rank_only or record.get("analysis") is not None)
+                ):
+                    completed.add(record["resume_hash"])
+        return completed
+
+    def run(self, paths, job_description, output_path=None):
+        """
+        Screens the given resumes, yielding each result as it finishes.
+
+        Parameters:
+            paths (list): The resume files.
+            job_description (str): The job description the resumes are compared with.
+            output_path (str, optional): JSON-lines file the results are appended to.
+
+        Yields:
+            dict: The result of one resume: file, hashes, status, error, ATS pre-screen, analysis and timings.
+        """
+        job_description_hash = content_key("job_description", job_description)
+        done = self.load_completed(output_path, job_description_hash, self.rank_only)
+        index = get_job_description_index(job_description)
+
+        conversion_pool = ProcessPoolExecutor(
+            self.conversion_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        analysis_pool = ThreadPoolExecutor(
+            self.max_concurrent_llm, thread_name_prefix="batch-analysis"
+        )
+        output = open(output_path, "a", encoding="utf-8") if output_path else None
+        conversions, analyses = {}, {}
+        try:
+            for path in paths:
+                with open(path, "rb") as f:
+                    data = f.read()
+                resume_hash = ResumeIngestor.content_hash(data)
+                if resume_hash in done:
+                    self.skipped += 1
+                    continue
+                # Guard against the same file appearing twice in one batch
+                done.add(resume_hash)
+                record = {
+                    "file": path,
+                    "resume_hash": resume_hash,
+                    "job_description_hash": job_description_hash,
+                    "status": None,
+                    "error": None,
+                    "ats": None,
+                    "analysis": None,
+                    "conversion_source": None,
+                    "timings": {},
+                    "_submitted": time.perf_counter(),
+                }
+                future = conversion_pool.submit(convert_resume, data, os.path.basename(path))
+                conversions[future] = record
+
+            while conversions or analyses:
+                finished, _ = wait(
+                    list(conversions) + list(analyses), return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    if future in conversions:
+                        record = conversions.pop(future)
+                        try:
+                            text, seconds, source = future.result()
+                        except Exception as e:
+                            logging.warning("Converting %s failed: %s", record["file"], e)
+                            yield self._finish(record, output, error=e)
+                            continue
+                        record["timings"]["conversion_seconds"] = seconds
+                        record["conversion_source"] = source
+                        record["_converted"] = time.perf_counter()
+                        match = index.match(text)
+                        record["ats"] = match.to_dict()
+                        if self.rank_only:
+                            yield self._finish(record, output)
+                            continue
+                        analyses[
+                            analysis_pool.submit(
+                                self._analyse, text, job_description, match, record
+                            )
+                        ] = record
+                    else:
+                        record = analyses.pop(future)
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logging.warning("Analysing %s failed: %s", record["file"], e)
+                            yield self._finish(record, output, error=e)
+                            continue
+                        yield self._finish(record, output)
+        finally:
+            conversion_pool.shutdown(wait=False, cancel_futures=True)
+            analysis_pool.shutdown(wait=False, cancel_futures=True)
+            if output is not None:
+                output.close()
+
+    def stats(self):
+        """
+        Returns the batch counters.
+
+        Returns:
+            dict: Completed, failed and skipped resume counts.
+        """
+        return {"completed": self.completed, "failed": self.failed, "skipped": self.skipped}
+
+    def _analyse(self, text, job_description, match, record):
+        # Agents keep per-run state, so every analysis thread gets its own copy of them. Their agno memory is
+        # cleared after every run (see `CareerCoachApp._generate`), so they do not grow over a long batch
+        app = getattr(self._local, "app", None)
+        if app is None:
+            app = self._local.app = self.app.for_session(f"batch-{uuid.uuid4()}")
+        start = time.perf_counter()
+        record["timings"]["queued_seconds"] = start - record["_converted"]
+        prompt = app.resume_prompt(text, job_description, match)
+        while True:
+            try:
+                record["analysis"] = app.generate("resume_analyzer", prompt, priority="batch")
+                break
+            except Overloaded as e:
+                # Batch analyses give way to interactive users; wait and try again
+                logging.info("Analysis of %s deferred: %s", record["file"], e.reason)
+                time.sleep(e.retry_after)
+        record["timings"]["analysis_seconds"] = time.perf_counter() - start
+
+    def _finish(self, record, output, error=None):
+        record["timings"]["total_seconds"] = time.perf_counter() - record.pop("_submitted")
+        record.pop("_converted", None)
+        if error is None:
+            record["status"] = "ok"
+            self.completed += 1
+        else:
+            record["status"] = "error"
+            record["error"] = f"{type(error).__name__}: {error}"
+            self.failed += 1
+        if output is not None:
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+        return record
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resume_dir", help="directory containing the PDF/DOCX resumes")
+    parser.add_argument("--job-description", required=True, help="text file with the job description")
+    parser.add_argument("--output", default="screening_results.jsonl", help="JSON-lines results file")
+    parser.add_argument("--workers", type=int, help="conversion processes")
+    parser.add_argument("--llm-concurrency", type=int, help="analyses in flight")
+    parser.add_argument("--rank-only", action="store_true", help="score and rank without the model")
+    parser.add_argument("--top", type=int, default=20, help="resumes listed in the final ranking")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Screens a directory of resumes from the command line, printing progress to stderr.
+    """
+    args = parse_args(argv)
+    configure_logging()
+    from registry import get_registry
+
+    with open(args.job_description, encoding="utf-8") as f:
+        job_description = f.read()
+    screener = BatchScreener(
+        get_registry().get_app(),
+        conversion_workers=args.workers,
+        max_concurrent_llm=args.llm_concurrency,
+        rank_only=args.rank_only,
+    )
+    paths = screener.find_resumes(args.resume_dir)
+    start = time.perf_counter()
+    ranking = []
+    for i, record in enumerate(
+        screener.run(paths, job_description, args.output), start=1
+    ):
+        score = record["ats"]["score"] if record["ats"] else None
+        print(
+            f"[{i}] {record['status']:5} {record['timings']['total_seconds']:7.2f}s  "
+            f"ATS {score if score is not None else '-':>5}  {record['file']}",
+            file=sys.stderr,
+        )
+        if score is not None:
+            ranking.append((score, record["file"]))
+    if ranking:
+        print("Top resumes by ATS score (this run):", file=sys.stderr)
+        for score, path in sorted(ranking, reverse=True)[: args.top]:
+            print(f"  {score:5}  {path}", file=sys.stderr)
+    stats = screener.stats()
+    print(
+        f"{stats['completed']} analysed, {stats['failed']} failed, {stats['skipped']} already done "
+        f"in {time.perf_counter() - start:.1f}s; results in {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
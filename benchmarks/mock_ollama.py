@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Words the mock model cycles through; each word is streamed as one token.
+_WORDS = (
+    "**Summary** Focus on measurable outcomes, highlight relevant skills, and tailor every section "
+    "to the target role. Next, build a weekly routine that balances learning, networking and "
+    "applications.\n- Update your resume\n- Practice interview answers\n- Reach out to two contacts\n"
+).split(" ")
+
+
+class MockOllamaServer:
+    """
+    A local stand-in for the Ollama HTTP API used by benchmarks.
+
+    The server answers `/api/chat` (streaming and non-streaming), `/api/generate`, `/api/tags` and
+    `/api/version` with synthetic text. Prefill and generation speed are simulated so latency numbers
+    respond to prompt size and output length the way a real model server does.
+
+    With `kv_cache_slots` set, the server also mimics Ollama's prompt cache: each slot remembers a prompt it
+    processed, and only the part of a new prompt after the longest prefix shared with a slot is charged
+    prefill time. A prompt that diverges from every cached one takes a free (or the least recently used)
+    slot.
+
+    Attributes:
+        tokens_per_second (float): Simulated generation speed.
+        latency_seconds (float): Fixed delay before the first token of every request.
+        prefill_seconds_per_1k_tokens (float): Additional first-token delay per 1,000 prompt tokens.
+        output_tokens (int): Number of tokens generated per request unless `num_predict` is lower.
+        kv_cache_slots (int): Number of cached prompts (0 disables prefix caching).
+        requests (int): Number of generation requests served.
+        prompt_tokens (int): Total estimated prompt tokens received.
+        cached_prompt_tokens (int): Prompt tokens served from the simulated prompt cache.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        tokens_per_second=50.0,
+        latency_seconds=0.05,
+        prefill_seconds_per_1k_tokens=0.05,
+        output_tokens=120,
+        kv_cache_slots=0,
+    ):
+        """
+        Creates the server; call `start` to begin serving.
+
+        Parameters:
+            host (str): Interface to bind (default is 127.0.0.1).
+            port (int): Port to bind, or 0 for a free port (default is 0).
+            tokens_per_second (float): Simulated generation speed (default is 50).
+            latency_seconds (float): Fixed delay before the first token (default is 0.05).
+            prefill_seconds_per_1k_tokens (float): First-token delay per 1,000 prompt tokens (default is 0.05).
+            output_tokens (int): Tokens generated per request (default is 120).
+            kv_cache_slots (int): Number of cached prompts (default is 0, no prefix caching).
+        """
+        self.tokens_per_second = tokens_per_second
+        self.latency_seconds = latency_seconds
+        self.prefill_seconds_per_1k_tokens = prefill_seconds_per_1k_tokens
+        self.output_tokens = output_tokens
+        self.kv_cache_slots = kv_cache_slots
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self._slots = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Returns the base URL of the server (suitable for OLLAMA_HOST).
+
+        Returns:
+            str: The URL, e.g. "http://127.0.0.1:54321".
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Starts serving on a background thread.
+
+        Returns:
+            MockOllamaServer: This server, for chaining.
+        """
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-ollama", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and releases its socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        """
+        Returns request counters.
+
+        Returns:
+            dict: Number of requests, total prompt tokens received and prompt tokens served from the cache.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+            }
+
+    def clear_prompt_cache(self):
+        """
+        Forgets every cached prompt, as after a server restart.
+        """
+        with self._lock:
+            self._slots.clear()
+
+    def _record(self, prompt_text):
+        # Returns the number of prompt tokens that need prefill
+        prompt_tokens = (len(prompt_text) + 3) // 4
+        cached_tokens = 0
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            if self.kv_cache_slots:
+                shared, best = max(
+                    ((len(os.path.commonprefix([cached, prompt_text])), i)
+                     for i, cached in enumerate(self._slots)),
+                    default=(0, None),
+                )
+                cached_tokens = shared // 4
+                if best is not None and shared == len(self._slots[best]):
+                    # The prompt extends the cached one: continue in that slot
+                    del self._slots[best]
+                elif len(self._slots) >= self.kv_cache_slots:
+                    # Otherwise take a new slot, evicting the least recently used prompt
+                    self._slots.pop(0)
+                self._slots.append(prompt_text)
+                self.cached_prompt_tokens += cached_tokens
+        return prompt_tokens - cached_tokens
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": "mock", "model": "mock"}]})
+                elif self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-mock"})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/chat":
+                    messages = body.get("messages", [])
+                    # Rendered like a chat template: the system message, then the tools, then the turns
+                    text = "".join(
+                        f"<{message.get('role')}>{message.get('content') or ''}"
+                        + (json.dumps(body.get("tools") or []) if i == 0 else "")
+                        for i, message in enumerate(messages)
+                    )
+                    self._generate(body, text, chat=True)
+                elif self.path == "/api/generate":
+                    self._generate(body, str(body.get("system", "")) + str(body.get("prompt", "")), chat=False)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _generate(self, body, prompt_text, chat):
+                prompt_tokens = server._record(prompt_text)
+                options = body.get("options") or {}
+                num_predict = options.get("num_predict")
+                output_tokens = server.output_tokens
+                if num_predict is not None and num_predict >= 0:
+                    output_tokens = min(output_tokens, num_predict)
+                start = time.perf_counter()
+                time.sleep(
+                    server.latency_seconds
+                    + server.prefill_seconds_per_1k_tokens * prompt_tokens / 1000
+                )
+                prefill_done = time.perf_counter()
+                tokens = [_WORDS[i % len(_WORDS)] + " " for i in range(output_tokens)]
+                delay = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+                model = body.get("model", "mock")
+
+                def chunk(content, done):
+                    now = datetime.now(timezone.utc).isoformat()
+                    payload = {"model": model, "created_at": now, "done": done}
+                    if chat:
+                        payload["message"] = {"role": "assistant", "content": content}
+                    else:
+                        payload["response"] = content
+                    if done:
+                        end = time.perf_counter()
+                        payload.update(
+                            {
+                                "done_reason": "stop",
+                                "total_duration": int((end - start) * 1e9),
+                                "prompt_eval_count": prompt_tokens,
+                                "prompt_eval_duration": int((prefill_done - start) * 1e9),
+                                "eval_count": len(tokens),
+                                "eval_duration": int((end - prefill_done) * 1e9),
+                            }
+                        )
+                    return payload
+
+                if body.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    try:
+                        for token in tokens:
+                            time.sleep(delay)
+                            self._write_chunk(json.dumps(chunk(token, False)) + "\n")
+                        self._write_chunk(json.dumps(chunk("", True)) + "\n")
+                        self._write_chunk("")
+                    except (BrokenPipeError, ConnectionResetError):
+                        # The client stopped reading (e.g., a cancelled generation)
+                        self.close_connection = True
+                else:
+                    time.sleep(delay * len(tokens))
+                    self._send_json(chunk("".join(tokens), True))
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, payload, status=200):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,559 @@
+"""
+Benchmarks every StreamlitInterface page headlessly against a local mock Ollama server.
+
+The Streamlit pages are driven with `streamlit.testing.v1.AppTest`, the model is served by
+`benchmarks.mock_ollama.MockOllamaServer` and web search by `benchmarks.stubs.FakeSearchBackend`, so the
+numbers measure the application itself with a model of known speed. Results are written as JSON so runs
+can be compared across commits.
+
+AppTest keeps global runtime state, so each simulated session runs in its own process (like a separate
+browser tab on its own server worker); all sessions share the mock server and the on-disk caches.
+
+Usage:
+    python -m benchmarks.run --sessions 4 --iterations 3 --output bench.json
+    python -m benchmarks.run --compare bench.json --output bench_new.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.mock_ollama import MockOllamaServer  # noqa: E402
+from benchmarks.stubs import (  # noqa: E402
+    SAMPLE_JOB_DESCRIPTION,
+    SAMPLE_RESUME,
+    FakeSearchBackend,
+    make_docx,
+    make_pdf,
+)
+
+FLOWS = [
+    "dashboard",
+    "resume_analysis",
+    "market_research",
+    "skills",
+    "interview",
+    "networking",
+    "ask",
+]
+
+# Agent used by each flow, for the time-to-first-token measurement.
+FLOW_AGENTS = {
+    "dashboard": "skills_developer",
+    "resume_analysis": "resume_analyzer",
+    "market_research": "market_researcher",
+    "skills": "skills_developer",
+    "interview": "interview_coach",
+    "networking": "networking_strategist",
+    "ask": "ask_career_coach",
+}
+
+COLD_START_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import career_coach, registry, jobs, tools, memory
+imported = time.perf_counter()
+registry.get_registry().get_app()
+built = time.perf_counter()
+print(json.dumps({"import_seconds": imported - start, "build_seconds": built - imported}))
+"""
+
+
+def percentile(values, fraction):
+    """
+    Returns the given percentile of a list of numbers (nearest-rank).
+
+    Parameters:
+        values (list): The measurements.
+        fraction (float): The percentile as a fraction (e.g., 0.95).
+
+    Returns:
+        float: The percentile, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(values):
+    """
+    Summarizes latency measurements.
+
+    Parameters:
+        values (list): The measurements in seconds.
+
+    Returns:
+        dict: Count, mean and p50/p95/p99.
+    """
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+    }
+
+
+def rss_mb():
+    """
+    Returns the current and peak resident set size of this process.
+
+    Returns:
+        dict: "current_mb" (None where /proc is unavailable) and "peak_mb".
+    """
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"current_mb": current, "peak_mb": peak}
+
+
+def git_commit():
+    """
+    Returns the commit the benchmark runs against.
+
+    Returns:
+        str: The commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class SessionDriver:
+    """
+    Drives the pages of one simulated user session through Streamlit's AppTest.
+    """
+
+    def __init__(self, index, timeout):
+        """
+        Starts a new headless session.
+
+        Parameters:
+            index (int): The session number, used to make prompts unique.
+            timeout (float): Maximum seconds a single script run may take.
+        """
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.timeout = timeout
+        self.at = AppTest.from_file(
+            os.path.join(REPO_ROOT, "app.py"), default_timeout=timeout
+        )
+        self.at.run()
+
+    def run_flow(self, flow, tag):
+        """
+        Runs one flow and returns its end-to-end latency.
+
+        Parameters:
+            flow (str): The flow name (one of FLOWS).
+            tag (str): A suffix making the prompts of this run unique.
+
+        Returns:
+            float: Seconds from submitting the form to the fully rendered response.
+        """
+        return getattr(self, f"_{flow}")(tag)
+
+    def _page(self, title):
+        self.at.sidebar.selectbox[0].set_value(title)
+        self.at.run()
+        self._check()
+
+    def _click(self, label):
+        button = next(b for b in self.at.button if b.label == label)
+        start = time.perf_counter()
+        button.click().run()
+        elapsed = time.perf_counter() - start
+        self._check()
+        return elapsed
+
+    def _chat(self, text):
+        start = time.perf_counter()
+        self.at.chat_input[0].set_value(text).run()
+        elapsed = time.perf_counter() - start
+        self._check()
+        return elapsed
+
+    def _check(self):
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+
+    def _dashboard(self, tag):
+        self._page("Dashboard")
+        self.at.text_input[0].input("Technology")
+        self.at.text_input[1].input(f"Software Engineer {tag}")
+        self.at.text_input[2].input("Senior Software Engineer")
+        return self._click("Generate Action Plan")
+
+    def _market_research(self, tag):
+        self._page("Job Market Research")
+        self.at.text_input[0].input(f"Data Scientist {tag}")
+        self.at.text_input[1].input("San Francisco")
+        return self._click("Research Market")
+
+    def _skills(self, tag):
+        self._page("Skills Development")
+        self.at.text_area[0].input(f"Python, SQL and machine learning {tag}")
+        return self._click("Create Learning Plan")
+
+    def _networking(self, tag):
+        self._page("Networking Strategy")
+        self.at.text_input[0].input(f"Change industries {tag}")
+        return self._click("Generate Strategy")
+
+    def _interview(self, tag):
+        self._page("Interview Preparation")
+        self.at.text_input[0].input("Backend Engineer")
+        if not self.at.chat_input:
+            self._click("Start Mock Interview")
+        return self._chat(f"I have eight years of backend experience ({tag}).")
+
+    def _ask(self, tag):
+        self._page("Ask Career Coach")
+        return self._chat(f"How do I prepare for a staff engineer promotion? ({tag})")
+
+    def _resume_analysis(self, tag):
+        # AppTest cannot upload files, so this flow calls the same ingestion and agent code the page uses.
+        from registry import get_registry
+        from resume_ingest import get_resume_ingestor
+
+        if not hasattr(self, "_resume_session"):
+            self._resume_session = {}
+        app = get_registry().session_app(self._resume_session)
+        text = f"{SAMPLE_RESUME}\nReference {tag}\n"
+        if self.index % 2:
+            data, name = make_docx(text), f"resume_{tag}.docx"
+        else:
+            data, name = make_pdf(text), f"resume_{tag}.pdf"
+        start = time.perf_counter()
+        resume_text = get_resume_ingestor().ingest(data, name)
+        app.generate("resume_analyzer", app.resume_prompt(resume_text, SAMPLE_JOB_DESCRIPTION))
+        return time.perf_counter() - start
+
+
+def measure_cold_start(env):
+    """
+    Measures import and construction time in a fresh interpreter.
+
+    Parameters:
+        env (dict): Environment of the child process (points OLLAMA_HOST at the mock server).
+
+    Returns:
+        dict: "import_seconds" and "build_seconds", or an "error" message.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SNIPPET],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1:]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_ttft(flows, iterations):
+    """
+    Measures time-to-first-token and total streaming time of each flow's agent.
+
+    Parameters:
+        flows (list): The flows whose agents are measured.
+        iterations (int): Number of prompts per agent.
+
+    Returns:
+        dict: Per-flow "ttft" and "total" latency summaries.
+    """
+    from registry import get_registry
+
+    app = get_registry().session_app({})
+    results = {}
+    for flow in flows:
+        ttfts, totals = [], []
+        for i in range(iterations):
+            prompt = f"Benchmark prompt for {flow}, run {i} at {time.time()}"
+            start = time.perf_counter()
+            first = None
+            for _ in app.stream(FLOW_AGENTS[flow], prompt):
+                if first is None:
+                    first = time.perf_counter() - start
+            totals.append(time.perf_counter() - start)
+            if first is not None:
+                ttfts.append(first)
+        results[flow] = {"ttft": summarize(ttfts), "total": summarize(totals)}
+    return results
+
+
+def measure_prompt_warm_up(server, flows):
+    """
+    Compares each agent's first time-to-first-token with a cold prompt cache and after `warm_up_prompts`.
+
+    Only meaningful when the mock server simulates a prompt cache (`--kv-cache-slots`).
+
+    Parameters:
+        server (MockOllamaServer): The mock server, whose prompt cache is cleared before each pass.
+        flows (list): The flows whose agents are measured.
+
+    Returns:
+        dict: "cold" and "warm" time-to-first-token summaries, per-agent values and the warm-up time.
+    """
+    from registry import get_registry
+
+    app = get_registry().session_app({})
+    agent_keys = sorted({FLOW_AGENTS[flow] for flow in flows})
+
+    def first_token(agent_key):
+        start = time.perf_counter()
+        for _ in app.stream(agent_key, f"Prompt cache benchmark for {agent_key} at {time.time()}"):
+            return time.perf_counter() - start
+        return None
+
+    server.clear_prompt_cache()
+    cold = {agent_key: first_token(agent_key) for agent_key in agent_keys}
+    server.clear_prompt_cache()
+    start = time.perf_counter()
+    app.warm_up_prompts(agent_keys)
+    warm_up_seconds = time.perf_counter() - start
+    warm = {agent_key: first_token(agent_key) for agent_key in agent_keys}
+    return {
+        "cold": summarize([v for v in cold.values() if v is not None]),
+        "warm": summarize([v for v in warm.values() if v is not None]),
+        "per_agent": {k: {"cold": cold[k], "warm": warm[k]} for k in agent_keys},
+        "warm_up_seconds": warm_up_seconds,
+    }
+
+
+def configure_process(cache_dir, search_latency):
+    """
+    Points the application's caches and logs at the benchmark directory and installs the fake search backend.
+
+    Must run before any application module creates its caches.
+
+    Parameters:
+        cache_dir (str): Directory for the benchmark's cache databases.
+        search_latency (float): Simulated round-trip time of a web search.
+
+    Returns:
+        FakeSearchBackend: The installed search backend.
+    """
+    import config
+
+    config.response_cache["path"] = os.path.join(cache_dir, "responses.sqlite3")
+    config.resume_cache["path"] = os.path.join(cache_dir, "resumes.sqlite3")
+    config.search_settings["cache_path"] = os.path.join(cache_dir, "search.sqlite3")
+    config.telemetry_settings["jsonl_path"] = os.path.join(cache_dir, "spans.jsonl")
+    config.logging_settings["filename"] = os.path.join(cache_dir, "career_coach_log.log")
+    # A simulated session sends requests far faster than a person would, so per-session rate limits are off
+    config.admission_settings["rate_limits"] = {}
+
+    import tools
+
+    backend = FakeSearchBackend(search_latency)
+    tools.set_search_backend(backend)
+    return backend
+
+
+def run_session(index, flows, iterations, timeout, cache_dir, search_latency):
+    """
+    Runs every flow `iterations` times in one simulated session (executed in a worker process).
+
+    Parameters:
+        index (int): The session number.
+        flows (list): The flows to run.
+        iterations (int): Number of passes over the flows.
+        timeout (float): Maximum seconds a single script run may take.
+        cache_dir (str): Directory for the benchmark's cache databases.
+        search_latency (float): Simulated round-trip time of a web search.
+
+    Returns:
+        dict: Per-flow latencies and errors, first-render time, search queries and RSS of the session.
+    """
+    backend = configure_process(cache_dir, search_latency)
+    start = time.perf_counter()
+    driver = SessionDriver(index, timeout)
+    first_render = time.perf_counter() - start
+    latencies = {flow: [] for flow in flows}
+    errors = {flow: [] for flow in flows}
+    for iteration in range(iterations):
+        for flow in flows:
+            try:
+                latencies[flow].append(driver.run_flow(flow, f"s{index}-i{iteration}"))
+            except Exception as e:
+                errors[flow].append(f"{type(e).__name__}: {e}")
+    return {
+        "first_render": first_render,
+        "latencies": latencies,
+        "errors": errors,
+        "search_queries": backend.queries,
+        "rss": rss_mb(),
+    }
+
+
+def run_load(flows, sessions, iterations, timeout, cache_dir, search_latency):
+    """
+    Runs every flow `iterations` times in each of `sessions` concurrent simulated sessions.
+
+    Parameters:
+        flows (list): The flows to run.
+        sessions (int): Number of concurrent sessions.
+        iterations (int): Number of passes over the flows per session.
+        timeout (float): Maximum seconds a single script run may take.
+        cache_dir (str): Directory for the benchmark's cache databases.
+        search_latency (float): Simulated round-trip time of a web search.
+
+    Returns:
+        dict: Per-flow latency summaries and errors, first-render time, wall time, throughput and RSS.
+    """
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(processes=sessions) as pool:
+        results = pool.starmap(
+            run_session,
+            [
+                (index, flows, iterations, timeout, cache_dir, search_latency)
+                for index in range(sessions)
+            ],
+        )
+    wall = time.perf_counter() - start
+
+    flow_stats = {}
+    for flow in flows:
+        latencies = [value for result in results for value in result["latencies"][flow]]
+        errors = [error for result in results for error in result["errors"][flow]]
+        flow_stats[flow] = dict(
+            summarize(latencies), errors=errors[:5], error_count=len(errors)
+        )
+    completed = sum(stats["count"] for stats in flow_stats.values())
+    return {
+        "sessions": sessions,
+        "first_render": summarize([result["first_render"] for result in results]),
+        "flows": flow_stats,
+        "wall_seconds": wall,
+        "completed": completed,
+        "throughput_per_second": completed / wall if wall else None,
+        "session_peak_rss_mb": max(result["rss"]["peak_mb"] for result in results),
+        "search_queries": sum(result["search_queries"] for result in results),
+    }
+
+
+def compare(current, baseline):
+    """
+    Prints the change of each flow's p50/p95 latency against a previous result file.
+
+    Parameters:
+        current (dict): The results of this run.
+        baseline (dict): The results of a previous run.
+    """
+    print(f"Comparing against {baseline.get('commit')}")
+    for flow, stats in current["load"]["flows"].items():
+        before = baseline.get("load", {}).get("flows", {}).get(flow)
+        if not before:
+            continue
+        for key in ("p50", "p95"):
+            if stats[key] is None or before.get(key) in (None, 0):
+                continue
+            change = (stats[key] - before[key]) / before[key] * 100
+            print(f"  {flow:16} {key}: {before[key]:.3f}s -> {stats[key]:.3f}s ({change:+.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=2, help="passes over the flows per session")
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=FLOWS)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.05, help="extra first-token seconds per 1k prompt tokens")
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--kv-cache-slots", type=int, default=0, help="simulated prompt-cache slots; >0 also measures prompt warm-up")
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=120.0, help="maximum seconds per script run")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs the benchmark and writes the results as JSON.
+    """
+    args = parse_args(argv)
+    server = MockOllamaServer(
+        tokens_per_second=args.tokens_per_second,
+        latency_seconds=args.latency,
+        prefill_seconds_per_1k_tokens=args.prefill_per_1k,
+        output_tokens=args.output_tokens,
+        kv_cache_slots=args.kv_cache_slots,
+    ).start()
+    os.environ["OLLAMA_HOST"] = server.url
+    cache_dir = tempfile.mkdtemp(prefix="career_coach_bench_")
+
+    cold_start = measure_cold_start(dict(os.environ))
+    load = run_load(
+        args.flows,
+        args.sessions,
+        args.iterations,
+        args.timeout,
+        cache_dir,
+        args.search_latency,
+    )
+    configure_process(cache_dir, args.search_latency)
+    ttft = measure_ttft(args.flows, max(1, args.iterations))
+    prompt_warm_up = (
+        measure_prompt_warm_up(server, args.flows) if args.kv_cache_slots else None
+    )
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": vars(args),
+        "cold_start": cold_start,
+        "load": load,
+        "streaming": ttft,
+        "prompt_warm_up": prompt_warm_up,
+        "rss": rss_mb(),
+        "mock_ollama": server.stats(),
+    }
+    server.stop()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+    for flow, stats in load["flows"].items():
+        p50 = f"{stats['p50']:.3f}s" if stats["p50"] is not None else "n/a"
+        p95 = f"{stats['p95']:.3f}s" if stats["p95"] is not None else "n/a"
+        print(f"  {flow:16} p50 {p50}  p95 {p95}  errors {stats['error_count']}")
+    if prompt_warm_up and prompt_warm_up["cold"]["p50"] is not None:
+        print(
+            f"  first-request TTFT p50: cold {prompt_warm_up['cold']['p50']:.3f}s, "
+            f"after prompt warm-up {prompt_warm_up['warm']['p50']:.3f}s"
+        )
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
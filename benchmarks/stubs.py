@@ -0,0 +1,176 @@
+import io
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+SAMPLE_RESUME = """Jane Doe
+Senior Software Engineer
+jane.doe@example.com | San Francisco, CA
+
+Summary
+Backend engineer with 8 years of experience building distributed systems in Python and Go.
+
+Experience
+Acme Corp - Senior Software Engineer (2019 - present)
+- Led the migration of the billing platform to Kubernetes, reducing infrastructure cost by 30%.
+- Designed a streaming pipeline processing 2 billion events per day with Kafka and Flink.
+- Mentored five engineers and introduced code review guidelines.
+
+Globex - Software Engineer (2016 - 2019)
+- Built REST APIs in Django serving 10 million monthly users.
+- Improved query latency by 60% through PostgreSQL indexing and caching with Redis.
+
+Skills
+Python, Go, Kubernetes, Docker, PostgreSQL, Redis, Kafka, AWS, Terraform, CI/CD
+
+Education
+B.Sc. Computer Science, State University
+"""
+
+SAMPLE_JOB_DESCRIPTION = """Staff Software Engineer, Data Platform
+We are looking for an engineer with deep experience in Python, distributed systems, stream processing
+(Kafka, Spark or Flink), cloud infrastructure (AWS or GCP), Kubernetes and Terraform. Experience leading
+projects, mentoring engineers and improving reliability and observability is required.
+"""
+
+
+class FakeSearchBackend:
+    """
+    A search backend returning canned results after a configurable delay.
+
+    It stands in for DuckDuckGo in tests and benchmarks (see `tools.set_search_backend`).
+
+    Attributes:
+        latency_seconds (float): Simulated round-trip time of a query.
+        queries (int): Number of queries served.
+    """
+
+    def __init__(self, latency_seconds=0.2):
+        """
+        Initializes the backend.
+
+        Parameters:
+            latency_seconds (float): Simulated round-trip time of a query (default is 0.2).
+        """
+        self.latency_seconds = latency_seconds
+        self.queries = 0
+
+    def search(self, query, num_results):
+        """
+        Returns `num_results` synthetic results for the query.
+
+        Parameters:
+            query (str): The search term.
+            num_results (int): The number of results to return.
+
+        Returns:
+            list: A list of dictionaries with "title", "snippet" and "link" keys.
+        """
+        self.queries += 1
+        time.sleep(self.latency_seconds)
+        return [
+            {
+                "title": f"{query} - result {i + 1}",
+                "snippet": f"Synthetic search result {i + 1} about {query}.",
+                "link": f"https://example.com/{i + 1}",
+            }
+            for i in range(num_results)
+        ]
+
+
+def make_docx(text):
+    """
+    Builds a minimal DOCX document with one paragraph per line of text.
+
+    Parameters:
+        text (str): The document text.
+
+    Returns:
+        bytes: The DOCX file contents.
+    """
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+        for line in text.splitlines()
+    )
+    files = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            "</Relationships>"
+        ),
+        "word/document.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{paragraphs}</w:body></w:document>"
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def make_pdf(text, lines_per_page=40):
+    """
+    Builds a minimal born-digital PDF with a text layer, one line of text per text line.
+
+    Parameters:
+        text (str): The document text (ASCII).
+        lines_per_page (int): Number of lines placed on each page (default is 40).
+
+    Returns:
+        bytes: The PDF file contents.
+    """
+    lines = text.splitlines() or [""]
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects = [
+        None,  # catalog, filled in below
+        None,  # page tree, filled in below
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page_lines in pages:
+        commands = ["BT", "/F1 11 Tf", "14 TL", "50 750 Td"]
+        for line in page_lines:
+            safe = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({safe}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+    output.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    )
+    return output.getvalue()
@@ -0,0 +1,405 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """
+    Normalizes a prompt so that trivially different inputs share a cache entry.
+
+    Whitespace runs are collapsed and the text is case-folded, so "Data Scientist " and "data scientist"
+    map to the same key.
+
+    Parameters:
+        prompt (str): The prompt to normalize.
+
+    Returns:
+        str: The normalized prompt.
+    """
+    return " ".join(prompt.split()).casefold()
+
+
+def content_key(*parts):
+    """
+    Builds a content-addressed cache key from JSON-serializable parts.
+
+    Parameters:
+        *parts: The values that identify the cached content.
+
+    Returns:
+        str: The SHA-256 hex digest of the serialized parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    A thread-safe in-memory cache with per-entry expiry and LRU eviction by entry count.
+
+    It exposes the same `get`/`set`/`stats` interface as DiskCache so the two can be swapped.
+
+    Attributes:
+        ttl_seconds (float): Lifetime of an entry in seconds, or None to never expire.
+        max_entries (int): Maximum number of entries kept.
+        hits (int): Number of successful lookups.
+        misses (int): Number of lookups that found no valid entry.
+    """
+
+    def __init__(self, ttl_seconds=None, max_entries=1024):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+            ttl_seconds (float, optional): Lifetime of an entry in seconds.
+            max_entries (int): Maximum number of entries kept (default is 1024).
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Looks up a value and marks it as recently used.
+
+        Parameters:
+            key (str): The cache key.
+
+        Returns:
+            Any: The cached value, or None if it is missing or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if now - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries beyond `max_entries`.
+
+        Parameters:
+            key (str): The cache key.
+            value (Any): The value to store.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns usage statistics for the cache.
+
+        Returns:
+            dict: The number of entries, hits, misses and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class DiskCache:
+    """
+    A persistent key/value cache stored in a SQLite database.
+
+    Entries expire after a time-to-live and the least recently used entries are evicted once the total
+    size of the stored values exceeds a byte budget. The database is opened in WAL mode so several
+    processes can share the same file.
+
+    A hit only records the access time if the recorded one is older than `touch_seconds`, so most reads
+    do not write (and do not wait for the database's write lock); recency is tracked at that granularity.
+
+    Attributes:
+        path (str): Location of the SQLite database.
+        ttl_seconds (float): Lifetime of an entry in seconds, or None to never expire.
+        max_bytes (int): Maximum total size of the stored values, or None for no limit.
+        touch_seconds (float): Minimum age of the recorded access time before a hit updates it.
+        hits (int): Number of successful lookups.
+        misses (int): Number of lookups that found no valid entry.
+    """
+
+    def __init__(self, path, ttl_seconds=None, max_bytes=None, touch_seconds=None):
+        """
+        Opens (and creates if needed) the cache database.
+
+        Parameters:
+            path (str): Location of the SQLite database file.
+            ttl_seconds (float, optional): Lifetime of an entry in seconds.
+            max_bytes (int, optional): Maximum total size of the stored values in bytes.
+            touch_seconds (float, optional): Minimum age of the recorded access time before a hit updates it
+                (default is a tenth of the TTL, or 60 seconds without one).
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        if touch_seconds is None:
+            touch_seconds = ttl_seconds / 10 if ttl_seconds else 60
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this is still crash-safe and saves an fsync per write, which matters with many writers
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Looks up a value and marks it as recently used (see `touch_seconds`).
+
+        Parameters:
+            key (str): The cache key.
+
+        Returns:
+            str: The cached value, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[2] >= self.touch_seconds:
+                self._conn.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting least recently used entries if the cache grows past its size limit.
+
+        Parameters:
+            key (str): The cache key.
+            value (str): The value to store.
+        """
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Returns usage statistics for the cache.
+
+        Returns:
+            dict: The number of entries, total stored bytes, hits, misses and hit rate.
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _expired(self, created, now):
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def _evict(self, now):
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,)
+            )
+        if self.max_bytes is None:
+            return
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            logging.debug("Evicted cache entry %s", key)
+            if total <= self.max_bytes:
+                break
+
+
+class ResponseCache:
+    """
+    A content-addressed cache for complete agent responses.
+
+    Responses are keyed on the agent name, the model name, the agent's system prompt and the
+    normalized user prompt, so changing any of them naturally invalidates old entries. Caching can be
+    enabled or disabled per agent.
+
+    Attributes:
+        store (DiskCache): The persistent storage for the responses.
+        enabled_agents (dict): Maps agent keys to whether their responses are cached.
+        hits (dict): Number of cache hits per agent.
+        misses (dict): Number of cache misses per agent.
+    """
+
+    def __init__(self, store, enabled_agents):
+        """
+        Initializes the response cache.
+
+        Parameters:
+            store (DiskCache): The persistent storage for the responses.
+            enabled_agents (dict): Maps agent keys to whether their responses are cached.
+        """
+        self.store = store
+        self.enabled_agents = enabled_agents
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings):
+        """
+        Builds a response cache from the `response_cache` settings in `config.py`.
+
+        Parameters:
+            settings (dict): The cache settings (path, ttl_seconds, max_bytes, agents).
+
+        Returns:
+            ResponseCache: The configured cache.
+        """
+        store = DiskCache(
+            settings["path"],
+            ttl_seconds=settings.get("ttl_seconds"),
+            max_bytes=settings.get("max_bytes"),
+        )
+        return cls(store, settings.get("agents", {}))
+
+    def enabled_for(self, agent_key):
+        """
+        Returns whether responses of the given agent are cached.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "market_researcher").
+
+        Returns:
+            bool: True if caching is enabled for the agent.
+        """
+        return bool(self.enabled_agents.get(agent_key, False))
+
+    @staticmethod
+    def key(agent_name, model_id, prompt_config, prompt):
+        """
+        Builds the cache key for a response.
+
+        Parameters:
+            agent_name (str): The name of the agent.
+            model_id (str): The name of the model generating the response.
+            prompt_config (str): The agent's precompiled system prompt (see `career_coach.system_prompt`), so a
+                changed description or instructions invalidates its cached responses.
+            prompt (str): The user prompt.
+
+        Returns:
+            str: The content-addressed cache key.
+        """
+        return content_key(agent_name, model_id, prompt_config, normalize_prompt(prompt))
+
+    def get(self, agent_key, key):
+        """
+        Looks up a cached response and updates the per-agent counters.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent.
+            key (str): The cache key built by `ResponseCache.key`.
+
+        Returns:
+            str: The cached response, or None on a miss.
+        """
+        value = self.store.get(key)
+        counters = self.misses if value is None else self.hits
+        with self._lock:
+            counters[agent_key] = counters.get(agent_key, 0) + 1
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a response.
+
+        Parameters:
+            key (str): The cache key built by `ResponseCache.key`.
+            value (str): The complete response text.
+        """
+        self.store.set(key, value)
+
+    def stats(self):
+        """
+        Returns per-agent hit/miss counters along with the storage statistics.
+
+        Returns:
+            dict: The storage statistics plus "hits_by_agent" and "misses_by_agent".
+        """
+        stats = self.store.stats()
+        with self._lock:
+            stats["hits_by_agent"] = dict(self.hits)
+            stats["misses_by_agent"] = dict(self.misses)
+        return stats
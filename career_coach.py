@@ -1,16 +1,76 @@
+import contextlib
+import copy
+import functools
 import logging
+import threading
 import time
 from textwrap import dedent
-from agno.agent import Agent
-from agno.models.ollama import Ollama
-from config import model_name, agent_prompts
+from admission import get_admission_controller
+from ats_match import match_resume
+from cache import ResponseCache
+from concurrency import SingleFlight
+from config import (
+    model_name,
+    model_settings,
+    model_options,
+    agent_models,
+    model_routing,
+    agent_prompts,
+    ats_settings,
+    compaction_settings,
+    response_cache,
+    coalescing_settings,
+    admission_settings,
+)
+from logging_setup import PromptPreview
+from memory import estimate_tokens
+from model_backends import get_endpoint_pool, pooled_ollama
+from resume_compaction import compact_job_description, compact_resume
+from telemetry import get_telemetry, span
 from tools import DuckDuckGoTools
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(module)s - %(asctime)s - %(levelname)s - %(funcName)s - %(lineno)d - %(message)s",
-    filename="career_coach_log.log",
-)
+# Maps each agent attribute of CareerCoachApp to its display name and its entry in `agent_prompts`.
+AGENT_SPECS = {
+    "resume_analyzer": ("ResumeAnalyzer", "resume_analysis"),
+    "market_researcher": ("MarketResearcher", "job_market_research"),
+    "skills_developer": ("SkillsDeveloper", "skills_development"),
+    "interview_coach": ("InterviewCoach", "interview_coach"),
+    "networking_strategist": ("NetworkingStrategist", "networking_strategist"),
+    "ask_career_coach": ("AskCareerCoach", "ask_career_coach"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def system_prompt(prompt_key):
+    """
+    Returns the system prompt of an agent, built once per process.
+
+    The text is assembled by agno itself, from the agent's description and instructions with markdown
+    formatting enabled, exactly as agno would on every run: description, instructions, the markdown note and
+    anything the model class adds. The description is dedented and stripped of trailing whitespace first,
+    so the same configuration always yields byte-identical text. Every request of an agent therefore starts
+    with the same prefix, which lets Ollama reuse the prompt cache it has for it.
+
+    Parameters:
+        prompt_key (str): The entry in `agent_prompts` (e.g., "resume_analysis").
+
+    Returns:
+        str: The system prompt.
+    """
+    from agno.agent import Agent
+    from agno.models.ollama import Ollama
+
+    prompt = agent_prompts[prompt_key]
+    description = "\n".join(
+        line.rstrip() for line in dedent(prompt["description"]).strip().splitlines()
+    )
+    agent = Agent(
+        model=Ollama(id=model_name),
+        description=description,
+        instructions=[instruction.strip() for instruction in prompt["instructions"]],
+        markdown=True,
+    )
+    return agent.get_system_message().content
 
 
 class CareerCoachApp:
@@ -20,10 +80,23 @@ class CareerCoachApp:
     This class initializes the underlying language model (Ollama) and sets up specialized agents
     for various career-related tasks such as resume analysis, job market research, skills development,
     interview preparation, networking strategies, and general career advice. It also provides a utility
-    method to generate responses in a streaming format for interactive user experiences.
+    method to stream responses token by token for interactive user experiences.
+
+    agno is imported when the application is first built rather than at module import, so importing this
+    module is cheap.
 
     Attributes:
-        llama_model (Ollama): An instance of the Ollama language model used by all agents.
+        llama_model (Ollama): The default language model (`model_name` with `model_options`).
+        endpoint_pool (EndpointPool): The Ollama servers shared by all agents (see `model_backends`).
+        agent_models (dict): Maps each agent key to its model, with the agent's options and pinned endpoints.
+        small_models (dict): Maps each agent key subject to size-based routing to its small model.
+        small_agents (dict): Maps each agent key subject to size-based routing to its small-model agent.
+        agent_locks (dict): Maps the id of each agent to the lock its runs take, one run at a time.
+        search_tools (DuckDuckGoTools): Web search tools shared by all agents.
+        response_cache (ResponseCache): Persistent cache for the one-shot generators.
+        single_flight (SingleFlight): The in-flight generations identical requests can share.
+        admission (AdmissionController): Limits and queues generations, or None if admission control is off.
+        session_id (str): The user session of a per-session view (see `for_session`), or None.
         resume_analyzer (Agent): Agent for analyzing resumes and providing feedback.
         market_researcher (Agent): Agent for researching job markets and providing insights.
         skills_developer (Agent): Agent for creating personalized skills development plans.
@@ -39,41 +112,456 @@ class CareerCoachApp:
         - Sets up agents for specific career-related tasks using predefined prompts and tools.
         """
         logging.debug("Initializing Ollama model...")
-        self.llama_model = Ollama(id=model_name)
+        self.endpoint_pool = get_endpoint_pool()
+        self.llama_model = pooled_ollama(
+            self.endpoint_pool,
+            id=model_name,
+            keep_alive=model_settings["keep_alive"],
+            options=dict(model_options),
+        )
+        self.agent_models = {
+            agent_key: self.build_model(agent_key) for agent_key in AGENT_SPECS
+        }
+        self.small_models = {}
+        if model_routing["enabled"]:
+            self.small_models = {
+                agent_key: self.build_model(agent_key, model_routing["small_model"])
+                for agent_key in model_routing["agents"]
+            }
+        self.response_cache = ResponseCache.from_config(response_cache)
+        self.single_flight = SingleFlight()
+        self.admission = (
+            get_admission_controller() if admission_settings["enabled"] else None
+        )
+        self.session_id = None
         self.setup_agents()
 
     @staticmethod
-    def response_generator(agent, prompt):
+    def response_generator(agent, prompt, stream=True):
         """
         Generates a streaming response from the given agent for the specified prompt.
 
-        This method splits the response into words and yields them one by one to simulate real-time interaction.
-        It introduces small delays between words and lines to enhance the user experience.
+        When streaming, the model's incremental deltas are passed through as soon as Ollama produces them,
+        so the time until the user sees the first words is the model's time-to-first-token. With streaming
+        disabled, the complete response is yielded as a single chunk once generation has finished.
 
         Parameters:
             agent (Agent): The agent responsible for generating the response.
             prompt (str): The input prompt for which the response is generated.
+            stream (bool): Whether to stream the model's deltas (default is True).
 
         Yields:
-            str: A word or line of the response.
-        """
-        logging.debug(f"Generating response for '{prompt}'")
-        response = agent.run(prompt, stream=False)
-        response = str(response.content)
-        lines = response.split("\n")
-        for line in lines:
-            for word in line.split():
-                yield word + " "
-                time.sleep(0.01)
-            yield "\n"
-            time.sleep(0.01)
+            str: A chunk of the response.
+        """
+        logging.debug("Generating response for %s", PromptPreview(prompt))
+        if not stream:
+            response = agent.run(prompt, stream=False)
+            yield str(response.content)
+        else:
+            for chunk in agent.run(prompt, stream=True):
+                if chunk.content:
+                    yield chunk.content
         logging.debug("Response generation complete")
 
+    def stream(self, agent_key, prompt, priority=None, on_queued=None):
+        """
+        Streams an agent's response, using the response cache when enabled for the agent.
+
+        Short prompts go to the agent's small-model twin when size-based routing is enabled (see
+        `select_agent`).
+
+        A cached response is yielded as a single chunk. Otherwise the model's deltas are yielded as they
+        arrive and the complete response is cached once generation has finished; a generation stopped early
+        (e.g., a cancelled job) is never cached. Identical prompts to the same agent and model that arrive
+        while a generation is running share it (see `SingleFlight.subscribe`) instead of starting their own.
+
+        Each call is recorded as a "generation" span with the time to the first chunk (prefill, including
+        any tool calls), the decode time, the token counts reported by the model (estimated from the text
+        when unavailable) and the decode speed in tokens per second. Calls that shared another call's
+        generation are marked `coalesced` and carry no token counts.
+
+        A generation waits for any other run of the same agent to finish, since agno keeps per-run state on the
+        agent, and only starts once the admission controller gives it a slot (see `admission`); the time
+        spent waiting is recorded as `queued_seconds`.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "market_researcher").
+            prompt (str): The input prompt.
+            priority (str, optional): The admission priority class (default from
+                `admission_settings["agent_priorities"]`).
+            on_queued (callable, optional): Called with the admission Ticket if the generation has to wait.
+
+        Yields:
+            str: A chunk of the response.
+
+        Raises:
+            Overloaded: If admission control rejects the generation.
+        """
+        agent = self.select_agent(agent_key, prompt)
+        span = get_telemetry().start_span(
+            "generation", agent=agent_key, model=agent.model.id, cached=False
+        )
+        _, prompt_key = AGENT_SPECS[agent_key]
+        key = ResponseCache.key(agent.name, agent.model.id, system_prompt(prompt_key), prompt)
+        use_cache = self.response_cache.enabled_for(agent_key)
+        if use_cache:
+            cached = self.response_cache.get(agent_key, key)
+            if cached is not None:
+                logging.debug("Response cache hit for %s", agent.name)
+                span.set(cached=True)
+                span.finish()
+                yield cached
+                return
+
+        chunks = []
+        start = time.perf_counter()
+        first_chunk = None
+        error = None
+        coalesced = False
+        try:
+            generation = self._generate(
+                agent,
+                prompt,
+                key if use_cache else None,
+                priority or self.agent_priority(agent_key),
+                on_queued,
+                span,
+            )
+            if coalescing_settings["enabled"]:
+                generation, coalesced = self.single_flight.subscribe(
+                    key, functools.partial(iter, generation)
+                )
+            for chunk in generation:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            span.set(closed_early=True)
+            generation.close()
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._finish_generation_span(
+                span, prompt, chunks, start, first_chunk, error, coalesced
+            )
+
+    @staticmethod
+    def agent_priority(agent_key):
+        """
+        Returns the admission priority class of an agent's requests.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent.
+
+        Returns:
+            str: The priority class from `admission_settings`.
+        """
+        return admission_settings["agent_priorities"].get(
+            agent_key, admission_settings["default_priority"]
+        )
+
+    def _generate(self, agent, prompt, cache_key, priority, on_queued, span):
+        # Runs the agent once admitted, records the token counts the model reported and caches the complete
+        # response under `cache_key`, if given. agno keeps the run response and tool state on the agent, so
+        # jobs of one session that use the same agent (e.g., the action plan and the learning plan) run one
+        # after the other; the agent lock is taken before the admission slot so a waiting run holds no slot.
+        # agno also appends every run to the agent's memory, which nothing reads (conversations are kept in
+        # ConversationMemory), so it is cleared after each run; otherwise a long-lived session agent would
+        # grow by a prompt and a response per run
+        if self.admission is None:
+            admitted = contextlib.nullcontext()
+        else:
+            admitted = self.admission.slot(priority, self.session_id, on_queued)
+        queued = time.perf_counter()
+        with self.agent_locks[id(agent)], admitted:
+            span.set(queued_seconds=round(time.perf_counter() - queued, 4))
+            chunks = []
+            try:
+                for chunk in self.response_generator(agent, prompt):
+                    chunks.append(chunk)
+                    yield chunk
+                span.set(**self._run_tokens(agent))
+            finally:
+                agent.memory.clear()
+        if cache_key is not None:
+            self.response_cache.set(cache_key, "".join(chunks))
+
+    @staticmethod
+    def _run_tokens(agent):
+        # The token counts agno recorded for the agent's last run, summed over its model calls
+        metrics = getattr(agent.run_response, "metrics", None) or {}
+
+        def total(name):
+            value = metrics.get(name)
+            if isinstance(value, list):
+                value = sum(v for v in value if v)
+            return value or None
+
+        return {
+            "input_tokens": total("input_tokens"),
+            "output_tokens": total("output_tokens"),
+        }
+
+    @staticmethod
+    def _finish_generation_span(
+        span, prompt, chunks, start, first_chunk, error, coalesced=False
+    ):
+        # A coalesced call did not run the model, so it has no token counts of its own. Otherwise the counts
+        # were recorded by `_generate` when the run completed, and are estimated from the text when missing
+        end = time.perf_counter()
+        prefill_seconds = (first_chunk or end) - start
+        decode_seconds = end - first_chunk if first_chunk else 0.0
+        span.set(
+            chunks=len(chunks),
+            prefill_seconds=round(prefill_seconds, 4),
+            decode_seconds=round(decode_seconds, 4),
+        )
+        if coalesced:
+            span.set(coalesced=True)
+            span.finish(error)
+            return
+        input_tokens = span.attributes.get("input_tokens")
+        output_tokens = span.attributes.get("output_tokens")
+        estimated = output_tokens is None
+        if estimated:
+            input_tokens = estimate_tokens(prompt)
+            output_tokens = estimate_tokens("".join(chunks))
+        span.set(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            tokens_estimated=estimated,
+            tokens_per_second=(
+                round(output_tokens / decode_seconds, 2) if decode_seconds > 0 else None
+            ),
+        )
+        span.finish(error)
+
+    @staticmethod
+    def resume_prompt(resume_text, job_description=None, match=None):
+        """
+        Builds the prompt sent to the resume analyzer.
+
+        When a job description is given, the local ATS pre-screen (keyword coverage, similarity and missing
+        keywords, see `ats_match`) is appended so the model can build on it instead of matching keywords itself.
+        The pre-screen uses the full texts; the texts in the prompt are compacted (see `resume_compaction`)
+        when `compaction_settings` is enabled, and the token counts before and after are recorded in a
+        "compaction" span.
+
+        Parameters:
+            resume_text (str): The text of the resume.
+            job_description (str, optional): The job description to compare the resume with.
+            match (MatchResult, optional): A pre-screen already computed for this resume and job description.
+
+        Returns:
+            str: The analysis prompt.
+        """
+        if job_description and ats_settings["enabled"]:
+            match = match or match_resume(resume_text, job_description)
+        else:
+            match = None
+        if compaction_settings["enabled"]:
+            with span("compaction") as compaction_span:
+                resume = compact_resume(resume_text, job_description)
+                tokens_before, tokens_after = resume.tokens_before, resume.tokens_after
+                resume_text = resume.text
+                if job_description:
+                    description = compact_job_description(job_description)
+                    tokens_before += description.tokens_before
+                    tokens_after += description.tokens_after
+                    job_description = description.text
+                compaction_span.set(
+                    tokens_before=tokens_before,
+                    tokens_after=tokens_after,
+                    sections_dropped=len(resume.sections_dropped),
+                )
+            logging.info(
+                "Compacted resume analysis input from %d to %d tokens (dropped sections: %s)",
+                tokens_before,
+                tokens_after,
+                ", ".join(resume.sections_dropped) or "none",
+            )
+        prompt = f"Analyze this resume:\n{resume_text}\n"
+        if not job_description:
+            return prompt
+        prompt += f"Compare with job description:\n{job_description}\n"
+        if match is not None:
+            prompt += match.to_prompt()
+        return prompt
+
+    @staticmethod
+    def action_plan_prompt(industry, experience, current_role, target_role):
+        """
+        Builds the prompt for the Dashboard's weekly action plan (run by the skills developer).
+
+        Parameters:
+            industry (str): The user's industry.
+            experience (int): Years of experience.
+            current_role (str): The user's current role.
+            target_role (str): The role the user is aiming for.
+
+        Returns:
+            str: The action plan prompt.
+        """
+        return (
+            f"Create a weekly action plan for a {current_role} targeting {target_role} role "
+            f"in {industry} with {experience} years of experience. Format document as a clear markdown document with headers and subheaders"
+        )
+
+    @staticmethod
+    def market_research_prompt(role, location):
+        """
+        Builds the prompt sent to the market researcher.
+
+        Parameters:
+            role (str): The job title.
+            location (str): The location to research.
+
+        Returns:
+            str: The market research prompt.
+        """
+        return (
+            f"Research the job market for {role} in {location}. "
+            "Include salary ranges, required skills, and market demand. Format document as a clear markdown document with headers and subheaders"
+        )
+
+    @staticmethod
+    def learning_plan_prompt(target_skills, timeframe):
+        """
+        Builds the prompt for a learning plan (run by the skills developer).
+
+        Parameters:
+            target_skills (str): The skills the user wants to develop.
+            timeframe (int): The learning timeframe in months.
+
+        Returns:
+            str: The learning plan prompt.
+        """
+        return f"Create a {timeframe}-month learning plan for: {target_skills}. Format document as a clear markdown document with headers and subheaders"
+
+    @staticmethod
+    def networking_prompt(goal, platform):
+        """
+        Builds the prompt sent to the networking strategist.
+
+        Parameters:
+            goal (str): The user's networking goal.
+            platform (str): The platform to focus on (e.g., "LinkedIn").
+
+        Returns:
+            str: The networking strategy prompt.
+        """
+        return f"Create a networking strategy for {goal} focusing on {platform}. Format document as a clear markdown document with headers and subheaders"
+
+    @staticmethod
+    def interview_header(position, question_type):
+        """
+        Builds the fixed header of a mock interview's conversation memory.
+
+        Parameters:
+            position (str): The position the user is interviewing for.
+            question_type (str): The question type (e.g., "Technical").
+
+        Returns:
+            str: The header.
+        """
+        return (
+            f"You are conducting a mock interview for a {position} position. "
+            f"The question type is {question_type}. "
+        )
+
+    @staticmethod
+    def interview_prompt(memory):
+        """
+        Builds the interview coach's prompt from the interview memory, whose last turn is the user's answer.
+
+        Parameters:
+            memory (ConversationMemory): The interview conversation.
+
+        Returns:
+            str: The prompt asking for feedback and the next question.
+        """
+        return (
+            memory.render()
+            + "Based on the user's latest response, provide feedback and ask the next question. "
+            "If this is the final question, provide a final assessment."
+        )
+
+    @staticmethod
+    def ask_prompt(memory):
+        """
+        Builds the Ask Career Coach prompt from the conversation memory, whose last turn is the user's message.
+
+        Parameters:
+            memory (ConversationMemory): The conversation.
+
+        Returns:
+            str: The prompt.
+        """
+        return memory.render() + "Respond to the user's latest message."
+
+    def analyze_resumes(
+        self,
+        resume_dir,
+        job_description,
+        output_path=None,
+        conversion_workers=None,
+        max_concurrent_llm=None,
+        rank_only=False,
+    ):
+        """
+        Screens every resume in a directory against one job description (see `batch_screen.BatchScreener`).
+
+        Documents are converted in a process pool and analysed with a bounded number of concurrent model
+        calls. Results are yielded, and appended to `output_path` as JSON lines, as they finish; resumes
+        already analysed in `output_path` are skipped, so an interrupted run can be resumed. Every result
+        carries the local ATS pre-screen; with `rank_only` the model is not called at all.
+
+        Parameters:
+            resume_dir (str): Directory containing the PDF/DOCX resumes.
+            job_description (str): The job description the resumes are compared with.
+            output_path (str, optional): JSON-lines file the results are appended to.
+            conversion_workers (int, optional): Number of conversion processes (default from `batch_settings`).
+            max_concurrent_llm (int, optional): Maximum number of analyses in flight (default from
+                `batch_settings`).
+            rank_only (bool): Whether to score the resumes without running the analyzer (default is False).
+
+        Yields:
+            dict: The result of one resume, including per-stage timings.
+        """
+        from batch_screen import BatchScreener
+
+        screener = BatchScreener(
+            self,
+            conversion_workers=conversion_workers,
+            max_concurrent_llm=max_concurrent_llm,
+            rank_only=rank_only,
+        )
+        return screener.run(
+            screener.find_resumes(resume_dir), job_description, output_path
+        )
+
+    def generate(self, agent_key, prompt, priority=None):
+        """
+        Runs an agent to completion and returns its response, using the response cache when enabled.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "market_researcher").
+            prompt (str): The input prompt.
+            priority (str, optional): The admission priority class (default from `admission_settings`).
+
+        Returns:
+            str: The complete response text.
+        """
+        return "".join(self.stream(agent_key, prompt, priority))
+
     def setup_agents(self):
         """
         Configures specialized agents for various career-related tasks.
 
-        Each agent is initialized with the Ollama language model, a description, instructions, and tools.
+        Each agent is initialized with the Ollama language model, its compiled system prompt, and tools.
         The agents are designed to handle specific tasks such as resume analysis, job market research,
         skills development, interview preparation, networking strategies, and general career advice.
 
@@ -86,60 +574,170 @@ class CareerCoachApp:
             - ask_career_coach: Answers open-ended career-related questions.
 
         Tools:
-            - DuckDuckGoTools: Used by agents to fetch external data when needed.
+            - DuckDuckGoTools: Used by agents to fetch external data when needed. A single instance is shared by all agents,
+              which call its `search_web` and `search_many` methods as tools.
         """
         logging.debug("Setting up agents...")
+        self.search_tools = DuckDuckGoTools()
+        self._set_agents()
 
-        self.resume_analyzer = Agent(
-            name="ResumeAnalyzer",
-            model=self.llama_model,
-            description=dedent(agent_prompts["resume_analysis"]["description"]),
-            instructions=agent_prompts["resume_analysis"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
-        )
+    def build_model(self, agent_key, model_id=None):
+        """
+        Builds the model an agent runs on from `agent_models`, `model_options` and its pinned endpoints.
 
-        self.market_researcher = Agent(
-            name="MarketResearcher",
-            model=self.llama_model,
-            description=dedent(agent_prompts["job_market_research"]["description"]),
-            instructions=agent_prompts["job_market_research"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
-        )
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "resume_analyzer").
+            model_id (str, optional): The model to use instead of the agent's configured model.
 
-        self.skills_developer = Agent(
-            name="SkillsDeveloper",
-            model=self.llama_model,
-            description=dedent(agent_prompts["skills_development"]["description"]),
-            instructions=agent_prompts["skills_development"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
+        Returns:
+            PooledOllama: The model, routed over the application's endpoint pool.
+        """
+        overrides = agent_models.get(agent_key, {})
+        return pooled_ollama(
+            self.endpoint_pool,
+            id=model_id or overrides.get("model", model_name),
+            keep_alive=model_settings["keep_alive"],
+            options={**model_options, **overrides.get("options", {})},
+            preferred_hosts=model_settings["pins"].get(agent_key),
         )
 
-        self.interview_coach = Agent(
-            name="InterviewCoach",
-            model=self.llama_model,
-            description=dedent(agent_prompts["interview_coach"]["description"]),
-            instructions=agent_prompts["interview_coach"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
-        )
+    def select_agent(self, agent_key, prompt):
+        """
+        Returns the agent that answers a prompt, applying size-based routing.
+
+        When `model_routing` is enabled for the agent and the prompt is estimated at no more than
+        `max_prompt_tokens`, the agent's small-model twin answers it; otherwise the agent itself does. Every
+        decision for a routed agent is logged.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "interview_coach").
+            prompt (str): The input prompt.
 
-        self.networking_strategist = Agent(
-            name="NetworkingStrategist",
-            model=self.llama_model,
-            description=dedent(agent_prompts["networking_strategist"]["description"]),
-            instructions=agent_prompts["networking_strategist"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
+        Returns:
+            Agent: The agent to run.
+        """
+        agent = getattr(self, agent_key)
+        small_agent = self.small_agents.get(agent_key)
+        if small_agent is None:
+            return agent
+        tokens = estimate_tokens(prompt)
+        if tokens <= model_routing["max_prompt_tokens"]:
+            agent = small_agent
+        logging.info(
+            "Routing %s prompt (~%d tokens) to %s", agent_key, tokens, agent.model.id
         )
+        return agent
+
+    def build_agent(self, agent_key, session_id=None, model=None):
+        """
+        Builds a single specialized agent from its entry in `AGENT_SPECS`.
+
+        The agent shares the application's search tools and endpoint pool, so building one is cheap compared
+        to constructing a whole CareerCoachApp. It gets its own shallow copy of the model, since agno keeps
+        per-run tool state on the model and agents of different sessions run concurrently. Its system prompt
+        is the one agno assembles from the agent's description and instructions, precompiled by
+        `system_prompt` so agno does not rebuild it on every run.
 
-        self.ask_career_coach = Agent(
-            name="AskCareerCoach",
-            model=self.llama_model,
-            description=dedent(agent_prompts["ask_career_coach"]["description"]),
-            instructions=agent_prompts["ask_career_coach"]["instructions"],
-            tools=[DuckDuckGoTools()],
-            markdown=True,
+        Parameters:
+            agent_key (str): The attribute name of the agent (e.g., "resume_analyzer").
+            session_id (str, optional): The user session the agent belongs to.
+            model (Ollama, optional): The model to use instead of the agent's model in `agent_models`.
+
+        Returns:
+            Agent: The configured agent.
+        """
+        from agno.agent import Agent
+
+        name, prompt_key = AGENT_SPECS[agent_key]
+        # agno sets the model's _tools, _functions and _function_call_stack on every run
+        model = copy.copy(model or self.agent_models[agent_key])
+        model.clear()
+        model.set_tools(None)
+        return Agent(
+            name=name,
+            model=model,
+            session_id=session_id,
+            system_message=system_prompt(prompt_key),
+            tools=[self.search_tools.search_web, self.search_tools.search_many],
         )
+
+    def warm_up_prompts(self, agent_keys=None):
+        """
+        Primes Ollama's prompt cache with each agent's fixed prefix and keeps the model loaded.
+
+        Every agent runs once with a one-token reply, sending exactly the system prompt and tool definitions
+        its real requests start with, with `keep_alive` set so the model stays in memory. Each agent is warmed
+        up with each of its models on every endpoint it can be routed to: its pinned endpoints, or all of them.
+        Ollama keeps one cached prompt per parallel slot, so set OLLAMA_NUM_PARALLEL to at least the number of
+        agents warmed up for all of them to stay cached.
+
+        Parameters:
+            agent_keys (list, optional): The agents to warm up (default is all agents).
+
+        Returns:
+            dict: Seconds spent on each agent, summed over its models and endpoints.
+        """
+        timings = {}
+        for agent_key in agent_keys or AGENT_SPECS:
+            agent_model = self.agent_models[agent_key]
+            hosts = agent_model.preferred_hosts or [
+                endpoint.host for endpoint in self.endpoint_pool.endpoints
+            ]
+            model_ids = [agent_model.id]
+            if agent_key in self.small_models:
+                model_ids.append(self.small_models[agent_key].id)
+            start = time.perf_counter()
+            for model_id in model_ids:
+                for host in hosts:
+                    model = pooled_ollama(
+                        self.endpoint_pool,
+                        id=model_id,
+                        keep_alive=model_settings["keep_alive"],
+                        options={**agent_model.options, "num_predict": 1},
+                        preferred_hosts=[host],
+                    )
+                    try:
+                        self.build_agent(agent_key, model=model).run("Hello", stream=False)
+                    except Exception as e:
+                        logging.warning(
+                            "Prompt warm-up failed for %s (%s) on %s: %s",
+                            agent_key,
+                            model_id,
+                            host,
+                            e,
+                        )
+            timings[agent_key] = time.perf_counter() - start
+        return timings
+
+    def for_session(self, session_id):
+        """
+        Returns a view of the application with agents owned by a single user session.
+
+        The model settings, endpoint pool and tools are shared with this instance, while each agent is
+        rebuilt with its own copy of its model so that per-run state (run responses, memory, session id, tool
+        calls) is never shared between users.
+
+        Parameters:
+            session_id (str): The identifier of the user session.
+
+        Returns:
+            CareerCoachApp: A shallow copy of this application with per-session agents.
+        """
+        logging.debug("Creating agents for session %s", session_id)
+        session_app = copy.copy(self)
+        session_app.session_id = session_id
+        session_app._set_agents(session_id)
+        return session_app
+
+    def _set_agents(self, session_id=None):
+        # Builds every agent, plus the small-model twins of the agents subject to size-based routing
+        for agent_key in AGENT_SPECS:
+            setattr(self, agent_key, self.build_agent(agent_key, session_id))
+        self.small_agents = {
+            agent_key: self.build_agent(agent_key, session_id, model)
+            for agent_key, model in self.small_models.items()
+        }
+        agents = [getattr(self, agent_key) for agent_key in AGENT_SPECS]
+        self.agent_locks = {
+            id(agent): threading.Lock() for agent in agents + list(self.small_agents.values())
+        }
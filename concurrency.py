@@ -0,0 +1,265 @@
+import contextvars
+import logging
+import threading
+import time
+
+
+class Flight:
+    """
+    Book-keeping for a single in-flight call shared by a SingleFlight group.
+
+    Attributes:
+        key (Hashable): The key the calls share.
+        chunks (list): The chunks a streamed call has produced so far.
+        done (bool): Whether the call has ended.
+        result (Any): The result of a call run with `SingleFlight.do`.
+        error (BaseException): The error that ended the call, if any.
+        followers (int): Streamed calls currently replaying this one besides the leader.
+    """
+
+    def __init__(self, key):
+        """
+        Initializes an unfinished flight.
+
+        Parameters:
+            key (Hashable): The key the calls share.
+        """
+        self.key = key
+        self.chunks = []
+        self.done = False
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers arriving while it is still running
+    (followers) wait for it and receive the same result or exception. Once the call finishes the key is
+    forgotten, so later calls run again (pair with a cache to reuse results over time).
+
+    `do` shares a function's return value; `subscribe` shares a stream of chunks, which followers replay as
+    they arrive. If a stream's leader stops reading (e.g., its job is cancelled) while followers are still
+    reading, the stream is drained on a background thread so the followers still get all of it; it is closed
+    once nobody is reading any more. A key should only be used with one of the two methods.
+
+    Attributes:
+        calls (int): Number of calls that executed the function.
+        coalesced (int): Number of calls that waited for another caller's result instead.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty group.
+        """
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Runs `fn` unless a call with the same key is already in flight, in which case waits for it.
+
+        Parameters:
+            key (Hashable): Identifies calls that can share a result.
+            fn (callable): The zero-argument function to run.
+
+        Returns:
+            Any: The result of `fn`, either from this call or from the in-flight one.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            with call.condition:
+                call.condition.wait_for(lambda: call.done)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            self._end(call, e)
+            raise
+        self._end(call)
+        return call.result
+
+    def subscribe(self, key, factory):
+        """
+        Joins the stream in flight for a key, or starts it.
+
+        Parameters:
+            key (Hashable): Identifies calls that can share a stream (e.g., the response-cache key).
+            factory (callable): Returns the chunk iterator of a new stream; only called for the leader.
+
+        Returns:
+            tuple: The chunk iterator and whether the call was coalesced into another one's stream.
+        """
+        call, leader = self._join(key, follow=True)
+        if not leader:
+            logging.debug("Coalesced call into in-flight stream %s", key)
+            return self._follow(call), True
+        return self._lead(call, factory), False
+
+    def stats(self):
+        """
+        Returns how many calls were executed and how many were coalesced.
+
+        Returns:
+            dict: The "calls", "coalesced" and "in_flight" counters.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+    def _join(self, key, follow=False):
+        # Returns the flight for a key and whether the caller leads it
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Flight(key)
+                self.calls += 1
+                return call, True
+            if follow:
+                with call.condition:
+                    call.followers += 1
+            self.coalesced += 1
+            return call, False
+
+    def _lead(self, call, factory):
+        chunks = iter(factory())
+        try:
+            for chunk in chunks:
+                self._publish(call, chunk)
+                yield chunk
+        except GeneratorExit:
+            if self._abandon(call):
+                self._close(chunks)
+            else:
+                threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(self._drain, call, chunks),
+                    name="singleflight-drain",
+                    daemon=True,
+                ).start()
+            raise
+        except BaseException as e:
+            self._end(call, e)
+            raise
+        self._end(call)
+
+    def _drain(self, call, chunks):
+        # Finishes a stream whose leader stopped reading, for its followers
+        try:
+            for chunk in chunks:
+                self._publish(call, chunk)
+                if self._abandon(call):
+                    self._close(chunks)
+                    return
+        except Exception as e:
+            self._end(call, e)
+            return
+        self._end(call)
+
+    def _abandon(self, call):
+        # Releases the key of a stream nobody reads any more; returns False if followers remain.
+        # Holding the group lock keeps new followers from joining meanwhile.
+        with self._lock, call.condition:
+            if call.followers > 0:
+                return False
+            if self._calls.get(call.key) is call:
+                del self._calls[call.key]
+            call.done = True
+            return True
+
+    @staticmethod
+    def _close(chunks):
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _follow(self, call):
+        index = 0
+        try:
+            while True:
+                with call.condition:
+                    call.condition.wait_for(lambda: index < len(call.chunks) or call.done)
+                    available = call.chunks[index:]
+                    done, error = call.done, call.error
+                for chunk in available:
+                    yield chunk
+                index += len(available)
+                if done and index >= len(call.chunks):
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            with call.condition:
+                call.followers -= 1
+
+    @staticmethod
+    def _publish(call, chunk):
+        with call.condition:
+            call.chunks.append(chunk)
+            call.condition.notify_all()
+
+    def _end(self, call, error=None):
+        with self._lock:
+            if self._calls.get(call.key) is call:
+                del self._calls[call.key]
+        with call.condition:
+            call.done = True
+            call.error = error
+            call.condition.notify_all()
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket limiting how often an operation may start.
+
+    Tokens refill continuously at `rate` per second up to `burst`; each acquisition consumes one token and
+    blocks until one is available.
+
+    Attributes:
+        rate (float): Tokens added per second, or None for no limit.
+        burst (int): Maximum number of tokens that can accumulate.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Initializes a full bucket.
+
+        Parameters:
+            rate (float): Tokens added per second, or None to disable limiting.
+            burst (int): Maximum number of tokens that can accumulate (default is 1).
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available and consumes it.
+        """
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
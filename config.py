@@ -1,6 +1,247 @@
 # Model name for the LLM
 model_name = "llama3.2"
 
+# Model server settings: how long Ollama keeps the model (and its prompt cache) loaded after a request, and
+# the Ollama servers requests are spread over. `endpoints` lists the server URLs (None uses OLLAMA_HOST or the
+# local server); each keeps up to `max_connections` pooled HTTP connections. An endpoint leaves the rotation
+# after `failure_threshold` consecutive failures and is probed every `health_check_seconds`. `pins` maps agent
+# keys to the endpoints they prefer while healthy, e.g. {"interview_coach": ["http://gpu-1:11434"]}.
+model_settings = {
+    "keep_alive": "30m",
+    "endpoints": None,
+    "max_connections": 16,
+    "timeout_seconds": None,
+    "failure_threshold": 2,
+    "health_check_seconds": 15,
+    "pins": {},
+}
+
+# Generation options sent with every request; anything not set uses Ollama's defaults. Keep `num_ctx` the same
+# for agents that share a model: Ollama reloads the model whenever the context length changes.
+model_options = {
+    "num_ctx": 8192,
+}
+
+# Per-agent overrides merged over `model_name` and `model_options`: "model" picks another model and "options"
+# sets generation parameters such as num_predict (the reply length cap) and temperature. Agents not listed
+# use the defaults.
+agent_models = {
+    "resume_analyzer": {"options": {"temperature": 0.3}},
+    "market_researcher": {"options": {"temperature": 0.5}},
+    "skills_developer": {"options": {"temperature": 0.5}},
+    "interview_coach": {"options": {"num_predict": 512, "temperature": 0.7}},
+    "networking_strategist": {"options": {"num_predict": 1024, "temperature": 0.7}},
+    "ask_career_coach": {"options": {"num_predict": 1024}},
+}
+
+# Size-based routing: when enabled, a prompt of at most `max_prompt_tokens` (estimated) sent to one of `agents`
+# is answered by `small_model` instead, with the agent's options. Every routing decision is logged.
+model_routing = {
+    "enabled": False,
+    "small_model": "llama3.2:1b",
+    "max_prompt_tokens": 300,
+    "agents": ["interview_coach", "networking_strategist", "ask_career_coach"],
+}
+
+# Persistent cache for the one-shot generators (action plan, market research, learning plan, networking).
+# Responses are keyed on agent, model, system prompt and the normalized prompt.
+response_cache = {
+    "path": ".cache/responses.sqlite3",
+    "ttl_seconds": 24 * 60 * 60,
+    "max_bytes": 64 * 1024 * 1024,
+    "agents": {
+        "resume_analyzer": False,
+        "market_researcher": True,
+        "skills_developer": True,
+        "interview_coach": False,
+        "networking_strategist": True,
+        "ask_career_coach": False,
+    },
+}
+
+# Coalescing of identical concurrent prompts: requests with the same agent, model and normalized prompt as a
+# generation still running share its response instead of starting their own.
+coalescing_settings = {
+    "enabled": True,
+}
+
+# Cache for converted resume text, keyed by a content hash of the uploaded file.
+resume_cache = {
+    "path": ".cache/resumes.sqlite3",
+    "ttl_seconds": 7 * 24 * 60 * 60,
+    "max_bytes": 32 * 1024 * 1024,
+    "memory_items": 32,
+}
+
+# Resume conversion tiers. The direct tier reads PDF pages from their text layer and DOCX files from their XML
+# (milliseconds, no models); a page with fewer than min_page_chars characters or more than max_bad_char_ratio
+# unreadable ones (e.g., a scan) escalates through docling_tiers in order, each a docling PdfPipelineOptions, until
+# one produces usable text. When more than docling_page_share of the pages need docling, it converts the whole
+# document. Set direct_extraction to False to always use docling.
+ingest_settings = {
+    "direct_extraction": True,
+    "min_page_chars": 40,
+    "max_bad_char_ratio": 0.1,
+    "docling_page_share": 0.5,
+    "docling_tiers": {
+        "layout": {"do_ocr": False, "do_table_structure": True},
+        "ocr": {"do_ocr": True, "do_table_structure": True},
+    },
+}
+
+# Background execution of agent runs. max_workers caps how many jobs are running or waiting for admission at
+# once; the generations themselves are limited by `admission_settings`.
+job_settings = {
+    "max_workers": 32,
+}
+
+# Admission control of model generations. At most max_concurrent run at once and up to max_queue wait, ordered
+# by priority class (lower rank first). Each agent's requests use its class in agent_priorities, or
+# default_priority; batch screening uses "batch". rate_limits sets a per-session token bucket for each class
+# (classes not listed are unlimited). Requests that would wait longer than queue_timeout_seconds are rejected
+# at once, and a full queue sheds its lowest-priority request to admit a higher-priority one.
+admission_settings = {
+    "enabled": True,
+    "max_concurrent": 2,
+    "max_queue": 24,
+    "queue_timeout_seconds": 60,
+    "priorities": {"interactive": 0, "standard": 1, "batch": 2},
+    "agent_priorities": {"interview_coach": "interactive", "ask_career_coach": "interactive"},
+    "default_priority": "standard",
+    "rate_limits": {
+        "interactive": {"per_minute": 20, "burst": 5},
+        "standard": {"per_minute": 10, "burst": 5},
+    },
+}
+
+# Conversation context of the Interview Coach. Beyond the token budget, all but the most recent turns
+# are folded into a rolling summary.
+interview_memory = {
+    "token_budget": 3000,
+    "keep_recent_turns": 4,
+    "summary_token_budget": 500,
+}
+
+# Conversation context of Ask Career Coach. Turns beyond the token budget are summarized (or dropped when
+# summarize_evicted is False); the displayed chat history is capped per session.
+career_coach_memory = {
+    "token_budget": 2000,
+    "keep_recent_turns": 6,
+    "summarize_evicted": True,
+    "summary_token_budget": 300,
+    "max_history_messages": 100,
+    "max_history_chars": 200_000,
+}
+
+# Start-up behaviour. Heavy modules are imported on first use; the warm-up thread loads them (and builds the
+# shared CareerCoachApp) in the background after the first page has rendered. Set profile_imports (or the
+# CAREER_COACH_PROFILE_STARTUP environment variable) to log an import-time breakdown of the warm-up.
+startup_settings = {
+    "warm_up": True,
+    "warm_up_modules": ["agno.agent", "agno.models.ollama", "duckduckgo_search"],
+    "warm_up_resume_converter": False,
+    # Prime Ollama's prompt cache with every agent's system prompt (one short request per agent)
+    "warm_up_prompts": False,
+    "profile_imports": False,
+}
+
+# Web search used by the agents' DuckDuckGoTools. Results are cached in the SQLite file at cache_path, shared by
+# every process of the deployment; with cache_path set to None they are kept in memory (cache_max_entries).
+search_settings = {
+    "pool_size": 4,
+    "timeout_seconds": 10,
+    "cache_path": ".cache/search.sqlite3",
+    "cache_ttl_seconds": 60 * 60,
+    "cache_max_bytes": 16 * 1024 * 1024,
+    "cache_max_entries": 1024,
+    "max_concurrency": 4,
+    "rate_per_second": 5,
+    "rate_burst": 5,
+}
+
+# Headless batch screening (`python batch_screen.py`): conversion processes, analyses in flight and the
+# file types picked up from the resume directory.
+batch_settings = {
+    "conversion_workers": 4,
+    "max_concurrent_llm": 2,
+    "extensions": [".pdf", ".docx", ".doc"],
+}
+
+# Compaction of the resume and job description in the resume analyzer's prompt (`resume_compaction.py`):
+# artifact, boilerplate and repeated lines are removed, then the least relevant sections are dropped until each
+# text fits its token budget (estimated at four characters per token).
+compaction_settings = {
+    "enabled": True,
+    "resume_token_budget": 2000,
+    "job_description_token_budget": 800,
+    "min_section_tokens": 40,
+    "boilerplate_patterns": [
+        r"(?:curriculum vitae|resume|r\u00e9sum\u00e9|cv)",
+        r"references (?:are )?(?:available )?(?:up)?on request\.?",
+        r"(?:page|pg\.?) \d+",
+        r".*\bequal (?:employment )?opportunity employer\b.*",
+        r"(?:confidential|private (?:and|&) confidential)",
+    ],
+}
+
+# Local ATS keyword matching: cached job-description indexes and the number of matched/missing keywords
+# listed in the resume analyzer's prompt.
+ats_settings = {
+    "enabled": True,
+    "index_cache_items": 64,
+    "prompt_terms": 15,
+}
+
+# Headless HTTP API (`python api_server.py`): listening address, request body limit and the per-client
+# sessions (conversation memory of the interview and chat endpoints), which expire after session_ttl_seconds
+# without use. Every session also holds its own agents (about 15 KB), so max_sessions bounds their memory as
+# well. With more than one worker process (0 forks one per core), sessions are also saved to the SQLite
+# file at session_path so a conversation can continue on any worker.
+api_settings = {
+    "host": "127.0.0.1",
+    "port": 8000,
+    "max_body_bytes": 20 * 1024 * 1024,
+    "max_sessions": 10000,
+    "session_ttl_seconds": 2 * 60 * 60,
+    "workers": 1,
+    "session_path": ".cache/api_sessions.sqlite3",
+}
+
+# Multi-process deployment. worker_processes sets the processes that convert uploaded documents off the server
+# process's GIL (0 converts in-process, None starts one per core). The API server can also fork several
+# workers (`api_settings["workers"]`), which split worker_processes between them; the response, search and
+# resume caches are SQLite files shared by all processes. Admission limits and coalescing apply per process.
+deployment_settings = {
+    "worker_processes": 0,
+}
+
+# Application log, written by a background thread. Rotated by size, or by time when `rotate_when` is set
+# (e.g., "midnight"). Prompts are logged at DEBUG truncated to `prompt_preview_chars`, and only for a
+# `prompt_sample_rate` fraction of requests. With per_process_files, each process writes its own log and span
+# files (the process id is added to the names); set it when several servers run from the same directory. The
+# API server turns it on when it forks workers.
+logging_settings = {
+    "level": "INFO",
+    "filename": "career_coach_log.log",
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+    "rotate_when": None,
+    "per_process_files": False,
+    "prompt_preview_chars": 200,
+    "prompt_sample_rate": 1.0,
+}
+
+# Per-request spans (page, prompt build, conversion, search, generation, rendering).
+# Spans are appended to `jsonl_path`, which is rotated once it exceeds max_bytes, keeping backup_count old files;
+# set `prometheus_port` to serve /metrics on localhost.
+telemetry_settings = {
+    "enabled": True,
+    "jsonl_path": "career_coach_spans.jsonl",
+    "max_bytes": 50 * 1024 * 1024,
+    "backup_count": 5,
+    "prometheus_port": None,
+}
+
 """
 A dictionary containing predefined prompts and instructions for various agents in the AI Career Coach application.
 
@@ -63,7 +304,7 @@ agent_prompts = {
             "Prioritize quantifying achievements and demonstrating impact. Encourage the use of action verbs and measurable results.",
             "For each experience, ask 'So what?' to push for deeper insights and emphasize the value delivered.",
             "Ensure the resume is tailored to the specific job description and industry. Emphasize the importance of keyword optimization for Applicant Tracking Systems (ATS).",
-            "Identify key skills and keywords from the job description and ensure they are prominently featured in the resume.",
+            "Identify key skills and keywords from the job description and ensure they are prominently featured in the resume. When the prompt includes an ATS pre-screen, treat its matched and missing keywords as given: do not re-list them, and focus on how to work the missing ones into the resume credibly.",
             "Maintain a professional and constructive tone. Offer feedback in a way that is encouraging and supportive.",
             "Ensure the resume uses professional language and avoids jargon or slang that may be unfamiliar to recruiters.",
             "Assess the resume's visual appeal and ensure it is easy to read and navigate. Provide feedback on font choice, spacing, and overall layout.",
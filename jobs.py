@@ -0,0 +1,323 @@
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from admission import Overloaded
+from config import job_settings
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+REJECTED = "rejected"
+
+
+class Job:
+    """
+    A handle to an agent run executing in the background.
+
+    The response is collected chunk by chunk as the model streams it, so the handle can be stored in
+    Streamlit's session state and rendered again after reruns or page switches.
+
+    Attributes:
+        job_id (str): Unique identifier of the job.
+        agent_key (str): The attribute name of the agent running the prompt.
+        prompt (str): The input prompt.
+        status (str): One of "queued", "running", "done", "cancelled", "failed" or "rejected" (turned away by
+            admission control).
+        chunks (list): The response chunks received so far.
+        error (str): The error message if the job failed or was rejected.
+        retry_after (float): Seconds after which a rejected job's request may be retried.
+        submitted (float): When the job was submitted (time.time()).
+        finished (float): When the job stopped running, or None.
+    """
+
+    def __init__(self, agent_key, prompt):
+        """
+        Initializes a queued job.
+
+        Parameters:
+            agent_key (str): The attribute name of the agent running the prompt.
+            prompt (str): The input prompt.
+        """
+        self.job_id = uuid.uuid4().hex
+        self.agent_key = agent_key
+        self.prompt = prompt
+        self.status = QUEUED
+        self.chunks = []
+        self.error = None
+        self.retry_after = None
+        self.submitted = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+        self._ticket = None
+        self._listeners = []
+
+    @property
+    def text(self):
+        """
+        Returns the response received so far.
+
+        Returns:
+            str: The concatenated chunks.
+        """
+        with self._changed:
+            return "".join(self.chunks)
+
+    @property
+    def done(self):
+        """
+        Returns whether the job has stopped running.
+
+        Returns:
+            bool: True if the job is done, cancelled, failed or rejected.
+        """
+        return self.status in (DONE, CANCELLED, FAILED, REJECTED)
+
+    @property
+    def queue_position(self):
+        """
+        Returns the job's position in the admission queue while it waits for a generation slot.
+
+        Returns:
+            int: 1 for the next generation to start, or None if the job is not waiting.
+        """
+        ticket = self._ticket
+        return ticket.position if ticket is not None else None
+
+    @property
+    def cancelled(self):
+        """
+        Returns whether cancellation was requested.
+
+        Returns:
+            bool: True if `cancel` has been called.
+        """
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """
+        Requests cancellation. A queued job never starts (and leaves the admission queue); a running job stops
+        at its next chunk.
+        """
+        self._cancel.set()
+        ticket = self._ticket
+        if ticket is not None:
+            ticket.withdraw()
+
+    def add_listener(self, callback):
+        """
+        Registers a function called without arguments whenever the job changes (a new chunk, a place in the
+        admission queue or the end of the job). It runs on the job's worker thread, so it must be quick and
+        thread-safe, e.g. waking an event loop with `loop.call_soon_threadsafe`.
+
+        Parameters:
+            callback (callable): The function to call.
+        """
+        with self._changed:
+            self._listeners.append(callback)
+
+    def wait_started(self, timeout=None):
+        """
+        Waits until the job produces its first chunk or stops.
+
+        Parameters:
+            timeout (float, optional): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if the job has output or is done, False if the timeout expired first.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self.chunks or self.done, timeout)
+
+    def iter_chunks(self, poll_seconds=0.1):
+        """
+        Yields the response chunks from the beginning, waiting for new ones until the job is done.
+
+        Parameters:
+            poll_seconds (float): How often to re-check the job while waiting (default is 0.1).
+
+        Yields:
+            str: A chunk of the response.
+        """
+        index = 0
+        while True:
+            with self._changed:
+                while index >= len(self.chunks) and not self.done:
+                    self._changed.wait(poll_seconds)
+                new_chunks = self.chunks[index:]
+                finished = self.done
+            index += len(new_chunks)
+            yield from new_chunks
+            if finished and index >= len(self.chunks):
+                return
+
+    def _set_ticket(self, ticket):
+        # Called by admission control when the job has to wait for a generation slot
+        self._ticket = ticket
+        if self.cancelled:
+            ticket.withdraw()
+        self._notify()
+
+    def _append(self, chunk):
+        with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+        self._notify()
+
+    def _finish(self, status, error=None):
+        with self._changed:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+            self._changed.notify_all()
+        self._notify()
+
+    def _notify(self):
+        with self._changed:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+
+
+class JobEngine:
+    """
+    Runs agent prompts on a bounded pool of worker threads.
+
+    The pool size caps how many jobs are running or waiting for admission at once; how many generations
+    actually run, and in which order waiting ones start, is decided by the admission controller (see
+    `admission`). Additional jobs wait in the pool's queue.
+
+    Attributes:
+        max_workers (int): Maximum number of jobs running at once.
+        submitted (int): Number of jobs submitted.
+        completed (int): Number of jobs that finished successfully.
+        cancelled (int): Number of jobs that were cancelled.
+        failed (int): Number of jobs that raised an error.
+        rejected (int): Number of jobs turned away by admission control.
+    """
+
+    def __init__(self, max_workers=2):
+        """
+        Initializes the engine and its worker pool.
+
+        Parameters:
+            max_workers (int): Maximum number of jobs running at once (default is 2).
+        """
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.rejected = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="agent-job"
+        )
+
+    def submit(self, app, agent_key, prompt, priority=None):
+        """
+        Queues an agent run and returns its handle immediately.
+
+        Parameters:
+            app (CareerCoachApp): The (per-session) application owning the agent.
+            agent_key (str): The attribute name of the agent (e.g., "market_researcher").
+            prompt (str): The input prompt.
+            priority (str, optional): The admission priority class (default from `admission_settings`).
+
+        Returns:
+            Job: The handle of the queued job.
+        """
+        job = Job(agent_key, prompt)
+        with self._lock:
+            self.submitted += 1
+        # Run in a copy of the caller's context so the job's spans belong to the submitting page
+        self._executor.submit(
+            contextvars.copy_context().run, self._run, app, job, priority
+        )
+        logging.debug("Submitted job %s for %s", job.job_id, agent_key)
+        return job
+
+    def stats(self):
+        """
+        Returns job counters.
+
+        Returns:
+            dict: Submitted, running, completed, cancelled, failed and rejected job counts.
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "running": self._running,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def _run(self, app, job, priority=None):
+        if job.cancelled:
+            self._record(job, CANCELLED)
+            return
+        with self._lock:
+            self._running += 1
+        job.status = RUNNING
+        stream = app.stream(job.agent_key, job.prompt, priority, job._set_ticket)
+        try:
+            for chunk in stream:
+                if job.cancelled:
+                    break
+                job._append(chunk)
+        except Overloaded as e:
+            if job.cancelled:
+                self._record(job, CANCELLED)
+            else:
+                logging.warning("Job %s rejected: %s", job.job_id, e.reason)
+                job.retry_after = e.retry_after
+                self._record(job, REJECTED, str(e))
+        except Exception as e:
+            logging.exception("Job %s failed", job.job_id)
+            self._record(job, FAILED, str(e))
+        else:
+            self._record(job, CANCELLED if job.cancelled else DONE)
+        finally:
+            stream.close()
+            with self._lock:
+                self._running -= 1
+
+    def _record(self, job, status, error=None):
+        with self._lock:
+            if status == DONE:
+                self.completed += 1
+            elif status == CANCELLED:
+                self.cancelled += 1
+            elif status == REJECTED:
+                self.rejected += 1
+            else:
+                self.failed += 1
+        job._finish(status, error)
+        logging.debug("Job %s %s", job.job_id, status)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_job_engine():
+    """
+    Returns the process-wide JobEngine, creating it on first use.
+
+    Returns:
+        JobEngine: The shared engine configured from `config.job_settings`.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = JobEngine(job_settings["max_workers"])
+        return _engine
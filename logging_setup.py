@@ -0,0 +1,154 @@
+"""
+The application's logging pipeline.
+
+Log calls only put the record on a queue; a background listener thread formats the records and writes them
+to a rotating log file, so neither formatting nor disk I/O happens on the request thread. Call
+`configure_logging()` once from each entry point (it is idempotent) and log with lazy %-style arguments.
+
+When several processes run from the same directory, each writes its own log (and span) file, named after
+its process id, since processes rotating one shared file rename it out from under each other.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from config import logging_settings
+
+LOG_FORMAT = "%(module)s - %(asctime)s - %(levelname)s - %(funcName)s - %(lineno)d - %(message)s"
+
+_listener = None
+_listener_lock = threading.Lock()
+_per_process_files = False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves formatting to the listener thread.
+
+    The standard QueueHandler formats each record before queueing it so it can cross process boundaries.
+    The queue here never leaves the process, so the record is queued as-is and the message, its arguments
+    and any traceback are formatted by the writer thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class PromptPreview:
+    """
+    A lazily formatted, truncated view of a prompt for log messages.
+
+    Nothing is copied or formatted unless the record is actually emitted. Only a sample of prompts (see
+    `logging_settings["prompt_sample_rate"]`) is logged at all; the others are reported by length only.
+
+    Attributes:
+        text (str): The prompt.
+        max_chars (int): Maximum number of characters shown.
+        sampled (bool): Whether the prompt text is included in the log.
+    """
+
+    __slots__ = ("text", "max_chars", "sampled")
+
+    def __init__(self, text, max_chars=None, sample_rate=None):
+        """
+        Initializes the preview.
+
+        Parameters:
+            text (str): The prompt.
+            max_chars (int, optional): Maximum number of characters shown (default from `logging_settings`).
+            sample_rate (float, optional): Fraction of prompts whose text is logged (default from
+                `logging_settings`).
+        """
+        if sample_rate is None:
+            sample_rate = logging_settings["prompt_sample_rate"]
+        self.text = text
+        self.max_chars = (
+            logging_settings["prompt_preview_chars"] if max_chars is None else max_chars
+        )
+        self.sampled = sample_rate >= 1 or random.random() < sample_rate
+
+    def __str__(self):
+        if not self.sampled or self.max_chars <= 0:
+            return f"<{len(self.text)} chars>"
+        if len(self.text) <= self.max_chars:
+            return repr(self.text)
+        return f"{self.text[: self.max_chars]!r}... <{len(self.text)} chars>"
+
+
+def process_file(path):
+    """
+    Returns the file this process writes a log or span file to.
+
+    With per-process files (see `configure_logging`), the process id is added before the extension, e.g.,
+    "career_coach_log.log" becomes "career_coach_log.12345.log".
+
+    Parameters:
+        path (str): The configured file.
+
+    Returns:
+        str: The file to write.
+    """
+    if not _per_process_files:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{extension}"
+
+
+def configure_logging(per_process_files=None):
+    """
+    Installs the queue-based logging pipeline on the root logger, once per process.
+
+    The log file, level and rotation (by size, or by time when `rotate_when` is set) come from
+    `config.logging_settings`. Handlers already on the root logger are replaced, including the stderr handler
+    the module-level `logging.info` functions install when called before any configuration. The listener is
+    flushed and stopped when the interpreter exits.
+
+    Parameters:
+        per_process_files (bool, optional): Whether this process writes its own log and span files (see
+            `process_file`), because other processes write to the same directory (default from
+            `logging_settings`).
+
+    Returns:
+        logging.handlers.QueueListener: The listener writing the log file.
+    """
+    global _listener, _per_process_files
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+        if per_process_files is None:
+            per_process_files = logging_settings["per_process_files"]
+        _per_process_files = per_process_files
+        if logging_settings["rotate_when"]:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                process_file(logging_settings["filename"]),
+                when=logging_settings["rotate_when"],
+                backupCount=logging_settings["backup_count"],
+                encoding="utf-8",
+                delay=True,
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                process_file(logging_settings["filename"]),
+                maxBytes=logging_settings["max_bytes"],
+                backupCount=logging_settings["backup_count"],
+                encoding="utf-8",
+                delay=True,
+            )
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.setLevel(logging_settings["level"])
+        root.addHandler(DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
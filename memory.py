@@ -0,0 +1,239 @@
+import logging
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens in a text without running a tokenizer.
+
+    Uses the common approximation of four characters per token for English text, which is accurate
+    enough for budgeting prompts.
+
+    Parameters:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return (len(text) + 3) // 4
+
+
+def extractive_summarizer(summary, turns, max_chars=240):
+    """
+    Folds conversation turns into a summary by keeping the opening of each turn.
+
+    This summarizer is deterministic and needs no model call, so compaction never adds latency.
+
+    Parameters:
+        summary (str): The existing summary (may be empty).
+        turns (list): The (role, content) pairs to fold into the summary.
+        max_chars (int): Maximum number of characters kept per turn (default is 240).
+
+    Returns:
+        str: The updated summary.
+    """
+    lines = [summary] if summary else []
+    for role, content in turns:
+        text = " ".join(content.split())
+        if len(text) > max_chars:
+            text = text[:max_chars].rsplit(" ", 1)[0] + " ..."
+        lines.append(f"- {role}: {text}")
+    return "\n".join(lines)
+
+
+def trim_history(messages, max_messages, max_chars):
+    """
+    Drops the oldest chat messages in place so the history stays within a hard size cap.
+
+    Parameters:
+        messages (list): The chat history as dictionaries with a "content" key.
+        max_messages (int): Maximum number of messages kept.
+        max_chars (int): Maximum total characters of the kept messages.
+
+    Returns:
+        int: The number of messages dropped.
+    """
+    total = sum(len(message["content"]) for message in messages)
+    dropped = 0
+    while messages and (len(messages) > max_messages or total > max_chars):
+        total -= len(messages.pop(0)["content"])
+        dropped += 1
+    return dropped
+
+
+class ConversationMemory:
+    """
+    An append-only conversation transcript that keeps prompts within a token budget.
+
+    The rendered context is a stable prefix (header, rolling summary, transcript) to which each new turn is
+    appended, so consecutive prompts share everything up to the new turn and Ollama can reuse its prompt
+    cache. The rendered text and its token count are maintained incrementally instead of re-joining the
+    whole history on every turn.
+
+    When the context grows beyond `token_budget`, all but the most recent turns are compacted in one step:
+    folded into the rolling summary by `summarizer`, or dropped if no summarizer is set. Compacting many
+    turns at once keeps the prefix stable for many turns afterwards.
+
+    Attributes:
+        header (str): Fixed text placed before the conversation.
+        token_budget (int): Maximum estimated tokens of the rendered context.
+        keep_recent_turns (int): Number of most recent turns never compacted.
+        summarizer (callable): Folds turns into the summary, or None to drop them.
+        summary_token_budget (int): Maximum estimated tokens of the summary; older summary lines are dropped.
+        summary (str): The rolling summary of compacted turns.
+        turns (list): The (role, content) pairs not yet compacted.
+    """
+
+    def __init__(
+        self,
+        header="",
+        token_budget=3000,
+        keep_recent_turns=4,
+        summarizer=None,
+        summary_token_budget=500,
+    ):
+        """
+        Initializes an empty conversation.
+
+        Parameters:
+            header (str): Fixed text placed before the conversation (default is empty).
+            token_budget (int): Maximum estimated tokens of the rendered context (default is 3000).
+            keep_recent_turns (int): Number of most recent turns never compacted (default is 4).
+            summarizer (callable, optional): Called as `summarizer(summary, turns)` to fold turns into the summary.
+            summary_token_budget (int): Maximum estimated tokens of the summary (default is 500).
+        """
+        self.header = header
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summarizer = summarizer
+        self.summary_token_budget = summary_token_budget
+        self.summary = ""
+        self.turns = []
+        self._prefix = ""
+        self._transcript = ""
+        self._tokens = 0
+        self._rebuild()
+
+    @classmethod
+    def from_config(cls, settings):
+        """
+        Builds a conversation memory from its settings in `config.py` (e.g., `interview_memory`).
+
+        Parameters:
+            settings (dict): The memory settings (token_budget, keep_recent_turns, summary_token_budget and
+                optionally summarize_evicted, which defaults to True).
+
+        Returns:
+            ConversationMemory: The empty conversation.
+        """
+        return cls(
+            token_budget=settings["token_budget"],
+            keep_recent_turns=settings["keep_recent_turns"],
+            summarizer=(
+                extractive_summarizer if settings.get("summarize_evicted", True) else None
+            ),
+            summary_token_budget=settings["summary_token_budget"],
+        )
+
+    @property
+    def tokens(self):
+        """
+        Returns the estimated token count of the rendered context.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        return self._tokens
+
+    def set_header(self, header):
+        """
+        Replaces the header, keeping the conversation. The prompt prefix changes only if the header does.
+
+        Parameters:
+            header (str): The new header.
+        """
+        if header != self.header:
+            self.header = header
+            self._rebuild()
+
+    def add(self, role, content):
+        """
+        Appends a turn and compacts older turns if the context exceeds the token budget.
+
+        Parameters:
+            role (str): The speaker (e.g., "user" or "assistant").
+            content (str): The message text.
+        """
+        line = f"{role}: {content}\n"
+        self.turns.append((role, content))
+        self._transcript += line
+        self._tokens += estimate_tokens(line)
+        if self._tokens > self.token_budget:
+            self.compact()
+
+    def compact(self):
+        """
+        Folds (or drops) all but the most recent turns and rebuilds the rendered context.
+        """
+        cutoff = len(self.turns) - self.keep_recent_turns
+        if cutoff <= 0:
+            return
+        evicted, self.turns = self.turns[:cutoff], self.turns[cutoff:]
+        if self.summarizer is not None:
+            self.summary = self._trim_summary(self.summarizer(self.summary, evicted))
+        logging.debug("Compacted %d conversation turns", len(evicted))
+        self._rebuild()
+
+    def render(self):
+        """
+        Returns the conversation context: header, rolling summary and transcript.
+
+        Returns:
+            str: The rendered context.
+        """
+        return self._prefix + self._transcript
+
+    def clear(self):
+        """
+        Forgets the whole conversation, keeping the header.
+        """
+        self.summary = ""
+        self.turns = []
+        self._rebuild()
+
+    def snapshot(self):
+        """
+        Returns the conversation as JSON-serializable data (e.g., to continue it in another process).
+
+        Returns:
+            dict: The header, summary and turns.
+        """
+        return {"header": self.header, "summary": self.summary, "turns": list(self.turns)}
+
+    def restore(self, snapshot):
+        """
+        Replaces the conversation with one returned by `snapshot`.
+
+        Parameters:
+            snapshot (dict): The header, summary and turns.
+        """
+        self.header = snapshot["header"]
+        self.summary = snapshot["summary"]
+        self.turns = [tuple(turn) for turn in snapshot["turns"]]
+        self._rebuild()
+
+    def _trim_summary(self, summary):
+        lines = summary.splitlines()
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_token_budget:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _rebuild(self):
+        prefix = self.header
+        if self.summary:
+            prefix += f"Summary of the earlier conversation:\n{self.summary}\n"
+        prefix += "Here is the conversation so far:\n"
+        self._prefix = prefix
+        self._transcript = "".join(
+            f"{role}: {content}\n" for role, content in self.turns
+        )
+        self._tokens = estimate_tokens(self._prefix) + estimate_tokens(self._transcript)
@@ -0,0 +1,394 @@
+"""
+The model-backend layer: a pool of Ollama endpoints shared by every agent in the process.
+
+Each endpoint keeps one `ollama.Client`, whose HTTP connection pool stays open between requests. Requests go
+to the healthy endpoint with the fewest requests in flight (agents can be pinned to preferred endpoints), a
+request that cannot reach an endpoint is retried on the next one, and a background thread health-checks
+the endpoints so a failed server is taken out of rotation and brought back once it answers again.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from config import model_settings
+
+# Number of recent request latencies kept per endpoint for the percentiles.
+LATENCY_WINDOW = 256
+
+
+def is_endpoint_failure(error):
+    """
+    Returns whether an error means the endpoint itself failed, so the request may be retried elsewhere.
+
+    Connection problems, timeouts and 5xx responses count; client errors (e.g., an unknown model) do not.
+
+    Parameters:
+        error (Exception): The error raised by the Ollama client.
+
+    Returns:
+        bool: True if the request should fail over to another endpoint.
+    """
+    import httpx
+    from ollama import ResponseError
+
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return True
+    return isinstance(error, ResponseError) and error.status_code >= 500
+
+
+class Endpoint:
+    """
+    One Ollama server and its request statistics.
+
+    Attributes:
+        host (str): The server URL, or None for the default (OLLAMA_HOST or the local server).
+        client (ollama.Client): The client, holding a persistent HTTP connection pool.
+        healthy (bool): Whether the endpoint is in rotation.
+        outstanding (int): Requests currently in flight (the queue depth).
+        requests (int): Requests completed.
+        failures (int): Requests that failed because of the endpoint.
+        consecutive_failures (int): Failures since the last success.
+        latencies (deque): Durations of the most recent requests in seconds.
+    """
+
+    def __init__(self, host, max_connections=16, timeout=None):
+        """
+        Creates the endpoint and its client.
+
+        Parameters:
+            host (str): The server URL, or None for the default.
+            max_connections (int): Maximum open HTTP connections to the server (default is 16).
+            timeout (float, optional): Request timeout in seconds.
+        """
+        import httpx
+        from ollama import Client
+
+        self.host = host
+        self.client = Client(
+            host=host,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def url(self):
+        """
+        Returns the URL the client talks to.
+
+        Returns:
+            str: The base URL of the server.
+        """
+        return str(self.client._client.base_url)
+
+    def stats(self):
+        """
+        Returns the endpoint's state and latency percentiles.
+
+        Returns:
+            dict: Health, queue depth, request and failure counts and p50/p95 latency.
+        """
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+        }
+
+
+class EndpointPool:
+    """
+    Routes model requests over a set of Ollama endpoints.
+
+    Attributes:
+        endpoints (list): The Endpoint objects, in configuration order.
+        failure_threshold (int): Consecutive failures after which an endpoint leaves the rotation.
+        health_check_seconds (float): Interval between health checks (0 disables the checker).
+    """
+
+    def __init__(
+        self,
+        hosts,
+        max_connections=16,
+        timeout=None,
+        failure_threshold=2,
+        health_check_seconds=15,
+    ):
+        """
+        Creates the endpoints; call `start_health_checks` to begin checking them in the background.
+
+        Parameters:
+            hosts (list): Server URLs; None stands for the default server.
+            max_connections (int): Maximum open HTTP connections per endpoint (default is 16).
+            timeout (float, optional): Request timeout in seconds.
+            failure_threshold (int): Consecutive failures before an endpoint is marked unhealthy (default is 2).
+            health_check_seconds (float): Interval between health checks (default is 15).
+        """
+        self.endpoints = [Endpoint(host, max_connections, timeout) for host in hosts]
+        self.failure_threshold = failure_threshold
+        self.health_check_seconds = health_check_seconds
+        self._lock = threading.Lock()
+        self._checker = None
+        self._next = 0
+
+    def acquire(self, preferred=None, exclude=()):
+        """
+        Picks the endpoint for a request and counts the request as in flight.
+
+        Healthy preferred endpoints come first, then the other healthy endpoints; among those the one with
+        the fewest requests in flight wins, ties going round-robin. When no endpoint is healthy, every
+        endpoint is tried anyway rather than failing outright.
+
+        Parameters:
+            preferred (list, optional): Hosts to use first when healthy (an agent's pinned endpoints).
+            exclude (iterable): Endpoints already tried for this request.
+
+        Returns:
+            Endpoint: The chosen endpoint, or None if every endpoint was excluded.
+        """
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            healthy = [e for e in candidates if e.healthy] or candidates
+            pinned = [e for e in healthy if preferred and e.host in preferred]
+            pool = pinned or healthy
+            self._next += 1
+            offset = self._next % len(pool)
+            rotated = pool[offset:] + pool[:offset]
+            endpoint = min(rotated, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, seconds, error=None):
+        """
+        Records the outcome of a request started with `acquire`.
+
+        Parameters:
+            endpoint (Endpoint): The endpoint the request went to.
+            seconds (float): How long the request took.
+            error (Exception, optional): The endpoint failure that ended the request, if any.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.requests += 1
+                endpoint.consecutive_failures = 0
+                endpoint.latencies.append(seconds)
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.healthy and endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.healthy = False
+                logging.warning("Ollama endpoint %s marked unhealthy: %s", endpoint.url, error)
+
+    def check_health(self):
+        """
+        Probes every endpoint once and updates its health.
+
+        Returns:
+            dict: Maps each endpoint URL to whether it answered.
+        """
+        results = {}
+        for endpoint in self.endpoints:
+            try:
+                endpoint.client._client.get("/api/version", timeout=5).raise_for_status()
+                ok = True
+            except Exception:
+                ok = False
+            with self._lock:
+                if ok and not endpoint.healthy:
+                    logging.info("Ollama endpoint %s is healthy again", endpoint.url)
+                    endpoint.consecutive_failures = 0
+                elif not ok and endpoint.healthy:
+                    logging.warning("Ollama endpoint %s failed its health check", endpoint.url)
+                endpoint.healthy = ok
+            results[endpoint.url] = ok
+        return results
+
+    def start_health_checks(self):
+        """
+        Starts the background health checker, once, unless health checks are disabled.
+
+        Returns:
+            threading.Thread: The checker thread, or None if disabled.
+        """
+        with self._lock:
+            if self._checker is None and self.health_check_seconds:
+                self._checker = threading.Thread(
+                    target=self._check_forever, name="ollama-health", daemon=True
+                )
+                self._checker.start()
+            return self._checker
+
+    def stats(self):
+        """
+        Returns the state of every endpoint.
+
+        Returns:
+            dict: Maps each endpoint URL to its statistics.
+        """
+        with self._lock:
+            return {endpoint.url: endpoint.stats() for endpoint in self.endpoints}
+
+    def _check_forever(self):
+        while True:
+            time.sleep(self.health_check_seconds)
+            self.check_health()
+
+
+def _make_pooled_ollama():
+    # Defined lazily so importing this module does not import agno
+    from agno.models.ollama import Ollama
+
+    @dataclass
+    class PooledOllama(Ollama):
+        """
+        An agno Ollama model that sends its requests through an EndpointPool.
+
+        Requests fail over to the next endpoint when an endpoint cannot be reached; a streamed response
+        only fails over before its first chunk, since a partial answer cannot be replayed elsewhere.
+
+        Attributes:
+            pool (EndpointPool): The endpoints to use.
+            preferred_hosts (list): Hosts this model (usually one agent) is pinned to, if any.
+        """
+
+        pool: Optional[Any] = None
+        preferred_hosts: Optional[List[str]] = None
+
+        def get_client(self):
+            """
+            Returns the client of the least busy endpoint (for callers that use the client directly).
+
+            Returns:
+                ollama.Client: The client.
+            """
+            endpoint = self.pool.acquire(self.preferred_hosts)
+            self.pool.release(endpoint, 0.0)
+            return endpoint.client
+
+        def invoke(self, messages):
+            request_kwargs = self._prepare_request_kwargs_for_invoke()
+            tried = []
+            while True:
+                endpoint = self.pool.acquire(self.preferred_hosts, exclude=tried)
+                start = time.perf_counter()
+                try:
+                    response = endpoint.client.chat(
+                        model=self.id.strip(),
+                        messages=[self._format_message(m) for m in messages],
+                        **request_kwargs,
+                    )
+                except Exception as e:
+                    if not self._fail_over(endpoint, start, e, tried):
+                        raise
+                    continue
+                self.pool.release(endpoint, time.perf_counter() - start)
+                return response
+
+        def invoke_stream(self, messages):
+            tried = []
+            while True:
+                endpoint = self.pool.acquire(self.preferred_hosts, exclude=tried)
+                start = time.perf_counter()
+                started = False
+                try:
+                    for chunk in endpoint.client.chat(
+                        model=self.id,
+                        messages=[self._format_message(m) for m in messages],
+                        stream=True,
+                        **self.request_kwargs,
+                    ):
+                        started = True
+                        yield chunk
+                except GeneratorExit:
+                    self.pool.release(endpoint, time.perf_counter() - start)
+                    raise
+                except Exception as e:
+                    if started or not self._fail_over(endpoint, start, e, tried):
+                        if started:
+                            self.pool.release(endpoint, time.perf_counter() - start, e)
+                        raise
+                    continue
+                self.pool.release(endpoint, time.perf_counter() - start)
+                return
+
+        def _fail_over(self, endpoint, start, error, tried):
+            # Records the failure; returns whether another endpoint should be tried
+            failover = is_endpoint_failure(error)
+            self.pool.release(
+                endpoint, time.perf_counter() - start, error if failover else None
+            )
+            tried.append(endpoint)
+            if failover and len(tried) < len(self.pool.endpoints):
+                logging.warning("Ollama endpoint %s failed, retrying elsewhere: %s", endpoint.url, error)
+                return True
+            return False
+
+    return PooledOllama
+
+
+_pooled_ollama_class = None
+
+
+def pooled_ollama(pool, **kwargs):
+    """
+    Creates an agno Ollama model whose requests go through the given EndpointPool.
+
+    Parameters:
+        pool (EndpointPool): The endpoints to use.
+        **kwargs: Ollama fields (id, options, keep_alive, ...) and `preferred_hosts`.
+
+    Returns:
+        PooledOllama: The model.
+    """
+    global _pooled_ollama_class
+    if _pooled_ollama_class is None:
+        _pooled_ollama_class = _make_pooled_ollama()
+    return _pooled_ollama_class(pool=pool, **kwargs)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_endpoint_pool():
+    """
+    Returns the process-wide EndpointPool, creating it (and starting its health checks) on first use.
+
+    Returns:
+        EndpointPool: The pool configured from `config.model_settings`.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EndpointPool(
+                model_settings["endpoints"] or [None],
+                max_connections=model_settings["max_connections"],
+                timeout=model_settings["timeout_seconds"],
+                failure_threshold=model_settings["failure_threshold"],
+                health_check_seconds=model_settings["health_check_seconds"],
+            )
+            _pool.start_health_checks()
+        return _pool
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+import uuid
+from career_coach import CareerCoachApp
+
+
+class AgentRegistry:
+    """
+    A process-wide registry that builds the CareerCoachApp once and shares it across user sessions.
+
+    Streamlit re-executes `app.py` on every interaction, but imported modules stay loaded for the lifetime
+    of the server process. Keeping the registry in this module means the Ollama client and the agents are
+    constructed once per process instead of once per rerun. Each user session still receives its own set
+    of agents (see `CareerCoachApp.for_session`) so per-run state is never shared between users.
+
+    Attributes:
+        build_seconds (float): How long constructing the shared CareerCoachApp took.
+        hits (int): Number of times the already-built application was reused.
+        misses (int): Number of times the application had to be built.
+        sessions (int): Number of per-session applications handed out.
+    """
+
+    SESSION_KEY = "career_coach_app"
+
+    def __init__(self, factory=CareerCoachApp):
+        """
+        Initializes an empty registry.
+
+        Parameters:
+            factory (callable): Builds the shared application (default is CareerCoachApp).
+        """
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._app = None
+        self.build_seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.sessions = 0
+
+    def get_app(self):
+        """
+        Returns the shared CareerCoachApp, building it on first use.
+
+        Returns:
+            CareerCoachApp: The process-wide application instance.
+        """
+        with self._lock:
+            if self._app is not None:
+                self.hits += 1
+                return self._app
+            self.misses += 1
+            start = time.perf_counter()
+            self._app = self._factory()
+            self.build_seconds = time.perf_counter() - start
+            logging.info("CareerCoachApp built in %.3fs", self.build_seconds)
+            return self._app
+
+    def session_app(self, session_state):
+        """
+        Returns the application bound to a user session, creating it the first time the session is seen.
+
+        Parameters:
+            session_state (MutableMapping): The per-session storage (e.g., `st.session_state`).
+
+        Returns:
+            CareerCoachApp: An application whose agents belong to this session only.
+        """
+        app = self.get_app()
+        session_app = session_state.get(self.SESSION_KEY)
+        if session_app is None:
+            session_id = session_state.get("session_id") or uuid.uuid4().hex
+            session_state["session_id"] = session_id
+            session_app = app.for_session(session_id)
+            session_state[self.SESSION_KEY] = session_app
+            with self._lock:
+                self.sessions += 1
+        return session_app
+
+    def stats(self):
+        """
+        Returns construction and cache statistics for the registry.
+
+        Returns:
+            dict: A dictionary with the build time, hit/miss counts, hit rate and number of sessions.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "build_seconds": self.build_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "sessions": self.sessions,
+            }
+
+    def reset(self):
+        """
+        Drops the shared application so the next lookup rebuilds it (e.g., after a configuration change).
+        """
+        with self._lock:
+            self._app = None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the process-wide AgentRegistry, creating it on first use.
+
+    Returns:
+        AgentRegistry: The shared registry.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+        return _registry
@@ -0,0 +1,416 @@
+"""
+Compaction of resumes and job descriptions before they are put into a prompt.
+
+Converted documents carry a lot that costs prefill time without helping the analysis: page numbers, headers
+and footers repeated on every page, conversion artifacts and boilerplate ("References available upon
+request"). The text is cleaned line by line, split into sections at its headings and, if it is still over
+the token budget, the least relevant sections are dropped or shortened. With a job description, a section's
+relevance is the share of the job description's keyword weight it contains (see `ats_match`); otherwise
+sections are ranked by how much they usually matter for the analysis.
+"""
+
+import re
+from ats_match import get_job_description_index, tokenize
+from config import compaction_settings
+from memory import estimate_tokens
+
+# Glyph placeholders left by PDF text extraction, removed wherever they occur.
+INLINE_ARTIFACTS = re.compile(r"GLYPH<[^>]*>|\(cid:\d+\)")
+
+# Lines that are conversion artifacts or page furniture rather than content.
+ARTIFACT_PATTERNS = [
+    re.compile(r"<!--\s*image\s*-->", re.IGNORECASE),
+    re.compile(r"(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?", re.IGNORECASE),
+    re.compile(r"[\W_]*"),
+]
+
+# Words that name a section; a short line made of them (or a markdown heading, or a short all-caps line with one
+# of them) starts a new section.
+SECTION_WORDS = frozenset(
+    """
+    about achievements activities affiliations apply awards benefits bring certifications company
+    competencies contact courses do duties education employment experience expertise for have history hobbies
+    honors how interests key languages leadership ll looking need nice objective offer perks professional
+    profile projects publications qualifications re references requirements responsibilities role skills
+    summary team technical the to training us volunteer we what will work you who your
+    """.split()
+)
+
+# How much a section usually matters for the analysis, by a word in its title (first match wins); sections
+# not listed get DEFAULT_SECTION_PRIORITY. Used to rank sections without a job description and to break ties.
+SECTION_PRIORITIES = [
+    ("experience", 3),
+    ("employment", 3),
+    ("skills", 3),
+    ("summary", 3),
+    ("profile", 3),
+    ("requirements", 3),
+    ("qualifications", 3),
+    ("responsibilities", 3),
+    ("projects", 2),
+    ("education", 2),
+    ("certifications", 2),
+    ("references", 0),
+    ("hobbies", 0),
+    ("interests", 0),
+    ("benefits", 0),
+    ("perks", 0),
+    ("offer", 0),
+    ("about us", 0),
+    ("about the company", 0),
+]
+DEFAULT_SECTION_PRIORITY = 1
+
+# Lines repeated this often are page headers or footers; lines seen fewer times (the same job title under two
+# employers, a bullet used in two roles) are content and are kept.
+REPEATED_LINE_COUNT = 3
+
+
+class Section:
+    """
+    One section of a document: its heading and its lines.
+
+    Attributes:
+        title (str): The heading, or "" for the text before the first heading (usually name and contact).
+        lines (list): The lines, heading included.
+        index (int): The section's position in the document.
+    """
+
+    def __init__(self, title, index):
+        """
+        Initializes an empty section.
+
+        Parameters:
+            title (str): The heading.
+            index (int): The section's position in the document.
+        """
+        self.title = title
+        self.lines = []
+        self.index = index
+
+    @property
+    def text(self):
+        """
+        Returns the section's text.
+
+        Returns:
+            str: The lines joined by newlines.
+        """
+        return "\n".join(self.lines)
+
+    @property
+    def priority(self):
+        """
+        Returns the usual importance of the section, from its title.
+
+        Returns:
+            int: The priority from SECTION_PRIORITIES.
+        """
+        title = self.title.lower()
+        for word, priority in SECTION_PRIORITIES:
+            if word in title:
+                return priority
+        return DEFAULT_SECTION_PRIORITY
+
+
+class CompactionResult:
+    """
+    A compacted document and what compaction did to it.
+
+    Attributes:
+        text (str): The compacted text.
+        tokens_before (int): Estimated tokens of the original text.
+        tokens_after (int): Estimated tokens of the compacted text.
+        lines_removed (int): Artifact, boilerplate and duplicate lines removed.
+        sections_kept (list): Titles of the sections kept in full.
+        sections_shortened (list): Titles of the sections cut short to fit the budget.
+        sections_dropped (list): Titles of the sections left out.
+    """
+
+    def __init__(
+        self,
+        text,
+        tokens_before,
+        tokens_after,
+        lines_removed=0,
+        sections_kept=None,
+        sections_shortened=None,
+        sections_dropped=None,
+    ):
+        """
+        Initializes the result.
+
+        Parameters:
+            text (str): The compacted text.
+            tokens_before (int): Estimated tokens of the original text.
+            tokens_after (int): Estimated tokens of the compacted text.
+            lines_removed (int): Lines removed while cleaning.
+            sections_kept (list, optional): Titles of the sections kept in full.
+            sections_shortened (list, optional): Titles of the sections cut short.
+            sections_dropped (list, optional): Titles of the sections left out.
+        """
+        self.text = text
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+        self.lines_removed = lines_removed
+        self.sections_kept = sections_kept or []
+        self.sections_shortened = sections_shortened or []
+        self.sections_dropped = sections_dropped or []
+
+    @property
+    def ratio(self):
+        """
+        Returns the share of the original tokens that remain.
+
+        Returns:
+            float: tokens_after / tokens_before (1.0 for an empty document).
+        """
+        return self.tokens_after / self.tokens_before if self.tokens_before else 1.0
+
+    def to_dict(self):
+        """
+        Returns the statistics of the compaction as a JSON-serializable dictionary.
+
+        Returns:
+            dict: Token counts, ratio, removed lines and the kept, shortened and dropped sections.
+        """
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "ratio": round(self.ratio, 3),
+            "lines_removed": self.lines_removed,
+            "sections_kept": self.sections_kept,
+            "sections_shortened": self.sections_shortened,
+            "sections_dropped": self.sections_dropped,
+        }
+
+
+def clean_lines(text, boilerplate_patterns=None):
+    """
+    Removes conversion artifacts, page furniture, boilerplate and repeated lines.
+
+    Later copies of a line that occurs at least `REPEATED_LINE_COUNT` times (page headers and footers) are
+    dropped; the first copy is kept. Lines repeated less often are kept, as they may be real content.
+
+    Parameters:
+        text (str): The document text.
+        boilerplate_patterns (list, optional): Regular expressions matching whole boilerplate lines (default
+            from `compaction_settings`).
+
+    Returns:
+        tuple: The remaining lines and the number of lines removed.
+    """
+    if boilerplate_patterns is None:
+        boilerplate_patterns = compaction_settings["boilerplate_patterns"]
+    boilerplate = [re.compile(p, re.IGNORECASE) for p in boilerplate_patterns]
+    lines = [" ".join(INLINE_ARTIFACTS.sub(" ", line).split()) for line in text.splitlines()]
+    counts = {}
+    for line in lines:
+        key = line.casefold()
+        counts[key] = counts.get(key, 0) + 1
+
+    kept, seen, removed = [], set(), 0
+    for line in lines:
+        if not line:
+            continue
+        key = line.casefold()
+        if any(p.fullmatch(line) for p in ARTIFACT_PATTERNS) or any(
+            p.fullmatch(line) for p in boilerplate
+        ):
+            removed += 1
+            continue
+        if key in seen and counts[key] >= REPEATED_LINE_COUNT:
+            removed += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept, removed
+
+
+def is_heading(line):
+    """
+    Returns whether a line looks like a section heading.
+
+    Markdown headings count, as do short lines made of section words ("Work Experience", "Skills:") and
+    short all-caps lines with a section word ("PROFESSIONAL EXPERIENCE", "CERTIFICATIONS & LICENSES"). Other
+    all-caps lines, such as a name ("JANE DOE") or a list of skills ("PYTHON, SQL"), are content.
+
+    Parameters:
+        line (str): A cleaned line.
+
+    Returns:
+        bool: True if the line starts a section.
+    """
+    if line.startswith("#"):
+        return True
+    title = line.rstrip(":").strip()
+    words = re.findall(r"[A-Za-z]+", title)
+    if not words or len(words) > 5 or title.endswith((".", ",", ";")):
+        return False
+    if all(word.lower() in SECTION_WORDS or word.lower() in ("and", "of", "&") for word in words):
+        return True
+    return title.isupper() and any(word.lower() in SECTION_WORDS for word in words)
+
+
+def split_sections(lines):
+    """
+    Splits cleaned lines into sections at their headings.
+
+    Parameters:
+        lines (list): The cleaned lines.
+
+    Returns:
+        list: The Section objects in document order; the first has an empty title if text precedes the first
+            heading.
+    """
+    sections = []
+    current = None
+    for line in lines:
+        if current is None or is_heading(line):
+            title = line.lstrip("#").rstrip(":").strip() if is_heading(line) else ""
+            current = Section(title, len(sections))
+            sections.append(current)
+        current.lines.append(line)
+    return sections
+
+
+def compact_text(text, token_budget, job_description=None, boilerplate_patterns=None):
+    """
+    Cleans a document and, if it is over the token budget, keeps its most relevant sections.
+
+    The first section, usually the name and contact details before the first heading, is always kept. The
+    other sections are taken whole in order of relevance as long as they fit the budget; then the most
+    relevant section that did not fit is shortened to the remaining budget (if at least `min_section_tokens`
+    are left) and the rest are dropped. Kept sections stay in document order.
+
+    Parameters:
+        text (str): The document text.
+        token_budget (int): Maximum estimated tokens of the result, or None for cleaning only.
+        job_description (str, optional): The job description sections are ranked against.
+        boilerplate_patterns (list, optional): Regular expressions matching whole boilerplate lines.
+
+    Returns:
+        CompactionResult: The compacted text and its statistics.
+    """
+    tokens_before = estimate_tokens(text)
+    lines, removed = clean_lines(text, boilerplate_patterns)
+    sections = split_sections(lines)
+    # A heading left without content (e.g., its only line was boilerplate) is dropped too, except at the top
+    empty = [s for s in sections if s.index and s.title and len(s.lines) == 1]
+    if empty:
+        sections = [s for s in sections if s not in empty]
+        removed += len(empty)
+    cleaned = "\n".join(line for s in sections for line in s.lines)
+    if token_budget is None or estimate_tokens(cleaned) <= token_budget:
+        return CompactionResult(
+            cleaned,
+            tokens_before,
+            estimate_tokens(cleaned),
+            removed,
+            sections_kept=[s.title for s in sections],
+        )
+
+    relevance = _relevance(sections, job_description)
+    ranked = sorted(
+        sections,
+        key=lambda s: (s.index != 0, -relevance[s.index], -s.priority, s.index),
+    )
+    budget = token_budget
+    kept, left_out = {}, []
+    for section in ranked:
+        tokens = estimate_tokens(section.text) + 1
+        if tokens <= budget:
+            kept[section.index] = section.lines
+            budget -= tokens
+        else:
+            left_out.append(section)
+    shortened, dropped = None, []
+    for section in left_out:
+        if shortened is None and budget >= compaction_settings["min_section_tokens"] and section.priority > 0:
+            kept[section.index] = _truncate(section.lines, budget)
+            shortened = section
+        else:
+            dropped.append(section.title)
+    compacted = "\n".join(line for index in sorted(kept) for line in kept[index])
+    return CompactionResult(
+        compacted,
+        tokens_before,
+        estimate_tokens(compacted),
+        removed,
+        sections_kept=[s.title for s in sections if s.index in kept and s is not shortened],
+        sections_shortened=[shortened.title] if shortened else [],
+        sections_dropped=dropped,
+    )
+
+
+def compact_resume(resume_text, job_description=None):
+    """
+    Compacts a resume to `compaction_settings["resume_token_budget"]`, ranking sections against the job
+    description when one is given.
+
+    Parameters:
+        resume_text (str): The text of the resume.
+        job_description (str, optional): The job description.
+
+    Returns:
+        CompactionResult: The compacted resume and its statistics.
+    """
+    return compact_text(
+        resume_text, compaction_settings["resume_token_budget"], job_description
+    )
+
+
+def compact_job_description(job_description):
+    """
+    Compacts a job description to `compaction_settings["job_description_token_budget"]`; company blurbs,
+    benefits and equal-opportunity statements go first.
+
+    Parameters:
+        job_description (str): The job description.
+
+    Returns:
+        CompactionResult: The compacted job description and its statistics.
+    """
+    return compact_text(
+        job_description, compaction_settings["job_description_token_budget"]
+    )
+
+
+def _relevance(sections, job_description):
+    # Share of the job description's keyword weight found in each section (all 0 without one)
+    if not job_description:
+        return {s.index: 0.0 for s in sections}
+    weights = get_job_description_index(job_description).weights
+    total = sum(weights.values()) or 1.0
+    return {
+        s.index: sum(weights[t] for t in set(tokenize(s.text)) if t in weights) / total
+        for s in sections
+    }
+
+
+def _truncate(lines, budget):
+    # The leading lines of a section that fit the budget (the heading at least), then as much of the next line
+    # as still fits, so a section of long paragraphs keeps more than its heading
+    kept = lines[:1]
+    budget -= estimate_tokens(lines[0]) + 1
+    for line in lines[1:]:
+        tokens = estimate_tokens(line) + 1
+        if tokens > budget:
+            cut = _cut(line, (budget - 1) * 4)
+            if cut:
+                kept.append(cut)
+            break
+        kept.append(line)
+        budget -= tokens
+    return kept
+
+
+def _cut(line, max_chars):
+    # The start of a line in at most `max_chars` characters (four per estimated token), ending after its last
+    # complete sentence or else its last complete word
+    head = line[: max_chars + 1] if max_chars > 0 else ""
+    if " " not in head:
+        return ""
+    head = head.rsplit(" ", 1)[0]
+    sentence_end = max(head.rfind(mark) for mark in (". ", "! ", "? "))
+    return head[: sentence_end + 1] if sentence_end > 0 else head
@@ -0,0 +1,459 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+from xml.etree import ElementTree
+from cache import DiskCache
+from config import ingest_settings, resume_cache
+from telemetry import span
+from workers import get_worker_pool
+
+# Glyph references pdfium returns for characters it cannot map to text.
+UNMAPPED_GLYPH = re.compile(r"\(cid:\d+\)|GLYPH<[^>]*>")
+
+# WordprocessingML namespace of the elements in word/document.xml.
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Largest uncompressed word/document.xml read directly; bigger ones (or zip bombs) are left to docling.
+MAX_DOCX_XML_BYTES = 50 * 1024 * 1024
+
+# Name of the extraction tier that reads the text without docling.
+DIRECT_TIER = "direct"
+
+# Used when docling (and its lock) is not installed.
+_pdfium_lock = threading.Lock()
+
+
+def page_text_ok(text, min_chars=None, max_bad_char_ratio=None):
+    """
+    Returns whether extracted page text is usable.
+
+    A page with almost no text (a scan, or text drawn as images) or with many unmapped glyphs and
+    replacement characters (a font without a usable encoding) needs a heavier extraction tier instead.
+
+    Parameters:
+        text (str): The extracted page text.
+        min_chars (int, optional): Minimum non-space characters (default from `ingest_settings`).
+        max_bad_char_ratio (float, optional): Maximum share of unreadable characters (default from
+            `ingest_settings`).
+
+    Returns:
+        bool: True if the text can be used as is.
+    """
+    if min_chars is None:
+        min_chars = ingest_settings["min_page_chars"]
+    if max_bad_char_ratio is None:
+        max_bad_char_ratio = ingest_settings["max_bad_char_ratio"]
+    compact = "".join(text.split())
+    if len(compact) < min_chars:
+        return False
+    bad = sum(len(m) for m in UNMAPPED_GLYPH.findall(compact))
+    bad += sum(1 for c in compact if c == "�" or not c.isprintable())
+    return bad / len(compact) <= max_bad_char_ratio
+
+
+def extract_docx_text(data):
+    """
+    Reads the paragraphs of a DOCX file straight from its document XML.
+
+    Table cells and text boxes are read as paragraphs of their own; headers, footers and images are skipped.
+
+    Parameters:
+        data (bytes): The DOCX file contents.
+
+    Returns:
+        str: The text, one paragraph per line, or None if the file is not a readable DOCX.
+    """
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            info = archive.getinfo("word/document.xml")
+            if info.file_size > MAX_DOCX_XML_BYTES:
+                return None
+            root = ElementTree.fromstring(archive.read(info))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return None
+    lines = []
+    for paragraph in root.iter(f"{WORD_NAMESPACE}p"):
+        parts = []
+        _collect_runs(paragraph, parts)
+        line = "".join(parts).strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _collect_runs(node, parts):
+    # Appends a paragraph's text; nested paragraphs (text boxes) are read on their own by the caller
+    for child in node:
+        if child.tag == f"{WORD_NAMESPACE}p":
+            continue
+        if child.tag == f"{WORD_NAMESPACE}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{WORD_NAMESPACE}tab":
+            parts.append("\t")
+        elif child.tag in (f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"):
+            parts.append(" ")
+        else:
+            _collect_runs(child, parts)
+
+
+class ResumeIngestor:
+    """
+    Converts uploaded resumes to plain text with a tiered extractor, caching the results.
+
+    Converted text is keyed by the SHA-256 hash of the uploaded bytes and kept in a small in-memory LRU
+    in front of a persistent DiskCache, so re-analysing the same resume never converts it again. Documents
+    are converted straight from memory; nothing is written to the working directory.
+
+    Extraction escalates through tiers until the text passes `page_text_ok`. The direct tier reads a PDF's
+    text layer page by page (pypdfium2) or a DOCX file's XML, in milliseconds and without loading any model.
+    Pages it cannot read go through the docling tiers in `ingest_settings["docling_tiers"]`, e.g., layout
+    analysis without OCR first and with OCR last (see `iter_pages`). Each docling tier has its own converter,
+    built (and docling imported) on first use. Attempts, accepted pages and time are recorded per tier.
+
+    With a worker pool, docling conversions run in the pool's processes (each with its own converters) so
+    they do not hold this process's GIL; the persistent cache is shared by every process using the same path.
+
+    Attributes:
+        store (DiskCache): Persistent storage for converted text.
+        memory_items (int): Maximum number of converted resumes kept in memory.
+        worker_pool (WorkerPool): The processes docling runs in, or None to convert in-process.
+        conversions (int): Number of documents converted.
+        conversion_seconds (float): Total time spent converting documents.
+        memory_hits (int): Number of lookups served from memory.
+        disk_hits (int): Number of lookups served from the persistent cache.
+        tiers (dict): Per extraction tier: pages attempted, pages accepted and seconds spent.
+    """
+
+    def __init__(self, store, memory_items=32, worker_pool=None):
+        """
+        Initializes the ingestor. The docling converters are built on first use.
+
+        Parameters:
+            store (DiskCache): Persistent storage for converted text.
+            memory_items (int): Maximum number of converted resumes kept in memory (default is 32).
+            worker_pool (WorkerPool, optional): Processes to run docling in (default is this process).
+        """
+        self.store = store
+        self.memory_items = memory_items
+        self.worker_pool = worker_pool
+        self.conversions = 0
+        self.conversion_seconds = 0.0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.tiers = {
+            tier: {"attempts": 0, "accepted": 0, "seconds": 0.0}
+            for tier in [DIRECT_TIER, *ingest_settings["docling_tiers"]]
+        }
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._converters = {}
+        self._converter_lock = threading.Lock()
+
+    @property
+    def converter(self):
+        """
+        Returns the converter of the first docling tier, building it on first use.
+
+        Returns:
+            DocumentConverter: The converter documents escalate to first.
+        """
+        return self.converter_for(next(iter(ingest_settings["docling_tiers"])))
+
+    def converter_for(self, tier):
+        """
+        Returns the docling DocumentConverter of a tier, building it with the tier's PDF pipeline options on
+        first use.
+
+        Parameters:
+            tier (str): A key of `ingest_settings["docling_tiers"]`.
+
+        Returns:
+            DocumentConverter: The converter.
+        """
+        with self._converter_lock:
+            if tier not in self._converters:
+                from docling.datamodel.base_models import InputFormat
+                from docling.datamodel.pipeline_options import PdfPipelineOptions
+                from docling.document_converter import DocumentConverter, PdfFormatOption
+
+                options = ingest_settings["docling_tiers"][tier]
+                logging.info("Building docling DocumentConverter for the %s tier: %s", tier, options)
+                self._converters[tier] = DocumentConverter(
+                    format_options={
+                        InputFormat.PDF: PdfFormatOption(
+                            pipeline_options=PdfPipelineOptions(**options)
+                        )
+                    }
+                )
+            return self._converters[tier]
+
+    @staticmethod
+    def content_hash(data):
+        """
+        Returns the content hash used as the cache key for an upload.
+
+        Parameters:
+            data (bytes): The uploaded file contents.
+
+        Returns:
+            str: The SHA-256 hex digest of the contents.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def ingest(self, data, filename, on_progress=None):
+        """
+        Returns the plain text of a resume, converting it only if it has not been seen before.
+
+        Each call is recorded as a "document_conversion" span noting where the text came from.
+
+        Parameters:
+            data (bytes): The uploaded file contents.
+            filename (str): The original file name, used by docling to detect the format.
+            on_progress (callable, optional): Called as `on_progress(pages_done, page_count, text_so_far)`
+                after each page while the document is being converted.
+
+        Returns:
+            str: The text of the resume.
+        """
+        with span("document_conversion", bytes=len(data)) as conversion_span:
+            key = self.content_hash(data)
+            with self._lock:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    conversion_span.set(source="memory")
+                    return self._memory[key]
+
+            text = self.store.get(key)
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                conversion_span.set(source="disk")
+            else:
+                text, source = self._convert(data, filename, on_progress)
+                self.store.set(key, text)
+                conversion_span.set(source=source)
+            self._remember(key, text)
+            return text
+
+    def stats(self):
+        """
+        Returns conversion and cache statistics.
+
+        Returns:
+            dict: Conversion count and time, per-tier attempts, hit rate and time, memory and disk hits, and
+                the storage statistics.
+        """
+        with self._lock:
+            tiers = {
+                tier: dict(
+                    counts,
+                    hit_rate=counts["accepted"] / counts["attempts"] if counts["attempts"] else 0.0,
+                )
+                for tier, counts in self.tiers.items()
+            }
+        return {
+            "conversions": self.conversions,
+            "conversion_seconds": self.conversion_seconds,
+            "tiers": tiers,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "store": self.store.stats(),
+        }
+
+    def iter_pages(self, data, filename):
+        """
+        Converts a document page by page, yielding each page's text as soon as it is available.
+
+        The direct tier reads every page first. Pages whose text fails `page_text_ok` escalate one at a time
+        through the docling tiers, unless more than `docling_page_share` of the pages fail, in which case the
+        whole document escalates in one call per tier. Documents the direct tier cannot read (e.g., legacy
+        .doc files) go straight to docling. Non-PDF documents only use the first docling tier, since the PDF
+        pipeline options do not apply to them.
+
+        Parameters:
+            data (bytes): The file contents.
+            filename (str): The file name, used by docling to detect the format.
+
+        Yields:
+            tuple: The page number (1-based), the page count, the page text and the tier it came from; a
+                document converted in one call is yielded once, as its last page.
+        """
+        pages = self._extract_direct(data)
+        poor = [i for i, text in enumerate(pages or []) if not page_text_ok(text)]
+        if pages:
+            self._record(DIRECT_TIER, accepted=len(pages) - len(poor), attempts=0)
+        if not pages or len(poor) > ingest_settings["docling_page_share"] * len(pages):
+            count = len(pages) if pages else 1
+            text, tier = self._escalate(data, filename, None, count)
+            yield count, count, text, tier
+            return
+        for number, text in enumerate(pages, start=1):
+            if number - 1 in poor:
+                text, tier = self._escalate(data, filename, (number, number), 1)
+                yield number, len(pages), text, tier
+            else:
+                yield number, len(pages), text, DIRECT_TIER
+
+    def _convert(self, data, filename, on_progress=None):
+        # Returns the text and the tier it came from (or "mixed")
+        start = time.perf_counter()
+        parts, sources = [], set()
+        for number, count, text, source in self.iter_pages(data, filename):
+            parts.append(text.strip())
+            sources.add(source)
+            if on_progress is not None:
+                on_progress(number, count, "\n".join(parts))
+        text = "\n".join(parts)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.conversions += 1
+            self.conversion_seconds += elapsed
+        source = sources.pop() if len(sources) == 1 else "mixed"
+        logging.info("Resume converted in %.2fs (%s)", elapsed, source)
+        return text, source
+
+    def _extract_direct(self, data):
+        # The text of each page (a DOCX file is one page), or None if the direct tier cannot read the document
+        if not ingest_settings["direct_extraction"]:
+            return None
+        start = time.perf_counter()
+        if data.startswith(b"%PDF"):
+            pages = self._read_text_layer(data)
+        elif data.startswith(b"PK"):
+            text = extract_docx_text(data)
+            pages = None if text is None else [text]
+        else:
+            pages = None
+        if pages:
+            self._record(DIRECT_TIER, attempts=len(pages), seconds=time.perf_counter() - start)
+        return pages
+
+    def _read_text_layer(self, data):
+        try:
+            import pypdfium2
+        except ImportError:
+            return None
+        try:
+            from docling.utils.locks import pypdfium2_lock as lock
+        except ImportError:
+            lock = _pdfium_lock
+        # pdfium is not thread-safe; docling's PDF backend holds the same lock
+        with lock:
+            try:
+                pdf = pypdfium2.PdfDocument(data)
+            except pypdfium2.PdfiumError as e:
+                logging.info("No text layer read: %s", e)
+                return None
+            try:
+                pages = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    # pdfium ends lines with CRLF
+                    pages.append("\n".join(textpage.get_text_bounded().splitlines()))
+                    textpage.close()
+                    page.close()
+                return pages
+            finally:
+                pdf.close()
+
+    def _escalate(self, data, filename, page_range, pages):
+        # Runs the docling tiers in order until one produces usable text; returns the text and the tier
+        tiers = list(ingest_settings["docling_tiers"])
+        if not data.startswith(b"%PDF"):
+            tiers = tiers[:1]
+        for tier in tiers:
+            start = time.perf_counter()
+            if self.worker_pool is not None:
+                text = self.worker_pool.run(convert_document, data, filename, page_range, tier)
+            else:
+                text = self._run_docling(data, filename, page_range, tier)
+            accepted = page_text_ok(text)
+            self._record(
+                tier,
+                attempts=pages,
+                accepted=pages if accepted else 0,
+                seconds=time.perf_counter() - start,
+            )
+            if accepted:
+                break
+            if tier != tiers[-1]:
+                logging.info("%s tier produced unusable text for %s; escalating", tier, filename)
+        return text, tier
+
+    def _run_docling(self, data, filename, page_range=None, tier=None):
+        from docling.datamodel.base_models import DocumentStream
+
+        converter = self.converter if tier is None else self.converter_for(tier)
+        source = DocumentStream(name=filename, stream=BytesIO(data))
+        if page_range is None:
+            result = converter.convert(source)
+        else:
+            result = converter.convert(source, page_range=page_range)
+        return result.document.export_to_text()
+
+    def _record(self, tier, attempts=0, accepted=0, seconds=0.0):
+        with self._lock:
+            counts = self.tiers[tier]
+            counts["attempts"] += attempts
+            counts["accepted"] += accepted
+            counts["seconds"] += seconds
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+_worker_ingestor = None
+
+
+def convert_document(data, filename, page_range=None, tier=None):
+    """
+    Converts one document with docling in the calling process (the task run by conversion worker processes).
+
+    The worker keeps its converters between tasks; caching stays with the process that sent the task.
+
+    Parameters:
+        data (bytes): The file contents.
+        filename (str): The file name, used by docling to detect the format.
+        page_range (tuple, optional): The first and last page (1-based) to convert (default is every page).
+        tier (str, optional): The docling tier whose converter is used (default is the first).
+
+    Returns:
+        str: The text of the document.
+    """
+    global _worker_ingestor
+    if _worker_ingestor is None:
+        _worker_ingestor = ResumeIngestor(store=None)
+    return _worker_ingestor._run_docling(data, filename, page_range, tier)
+
+
+def get_resume_ingestor():
+    """
+    Returns the process-wide ResumeIngestor, creating it on first use.
+
+    Returns:
+        ResumeIngestor: The shared ingestor configured from `config.resume_cache`.
+    """
+    global _ingestor
+    with _ingestor_lock:
+        if _ingestor is None:
+            store = DiskCache(
+                resume_cache["path"],
+                ttl_seconds=resume_cache.get("ttl_seconds"),
+                max_bytes=resume_cache.get("max_bytes"),
+            )
+            _ingestor = ResumeIngestor(
+                store, resume_cache.get("memory_items", 32), get_worker_pool()
+            )
+        return _ingestor
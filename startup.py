@@ -0,0 +1,206 @@
+"""
+Start-up helpers: background warm-up of heavy modules and an import-time profiler.
+
+Run `python startup.py` to print an import-time breakdown of a cold worker process.
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+from config import startup_settings
+from logging_setup import configure_logging
+
+# Modules an application worker imports, from the pages' entry points down to the heavy dependencies.
+APP_MODULES = ["streamlit", "registry", "career_coach", "tools", "resume_ingest", "jobs"]
+
+# Loaded only by the Resume Analysis page.
+RESUME_MODULES = ["docling.datamodel.base_models", "docling.document_converter"]
+
+
+def profiling_enabled():
+    """
+    Returns whether start-up profiling is on (config or the CAREER_COACH_PROFILE_STARTUP variable).
+
+    Returns:
+        bool: True if import times should be profiled and reported.
+    """
+    return bool(
+        startup_settings["profile_imports"]
+        or os.environ.get("CAREER_COACH_PROFILE_STARTUP")
+    )
+
+
+class ImportProfiler:
+    """
+    Measures how long each newly imported module takes to load.
+
+    While active, the profiler wraps `builtins.__import__` and records the cumulative load time (including
+    the module's own imports) of every module that was not yet in `sys.modules`. Use it as a context manager.
+
+    Attributes:
+        timings (dict): Maps module names to cumulative load time in seconds.
+    """
+
+    def __init__(self):
+        """
+        Initializes an inactive profiler.
+        """
+        self.timings = {}
+        self._original_import = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._original_import = builtins.__import__
+        original_import = self._original_import
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.timings.setdefault(name, elapsed)
+
+        builtins.__import__ = timed_import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original_import
+        return False
+
+    def report(self, top=20):
+        """
+        Formats the slowest imports as a table.
+
+        Top-level packages are listed first since their time includes their submodules.
+
+        Parameters:
+            top (int): Number of modules listed (default is 20).
+
+        Returns:
+            str: The import-time breakdown.
+        """
+        ranked = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        lines = [f"{'seconds':>9}  module"]
+        lines += [f"{seconds:9.3f}  {name}" for name, seconds in ranked[:top]]
+        return "\n".join(lines)
+
+
+def warm_up(modules=None, build_app=True, build_resume_converter=False, prime_prompts=False):
+    """
+    Imports heavy modules and builds shared objects ahead of the first request that needs them.
+
+    Parameters:
+        modules (list, optional): Modules to import (default is `startup_settings["warm_up_modules"]`).
+        build_app (bool): Whether to build the shared CareerCoachApp (default is True).
+        build_resume_converter (bool): Whether to build the docling converter (default is False).
+        prime_prompts (bool): Whether to prime the model server's prompt cache with every agent's system
+            prompt (default is False; requires `build_app`).
+
+    Returns:
+        dict: Seconds spent on each step.
+    """
+    timings = {}
+    for name in modules if modules is not None else startup_settings["warm_up_modules"]:
+        start = time.perf_counter()
+        try:
+            # __import__ (unlike importlib.import_module) is seen by an active ImportProfiler
+            __import__(name)
+        except ImportError as e:
+            logging.warning("Warm-up could not import %s: %s", name, e)
+        timings[name] = time.perf_counter() - start
+    if build_app:
+        from registry import get_registry
+
+        start = time.perf_counter()
+        app = get_registry().get_app()
+        timings["CareerCoachApp"] = time.perf_counter() - start
+        if prime_prompts:
+            start = time.perf_counter()
+            app.warm_up_prompts()
+            timings["prompt cache"] = time.perf_counter() - start
+    if build_resume_converter:
+        from resume_ingest import get_resume_ingestor
+
+        ingestor = get_resume_ingestor()
+        # Documents are converted by the worker processes' own converters when there is a worker pool
+        if ingestor.worker_pool is None:
+            start = time.perf_counter()
+            # Accessing the property builds the converter
+            ingestor.converter
+            timings["DocumentConverter"] = time.perf_counter() - start
+    return timings
+
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+def start_background_warm_up():
+    """
+    Starts `warm_up` on a daemon thread, once per process, if enabled in `startup_settings`.
+
+    With profiling enabled the warm-up runs under an ImportProfiler and the breakdown is logged.
+
+    Returns:
+        threading.Thread: The warm-up thread, or None if warm-up is disabled.
+    """
+    global _warm_up_thread
+    if not startup_settings["warm_up"]:
+        return None
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_run_warm_up, name="warm-up", daemon=True
+            )
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def _run_warm_up():
+    start = time.perf_counter()
+    options = {
+        "build_resume_converter": startup_settings["warm_up_resume_converter"],
+        "prime_prompts": startup_settings["warm_up_prompts"],
+    }
+    try:
+        if profiling_enabled():
+            with ImportProfiler() as profiler:
+                timings = warm_up(**options)
+            logging.info("Warm-up import breakdown:\n%s", profiler.report())
+        else:
+            timings = warm_up(**options)
+    except Exception:
+        logging.exception("Warm-up failed")
+        return
+    logging.info(
+        "Warm-up finished in %.2fs: %s",
+        time.perf_counter() - start,
+        ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()),
+    )
+
+
+def main():
+    """
+    Prints the import-time breakdown of a cold process loading the application and its heavy dependencies.
+    """
+    configure_logging()
+    start = time.perf_counter()
+    with ImportProfiler() as profiler:
+        for name in APP_MODULES + startup_settings["warm_up_modules"] + RESUME_MODULES:
+            try:
+                __import__(name)
+            except ImportError as e:
+                print(f"Could not import {name}: {e}", file=sys.stderr)
+    print(profiler.report())
+    print(f"Total: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
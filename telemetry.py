@@ -0,0 +1,351 @@
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import telemetry_settings
+from logging_setup import process_file
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed stage of a request (page handler, prompt build, search, generation, ...).
+
+    Spans started while another span is active become its children and share its trace id, so all stages
+    of one page interaction can be grouped together. The context is copied into job worker threads, so a
+    generation running in the background is still attributed to the page that submitted it.
+
+    Attributes:
+        name (str): The stage name (e.g., "generation").
+        trace_id (str): Identifier shared by all spans of one request.
+        span_id (str): Identifier of this span.
+        parent_id (str): Identifier of the parent span, or None for a root span.
+        attributes (dict): Additional data (agent, page, token counts, ...).
+        start (float): Wall-clock start time (time.time()).
+        duration (float): Duration in seconds, set when the span finishes.
+        error (str): The error raised inside the span, if any.
+    """
+
+    def __init__(self, telemetry, name, attributes):
+        parent = _current_span.get()
+        self.telemetry = telemetry
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes):
+        """
+        Adds attributes to the span.
+
+        Parameters:
+            **attributes: The attributes to add.
+        """
+        self.attributes.update(attributes)
+
+    def finish(self, error=None):
+        """
+        Ends the span and hands it to the telemetry exporters. Finishing twice has no effect.
+
+        Parameters:
+            error (BaseException, optional): The error that ended the span.
+        """
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.telemetry.record(self)
+
+    def to_dict(self):
+        """
+        Returns the span as a JSON-serializable dictionary.
+
+        Returns:
+            dict: The span fields.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Telemetry:
+    """
+    Collects spans and exports them as JSON lines and Prometheus-style metrics.
+
+    Spans are written to the JSON-lines file by a background thread so the request thread never blocks
+    on disk; the file is rotated by size like the application log. Latency histograms are kept per stage and target (the agent or page of the span), along with
+    token counters for generations and a counter of generations coalesced into identical in-flight ones.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded.
+        recent (deque): The most recently finished spans.
+    """
+
+    def __init__(self, jsonl_path=None, enabled=True, max_recent=1000, max_bytes=None, backup_count=5):
+        """
+        Initializes the collector.
+
+        Parameters:
+            jsonl_path (str, optional): File the spans are appended to as JSON lines.
+            enabled (bool): Whether spans are recorded (default is True).
+            max_recent (int): Number of finished spans kept in memory (default is 1000).
+            max_bytes (int, optional): Size at which the JSON-lines file is rotated (default is never).
+            backup_count (int): Number of rotated files kept (default is 5).
+        """
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.recent = deque(maxlen=max_recent)
+        self._histograms = {}
+        self._tokens = {}
+        self._coalesced = {}
+        self._lock = threading.Lock()
+        self._queue = None
+        if jsonl_path and enabled:
+            self._queue = queue.SimpleQueue()
+            threading.Thread(
+                target=self._write_lines,
+                args=(jsonl_path,),
+                name="telemetry-writer",
+                daemon=True,
+            ).start()
+
+    def start_span(self, name, **attributes):
+        """
+        Starts a span without making it the current span; call `finish` on it when the stage ends.
+
+        Useful for stages that span generator yields, where activating the span would leak it to the caller.
+
+        Parameters:
+            name (str): The stage name.
+            **attributes: Initial attributes.
+
+        Returns:
+            Span: The started span.
+        """
+        return Span(self, name, attributes)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Times the enclosed block as a span and makes it the parent of spans started inside it.
+
+        Parameters:
+            name (str): The stage name.
+            **attributes: Initial attributes.
+
+        Yields:
+            Span: The active span.
+        """
+        span = Span(self, name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            # BaseExceptions (e.g., Streamlit's rerun signal) are control flow, not errors
+            span.finish(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def record(self, span):
+        """
+        Records a finished span in the histograms, the recent list and the JSON-lines export.
+
+        Parameters:
+            span (Span): The finished span.
+        """
+        if not self.enabled:
+            return
+        target = span.attributes.get("agent") or span.attributes.get("page") or ""
+        with self._lock:
+            histogram = self._histograms.setdefault(
+                (span.name, target),
+                {"buckets": [0] * len(LATENCY_BUCKETS), "count": 0, "sum": 0.0},
+            )
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if span.duration <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["count"] += 1
+            histogram["sum"] += span.duration
+            for kind in ("input_tokens", "output_tokens"):
+                if span.attributes.get(kind):
+                    key = (target, kind)
+                    self._tokens[key] = self._tokens.get(key, 0) + span.attributes[kind]
+            if span.attributes.get("coalesced"):
+                self._coalesced[target] = self._coalesced.get(target, 0) + 1
+            self.recent.append(span)
+        if self._queue is not None:
+            self._queue.put(span.to_dict())
+
+    def render_prometheus(self):
+        """
+        Renders the collected metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        lines = [
+            "# HELP career_coach_stage_seconds Duration of request stages.",
+            "# TYPE career_coach_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (stage, target), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",target="{target}"'
+                for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                    lines.append(
+                        f'career_coach_stage_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'career_coach_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}'
+                )
+                lines.append(f"career_coach_stage_seconds_sum{{{labels}}} {histogram['sum']}")
+                lines.append(f"career_coach_stage_seconds_count{{{labels}}} {histogram['count']}")
+            lines += [
+                "# HELP career_coach_tokens_total Tokens processed by the model.",
+                "# TYPE career_coach_tokens_total counter",
+            ]
+            for (target, kind), count in sorted(self._tokens.items()):
+                lines.append(
+                    f'career_coach_tokens_total{{target="{target}",kind="{kind}"}} {count}'
+                )
+            lines += [
+                "# HELP career_coach_coalesced_total Generations shared with an identical in-flight request.",
+                "# TYPE career_coach_coalesced_total counter",
+            ]
+            for target, count in sorted(self._coalesced.items()):
+                lines.append(f'career_coach_coalesced_total{{target="{target}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """
+        Serves the Prometheus metrics page at /metrics on a background thread.
+
+        Parameters:
+            port (int): The port to listen on.
+            host (str): The interface to bind (default is 127.0.0.1).
+
+        Returns:
+            ThreadingHTTPServer: The running server.
+        """
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="metrics-server", daemon=True
+        ).start()
+        logging.info("Serving metrics on http://%s:%s/metrics", host, port)
+        return server
+
+    def _write_lines(self, path):
+        f = open(path, "a", encoding="utf-8")
+        size = f.tell()
+        while True:
+            lines = [json.dumps(self._queue.get())]
+            # Drain whatever queued up meanwhile before paying for a flush
+            while not self._queue.empty():
+                lines.append(json.dumps(self._queue.get()))
+            data = "\n".join(lines) + "\n"
+            if self.max_bytes and size and size + len(data) > self.max_bytes:
+                f.close()
+                self._rotate(path)
+                f = open(path, "a", encoding="utf-8")
+                size = 0
+            f.write(data)
+            f.flush()
+            size += len(data)
+
+    def _rotate(self, path):
+        # Shifts path.1 ... path.N up by one (dropping the oldest) and moves the current file to path.1
+        if self.backup_count <= 0:
+            os.remove(path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry():
+    """
+    Returns the process-wide Telemetry collector, creating it (and the metrics server) on first use.
+
+    Returns:
+        Telemetry: The shared collector configured from `config.telemetry_settings`.
+    """
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry(
+                jsonl_path=process_file(telemetry_settings["jsonl_path"]),
+                enabled=telemetry_settings["enabled"],
+                max_bytes=telemetry_settings.get("max_bytes"),
+                backup_count=telemetry_settings.get("backup_count", 5),
+            )
+            port = telemetry_settings["prometheus_port"]
+            if port and telemetry_settings["enabled"]:
+                try:
+                    _telemetry.start_http_server(port)
+                except OSError as e:
+                    # Another worker process on this host already serves the port
+                    logging.warning("Metrics server not started: %s", e)
+        return _telemetry
+
+
+def span(name, **attributes):
+    """
+    Times a block as a span of the shared collector (see `Telemetry.span`).
+
+    Parameters:
+        name (str): The stage name.
+        **attributes: Initial attributes.
+
+    Returns:
+        ContextManager[Span]: The span context manager.
+    """
+    return get_telemetry().span(name, **attributes)
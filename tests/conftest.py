@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+# The application modules live at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mock_ollama():
+    """
+    A fast mock Ollama server (see `benchmarks.mock_ollama`), stopped after the test.
+    """
+    from benchmarks.mock_ollama import MockOllamaServer
+
+    server = MockOllamaServer(
+        output_tokens=20,
+        tokens_per_second=2000,
+        latency_seconds=0,
+        prefill_seconds_per_1k_tokens=0,
+    ).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def coach(mock_ollama, tmp_path, monkeypatch):
+    """
+    A CareerCoachApp routed to `mock_ollama`, with its response and search caches under `tmp_path`, and
+    admission control and telemetry off.
+    """
+    import config
+    import model_backends
+    import telemetry
+    import tools
+    from career_coach import CareerCoachApp
+
+    monkeypatch.setitem(config.model_settings, "endpoints", [mock_ollama.url])
+    monkeypatch.setitem(config.model_settings, "health_check_seconds", 0)
+    monkeypatch.setitem(config.response_cache, "path", str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setitem(config.search_settings, "cache_path", str(tmp_path / "search.sqlite3"))
+    monkeypatch.setitem(config.telemetry_settings, "enabled", False)
+    monkeypatch.setitem(config.admission_settings, "enabled", False)
+    monkeypatch.setattr(model_backends, "_pool", None)
+    monkeypatch.setattr(telemetry, "_telemetry", None)
+    monkeypatch.setattr(tools, "_service", None)
+    return CareerCoachApp()
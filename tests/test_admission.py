@@ -0,0 +1,136 @@
+import threading
+import time
+import pytest
+from admission import AdmissionController, Overloaded
+
+
+class Waiter:
+    """
+    Runs `acquire` on a thread and records the ticket or the Overloaded error.
+    """
+
+    def __init__(self, controller, priority="standard", session_id=None):
+        self.ticket = None
+        self.queued = threading.Event()
+        self.finished = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run, args=(controller, priority, session_id), daemon=True
+        )
+        self.thread.start()
+        assert self.queued.wait(5) or self.finished.wait(5)
+
+    def _run(self, controller, priority, session_id):
+        try:
+            self.ticket = controller.acquire(
+                priority, session_id, on_queued=self._on_queued
+            )
+        except Overloaded as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def _on_queued(self, ticket):
+        self.ticket = ticket
+        self.queued.set()
+
+
+def test_admits_up_to_max_concurrent_then_queues():
+    controller = AdmissionController(max_concurrent=2)
+    controller.acquire()
+    controller.acquire()
+    waiter = Waiter(controller)
+    assert not waiter.finished.is_set()
+    assert waiter.ticket.position == 1
+    assert controller.stats()["waiting"] == 1
+
+    controller.release(1.0)
+    assert waiter.finished.wait(5)
+    assert waiter.error is None
+    assert waiter.ticket.admitted
+    assert controller.stats()["running"] == 2
+
+
+def test_queue_is_ordered_by_priority_then_arrival():
+    controller = AdmissionController(max_concurrent=1)
+    controller.acquire()
+    batch = Waiter(controller, "batch")
+    first = Waiter(controller, "standard")
+    second = Waiter(controller, "standard")
+    interactive = Waiter(controller, "interactive")
+    assert [w.ticket.position for w in (interactive, first, second, batch)] == [1, 2, 3, 4]
+
+    expected = [interactive, first, second, batch]
+    for index, waiter in enumerate(expected):
+        controller.release()
+        assert waiter.finished.wait(5)
+        assert not any(later.finished.is_set() for later in expected[index + 1 :])
+
+
+def test_withdraw_wakes_the_waiter_with_cancelled():
+    controller = AdmissionController(max_concurrent=1)
+    controller.acquire()
+    waiter = Waiter(controller)
+    waiter.ticket.withdraw()
+    assert waiter.finished.wait(5)
+    assert waiter.error.reason == "cancelled"
+    assert controller.stats()["waiting"] == 0
+    # The freed queue place is not admitted by the next release
+    controller.release()
+    assert controller.stats()["running"] == 0
+
+
+def test_full_queue_sheds_its_lowest_priority_request():
+    controller = AdmissionController(max_concurrent=1, max_queue=2)
+    controller.acquire()
+    batch = Waiter(controller, "batch")
+    standard = Waiter(controller, "standard")
+    interactive = Waiter(controller, "interactive")
+    assert batch.finished.wait(5)
+    assert batch.error.reason == "shed"
+    assert not standard.finished.is_set()
+    assert not interactive.finished.is_set()
+
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire("batch")
+    assert rejected.value.reason == "queue_full"
+    assert controller.stats()["rejected"] == {"shed": 1, "queue_full": 1}
+    standard.ticket.withdraw()
+    interactive.ticket.withdraw()
+
+
+def test_rejects_requests_that_would_wait_too_long():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=10)
+    with controller.slot():
+        pass
+    controller.average_seconds = 30.0
+    controller.acquire()
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire()
+    assert rejected.value.reason == "wait_too_long"
+    assert rejected.value.retry_after == 30.0
+
+
+def test_waiting_past_the_queue_timeout_is_rejected():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+    controller.acquire()
+    start = time.monotonic()
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire()
+    assert rejected.value.reason == "timeout"
+    assert time.monotonic() - start >= 0.05
+    assert controller.stats()["waiting"] == 0
+
+
+def test_rate_limits_each_session_separately():
+    controller = AdmissionController(
+        max_concurrent=10, rate_limits={"interactive": {"per_minute": 6, "burst": 2}}
+    )
+    for _ in range(2):
+        controller.acquire("interactive", "a")
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire("interactive", "a")
+    assert rejected.value.reason == "rate_limited"
+    assert 9 <= rejected.value.retry_after <= 10
+    controller.acquire("interactive", "b")
+    controller.acquire("standard", "a")
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+
+import pytest
+import tornado.httpclient
+import tornado.httpserver
+import tornado.netutil
+
+from api_server import OPENING_QUESTION, SessionStore, make_app
+
+
+@pytest.fixture
+def api(coach, monkeypatch):
+    """
+    Calls the API, served on a free port for the duration of each call, with the `coach` application.
+    """
+    import registry
+
+    monkeypatch.setattr(registry, "_registry", registry.AgentRegistry(lambda: coach))
+    sessions = SessionStore()
+
+    def call(*requests):
+        async def run():
+            sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+            server = tornado.httpserver.HTTPServer(make_app(sessions))
+            server.add_sockets(sockets)
+            port = sockets[0].getsockname()[1]
+            client = tornado.httpclient.AsyncHTTPClient()
+            session_id, responses = None, []
+            for path, body in requests:
+                response = await client.fetch(
+                    f"http://127.0.0.1:{port}/api/v1/{path}",
+                    method="POST",
+                    body=json.dumps(body),
+                    headers={"X-Session-Id": session_id} if session_id else {},
+                    raise_error=False,
+                )
+                session_id = response.headers.get("X-Session-Id", session_id)
+                responses.append((response.code, json.loads(response.body)))
+            server.stop()
+            return responses
+
+        return asyncio.run(run())
+
+    call.sessions = sessions
+    return call
+
+
+def test_invalid_interview_request_leaves_the_interview_unchanged(api):
+    responses = api(
+        ("interview", {"position": "SRE", "question_type": "Technical"}),
+        ("interview", {"answer": "I keep systems running"}),
+        ("interview", {"question_type": "Technical"}),
+    )
+    assert [code for code, _ in responses] == [200, 200, 400]
+    assert responses[0][1]["response"] == OPENING_QUESTION
+    assert responses[2][1]["error"] == "Missing field: position"
+    (state,) = api.sessions._sessions.values()
+    memory = state["interview_memory"]
+    assert [role for role, _ in memory.turns] == ["assistant", "user", "assistant"]
+    assert "SRE position" in memory.header
+
+
+def test_resume_analysis_builds_its_prompt_off_the_event_loop(api, monkeypatch):
+    from career_coach import CareerCoachApp
+
+    threads = []
+    resume_prompt = CareerCoachApp.resume_prompt
+
+    def recording_resume_prompt(*args):
+        threads.append(threading.current_thread())
+        return resume_prompt(*args)
+
+    monkeypatch.setattr(CareerCoachApp, "resume_prompt", staticmethod(recording_resume_prompt))
+    ((code, body),) = api(
+        (
+            "resume-analysis",
+            {"resume_text": "SKILLS\nPython, SQL", "job_description": "Python developer"},
+        )
+    )
+    assert code == 200
+    assert body["response"]
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,81 @@
+import pytest
+from ats_match import JobDescriptionIndex, MatchResult, normalize_token, tokenize
+
+JOB_DESCRIPTION = (
+    "We are looking for a Senior Data Engineer. Requirements: 5 years experience building pipelines "
+    "on AWS S3 and Spark, Kubernetes, Python."
+)
+
+
+def test_normalize_token_strips_plurals_but_not_names():
+    assert normalize_token("pipelines") == "pipeline"
+    assert normalize_token("technologies") == "technology"
+    assert normalize_token("class") == "class"
+    assert normalize_token("node.js.") == "node.js"
+    assert normalize_token("s3") == "s3"
+
+
+def test_tokenize_keeps_symbols_and_drops_stopwords():
+    assert tokenize("Experience with C++ and node.js") == [
+        "experience",
+        "c++",
+        "node.js",
+    ]
+
+
+def test_tokenize_builds_bigrams_within_phrases_only():
+    terms = tokenize("Machine learning, distributed systems")
+    assert "machine learning" in terms
+    assert "distributed system" in terms
+    assert "learning distributed" not in terms
+
+
+def test_match_scores_coverage_and_similarity():
+    index = JobDescriptionIndex(JOB_DESCRIPTION)
+    full = index.match(JOB_DESCRIPTION)
+    none = index.match("Pastry chef")
+    assert full.coverage == pytest.approx(1.0)
+    assert full.similarity > 0.99
+    assert none.coverage == 0.0
+    assert none.similarity == 0.0
+    assert full.score > none.score
+
+
+def test_match_leaves_generic_terms_out_of_keyword_lists():
+    result = JobDescriptionIndex(JOB_DESCRIPTION).match("Senior engineer with years of experience")
+    for term in ("looking", "requirement", "requirements", "experience", "years", "5 years"):
+        assert term not in result.matched
+        assert term not in result.missing
+    assert not any("experience" in term for term in result.missing)
+
+
+def test_match_leaves_out_bigrams_whose_words_are_matched():
+    result = JobDescriptionIndex(JOB_DESCRIPTION).match(
+        "Data engineer. Senior. Built Python pipelines with Spark on AWS; stored data in S3."
+    )
+    assert "aws" in result.matched
+    assert "s3" in result.matched
+    assert "aws s3" not in result.missing
+    assert "senior data" not in result.missing
+    assert "kubernetes" in result.missing
+
+
+def test_match_orders_keywords_by_weight():
+    index = JobDescriptionIndex("Python Python Python, Go")
+    assert index.match("").missing[0] == "python"
+
+
+def test_to_prompt_lists_terms_up_to_the_limit():
+    result = MatchResult(0.5, 0.25, ["python", "spark", "aws"], ["kubernetes"])
+    prompt = result.to_prompt(max_terms=2)
+    assert "Score: 42.5/100" in prompt
+    assert "keyword coverage: 50%" in prompt
+    assert "similarity: 0.25" in prompt
+    assert "Matched keywords: python, spark\n" in prompt
+    assert "Missing keywords: kubernetes\n" in prompt
+
+
+def test_to_prompt_reports_empty_lists():
+    prompt = MatchResult(0.0, 0.0, [], []).to_prompt(max_terms=5)
+    assert "Matched keywords: none" in prompt
+    assert "Missing keywords: none" in prompt
@@ -0,0 +1,13 @@
+import time
+
+from batch_screen import BatchScreener
+
+
+def test_analysis_thread_agents_do_not_grow_over_a_batch(coach):
+    screener = BatchScreener(coach, max_concurrent_llm=1)
+    for n in range(5):
+        record = {"file": f"resume{n}.pdf", "timings": {}, "_converted": time.perf_counter()}
+        screener._analyse(f"SKILLS\nPython {n}", "Python developer", None, record)
+        assert record["analysis"]
+        agent = screener._local.app.resume_analyzer
+        assert (len(agent.memory.runs), len(agent.memory.messages)) == (0, 0)
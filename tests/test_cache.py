@@ -0,0 +1,95 @@
+import threading
+import time
+from cache import DiskCache, ResponseCache, TTLCache, content_key, normalize_prompt
+
+
+def test_normalize_prompt_and_content_key():
+    assert normalize_prompt("  Data   Scientist ") == normalize_prompt("data scientist")
+    assert content_key("a", {"x": 1, "y": 2}) == content_key("a", {"y": 2, "x": 1})
+    assert content_key("a") != content_key("b")
+
+
+def test_disk_cache_round_trip_and_counters(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.get("missing") is None
+    cache.set("key", "välue")
+    assert cache.get("key") == "välue"
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == len("välue".encode("utf-8"))
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_disk_cache_entries_expire(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_cache_evicts_least_recently_used_beyond_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=25, touch_seconds=0)
+    cache.set("a", "x" * 10)
+    time.sleep(0.01)
+    cache.set("b", "x" * 10)
+    time.sleep(0.01)
+    assert cache.get("a") is not None
+    time.sleep(0.01)
+    cache.set("c", "x" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] <= 25
+
+
+def test_disk_cache_hits_only_write_after_touch_seconds(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100)
+    assert cache.touch_seconds == 10
+    cache.set("key", "value")
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        assert cache.get("key") == "value"
+    assert cache._conn.total_changes == changes
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set("key", "value")
+    assert DiskCache(path).get("key") == "value"
+
+
+def test_ttl_cache_evicts_by_entry_count_and_expires():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    expiring = TTLCache(ttl_seconds=0.01)
+    expiring.set("a", 1)
+    time.sleep(0.03)
+    assert expiring.get("a") is None
+
+
+def test_response_cache_counts_per_agent_across_threads(tmp_path):
+    cache = ResponseCache(DiskCache(str(tmp_path / "responses.sqlite3")), {"market_researcher": True})
+    key = ResponseCache.key("MarketResearcher", "llama3.2", {"description": "d"}, "Data Scientist")
+    assert key == ResponseCache.key("MarketResearcher", "llama3.2", {"description": "d"}, " data  scientist")
+    cache.set(key, "response")
+    threads = [
+        threading.Thread(target=lambda: [cache.get("market_researcher", key) for _ in range(50)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.get("market_researcher", "other")
+    stats = cache.stats()
+    assert stats["hits_by_agent"] == {"market_researcher": 200}
+    assert stats["misses_by_agent"] == {"market_researcher": 1}
+    assert cache.enabled_for("market_researcher")
+    assert not cache.enabled_for("resume_analyzer")
@@ -0,0 +1,75 @@
+def agent_memory_size(agent):
+    return len(agent.memory.runs), len(agent.memory.messages)
+
+
+def test_agent_memory_stays_flat_across_runs(coach):
+    app = coach.for_session("session")
+    for turn in range(5):
+        assert app.generate("interview_coach", f"Question {turn}?")
+        assert agent_memory_size(app.interview_coach) == (0, 0)
+
+
+def test_token_counts_are_read_before_the_memory_is_cleared(coach):
+    from telemetry import Span
+
+    app = coach.for_session("session")
+    span = Span(None, "generation", {})
+    chunks = list(
+        app._generate(app.interview_coach, "Question?", None, "interactive", None, span)
+    )
+    assert chunks
+    assert span.attributes["output_tokens"] == 20
+    assert span.attributes["input_tokens"] > 0
+    assert agent_memory_size(app.interview_coach) == (0, 0)
+
+
+def test_long_conversation_keeps_both_memories_bounded(coach):
+    from config import career_coach_memory
+    from memory import ConversationMemory
+
+    app = coach.for_session("session")
+    memory = ConversationMemory.from_config(career_coach_memory)
+    for turn in range(40):
+        memory.add("user", f"Turn {turn}: " + "how do I move into platform engineering? " * 20)
+        memory.add("assistant", app.generate("ask_career_coach", app.ask_prompt(memory)))
+        assert memory.tokens <= career_coach_memory["token_budget"]
+        assert agent_memory_size(app.ask_career_coach) == (0, 0)
+    assert memory.summary
+    assert len(memory.turns) < 40
+
+
+def test_runs_of_one_agent_are_serialized(coach):
+    import threading
+    import time
+
+    app = coach.for_session("session")
+    lock = threading.Lock()
+    running, peaks = {}, {}
+
+    def tracking_generator(agent, prompt):
+        with lock:
+            running[agent.name] = running.get(agent.name, 0) + 1
+            running["all"] = running.get("all", 0) + 1
+            for name in (agent.name, "all"):
+                peaks[name] = max(peaks.get(name, 0), running[name])
+        time.sleep(0.1)
+        yield from coach.response_generator(agent, prompt)
+        with lock:
+            running[agent.name] -= 1
+            running["all"] -= 1
+
+    app.response_generator = tracking_generator
+    requests = [
+        ("skills_developer", "Action plan for an analyst"),
+        ("skills_developer", "Learning plan for Kubernetes"),
+        ("market_researcher", "Job market for analysts"),
+    ]
+    threads = [
+        threading.Thread(target=app.generate, args=request) for request in requests
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peaks["SkillsDeveloper"] == 1
+    assert peaks["all"] == 2
@@ -0,0 +1,150 @@
+import threading
+import time
+import pytest
+from concurrency import RateLimiter, SingleFlight
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def start_follower(flight, target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    wait_until(lambda: flight.coalesced >= 1)
+    return thread
+
+
+def test_do_wakes_followers_with_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    wait_until(lambda: flight.stats()["in_flight"] == 1)
+    follower = start_follower(flight, lambda: results.append(flight.do("k", lambda: "other")))
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert results == ["value", "value"]
+    assert flight.stats() == {"calls": 1, "coalesced": 1, "in_flight": 0}
+
+
+def test_do_shares_the_leaders_error_and_forgets_the_key():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    wait_until(lambda: flight.stats()["in_flight"] == 1)
+    follower = start_follower(flight, call)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["boom", "boom"]
+    assert flight.do("k", lambda: "again") == "again"
+    assert flight.calls == 2
+
+
+def gated_stream(release, chunks, closed=None):
+    # Yields the first chunk at once and the others once released
+    try:
+        for index, chunk in enumerate(chunks):
+            if index:
+                assert release.wait(5)
+            yield chunk
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+def test_subscribe_followers_replay_the_leaders_chunks():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader, coalesced = flight.subscribe("k", lambda: gated_stream(release, ["a", "b", "c"]))
+    assert not coalesced
+    assert next(leader) == "a"
+    follower, coalesced = flight.subscribe("k", lambda: pytest.fail("factory called twice"))
+    assert coalesced
+    received = []
+    thread = threading.Thread(target=lambda: received.extend(follower))
+    thread.start()
+    release.set()
+    assert list(leader) == ["b", "c"]
+    thread.join(5)
+    assert received == ["a", "b", "c"]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_subscribe_leader_failure_reaches_followers():
+    flight = SingleFlight()
+
+    def broken():
+        yield "a"
+        raise RuntimeError("model failed")
+
+    leader, _ = flight.subscribe("k", broken)
+    assert next(leader) == "a"
+    follower, _ = flight.subscribe("k", broken)
+    with pytest.raises(RuntimeError):
+        next(leader)
+    assert next(follower) == "a"
+    with pytest.raises(RuntimeError, match="model failed"):
+        next(follower)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_subscribe_drains_for_followers_when_the_leader_stops_reading():
+    flight = SingleFlight()
+    release = threading.Event()
+    closed = threading.Event()
+    leader, _ = flight.subscribe("k", lambda: gated_stream(release, ["a", "b", "c"], closed))
+    assert next(leader) == "a"
+    follower, _ = flight.subscribe("k", None)
+    leader.close()
+    release.set()
+    assert list(follower) == ["a", "b", "c"]
+    assert closed.wait(5)
+    wait_until(lambda: flight.stats()["in_flight"] == 0)
+
+
+def test_subscribe_closes_the_stream_when_nobody_reads():
+    flight = SingleFlight()
+    release = threading.Event()
+    closed = threading.Event()
+    leader, _ = flight.subscribe("k", lambda: gated_stream(release, ["a", "b"], closed))
+    release.set()
+    assert next(leader) == "a"
+    leader.close()
+    assert closed.is_set()
+    assert flight.stats()["in_flight"] == 0
+    again, coalesced = flight.subscribe("k", lambda: iter(["x"]))
+    assert not coalesced
+    assert list(again) == ["x"]
+
+
+def test_rate_limiter_allows_a_burst_then_waits():
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.015
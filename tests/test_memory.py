@@ -0,0 +1,96 @@
+from memory import (
+    ConversationMemory,
+    estimate_tokens,
+    extractive_summarizer,
+    trim_history,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_render_appends_turns_to_a_stable_prefix():
+    memory = ConversationMemory(header="Interview for SRE.\n")
+    memory.add("assistant", "Tell me about yourself")
+    first = memory.render()
+    memory.add("user", "I run systems")
+    assert memory.render().startswith(first)
+    assert memory.render().endswith("assistant: Tell me about yourself\nuser: I run systems\n")
+    assert memory.tokens == estimate_tokens(memory._prefix) + estimate_tokens(memory._transcript)
+
+
+def test_compaction_folds_old_turns_into_the_summary():
+    memory = ConversationMemory(
+        token_budget=60, keep_recent_turns=2, summarizer=extractive_summarizer
+    )
+    for i in range(6):
+        memory.add("user", f"message number {i} " * 3)
+    assert len(memory.turns) <= 3
+    assert memory.turns[-1][1].startswith("message number 5")
+    assert "- user: message number 0" in memory.summary
+    assert "Summary of the earlier conversation" in memory.render()
+
+
+def test_compaction_without_a_summarizer_drops_old_turns():
+    memory = ConversationMemory(token_budget=40, keep_recent_turns=1)
+    for i in range(5):
+        memory.add("user", f"message number {i} " * 3)
+    assert memory.summary == ""
+    assert "message number 0" not in memory.render()
+    assert memory.turns[-1][1].startswith("message number 4")
+
+
+def test_summary_is_trimmed_to_its_budget():
+    memory = ConversationMemory(
+        token_budget=30,
+        keep_recent_turns=1,
+        summarizer=extractive_summarizer,
+        summary_token_budget=20,
+    )
+    for i in range(10):
+        memory.add("user", f"message number {i} " * 3)
+    assert estimate_tokens(memory.summary) <= 20
+    assert "message number 0" not in memory.summary
+
+
+def test_snapshot_and_restore_round_trip():
+    memory = ConversationMemory(
+        header="Header\n", token_budget=60, keep_recent_turns=2, summarizer=extractive_summarizer
+    )
+    for i in range(6):
+        memory.add("user" if i % 2 else "assistant", f"turn {i} " * 4)
+    snapshot = memory.snapshot()
+
+    restored = ConversationMemory(token_budget=60, keep_recent_turns=2, summarizer=extractive_summarizer)
+    restored.restore(snapshot)
+    assert restored.render() == memory.render()
+    assert restored.tokens == memory.tokens
+
+    memory.add("user", "a turn that is later undone")
+    memory.restore(snapshot)
+    assert restored.render() == memory.render()
+
+
+def test_snapshot_is_independent_of_later_turns():
+    memory = ConversationMemory()
+    memory.add("user", "hello")
+    snapshot = memory.snapshot()
+    memory.add("assistant", "hi")
+    assert snapshot["turns"] == [("user", "hello")]
+
+
+def test_clear_keeps_the_header():
+    memory = ConversationMemory(header="Header\n")
+    memory.add("user", "hello")
+    memory.clear()
+    assert memory.turns == []
+    assert memory.render() == "Header\nHere is the conversation so far:\n"
+
+
+def test_trim_history_drops_oldest_messages():
+    messages = [{"role": "user", "content": "x" * 10} for _ in range(5)]
+    assert trim_history(messages, max_messages=4, max_chars=25) == 3
+    assert len(messages) == 2
@@ -0,0 +1,115 @@
+import pytest
+
+from benchmarks.mock_ollama import MockOllamaServer
+from model_backends import EndpointPool, pooled_ollama
+
+
+@pytest.fixture
+def servers():
+    """
+    Two mock Ollama servers, stopped after the test (stopping one twice is harmless).
+    """
+    started = [
+        MockOllamaServer(output_tokens=5, tokens_per_second=2000, latency_seconds=0).start()
+        for _ in range(2)
+    ]
+    yield started
+    for server in started:
+        server.stop()
+
+
+def user_message():
+    from agno.models.message import Message
+
+    return [Message(role="user", content="Hello")]
+
+
+def requests(pool):
+    return [stats["requests"] for stats in pool.stats().values()]
+
+
+def failures(pool):
+    return [stats["failures"] for stats in pool.stats().values()]
+
+
+def test_acquire_picks_the_endpoint_with_the_fewest_requests_in_flight():
+    pool = EndpointPool(["http://a:1", "http://b:1"], health_check_seconds=0)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.host, second.host} == {"http://a:1", "http://b:1"}
+    pool.release(first, 0.1)
+    assert pool.acquire() is first
+    assert pool.acquire(exclude=pool.endpoints) is None
+
+
+def test_pinned_endpoint_is_used_while_healthy():
+    pool = EndpointPool(["http://a:1", "http://b:1"], health_check_seconds=0, failure_threshold=2)
+    pinned, other = pool.endpoints
+    for _ in range(3):
+        assert pool.acquire(["http://a:1"]) is pinned
+    assert pinned.outstanding == 3
+    for _ in range(2):
+        pool.release(pinned, 0.1, ConnectionError("refused"))
+    assert not pinned.healthy
+    assert pool.acquire(["http://a:1"]) is other
+
+
+def test_unhealthy_endpoints_are_still_tried_when_none_is_healthy():
+    pool = EndpointPool(["http://a:1"], health_check_seconds=0, failure_threshold=1)
+    (endpoint,) = pool.endpoints
+    pool.release(pool.acquire(), 0.1, ConnectionError("refused"))
+    assert not endpoint.healthy
+    assert pool.acquire() is endpoint
+
+
+def test_invoke_fails_over_and_the_pin_moves(servers):
+    first, second = servers
+    pool = EndpointPool([first.url, second.url], health_check_seconds=0, failure_threshold=2)
+    model = pooled_ollama(pool, id="llama3.2", preferred_hosts=[first.url])
+    first.stop()
+    for expected in ([0, 1], [0, 2]):
+        assert model.invoke(user_message())
+        assert requests(pool) == expected
+    assert failures(pool) == [2, 0]
+    assert not pool.endpoints[0].healthy
+
+    # The pinned endpoint is out of rotation, so it is no longer tried first
+    assert model.invoke(user_message())
+    assert requests(pool) == [0, 3]
+    assert failures(pool) == [2, 0]
+
+
+def test_invoke_stream_fails_over_before_the_first_chunk(servers):
+    first, second = servers
+    pool = EndpointPool([first.url, second.url], health_check_seconds=0)
+    model = pooled_ollama(pool, id="llama3.2", preferred_hosts=[first.url])
+    first.stop()
+    chunks = list(model.invoke_stream(user_message()))
+    assert chunks
+    assert requests(pool) == [0, 1]
+    assert failures(pool) == [1, 0]
+    assert all(stats["outstanding"] == 0 for stats in pool.stats().values())
+
+
+def test_invoke_raises_when_every_endpoint_is_down(servers):
+    for server in servers:
+        server.stop()
+    pool = EndpointPool([server.url for server in servers], health_check_seconds=0)
+    model = pooled_ollama(pool, id="llama3.2")
+    with pytest.raises(Exception):
+        model.invoke(user_message())
+    assert failures(pool) == [1, 1]
+
+
+def test_health_check_takes_an_endpoint_out_and_brings_it_back(servers):
+    first, second = servers
+    pool = EndpointPool([first.url, second.url], health_check_seconds=0)
+    host, port = first._server.server_address[:2]
+    first.stop()
+    first_url, second_url = [endpoint.url for endpoint in pool.endpoints]
+    assert pool.check_health() == {first_url: False, second_url: True}
+    assert not pool.endpoints[0].healthy
+
+    servers.append(MockOllamaServer(host=host, port=port).start())
+    assert all(pool.check_health().values())
+    assert pool.endpoints[0].healthy
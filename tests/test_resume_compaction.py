@@ -0,0 +1,129 @@
+from memory import estimate_tokens
+from resume_compaction import (
+    clean_lines,
+    compact_job_description,
+    compact_text,
+    is_heading,
+    split_sections,
+)
+
+RESUME = """Jane Doe
+jane@example.com
+Page 1 of 2
+SUMMARY
+Backend engineer focused on data platforms.
+WORK EXPERIENCE
+Senior Software Engineer
+Acme Corp, 2020-2024
+- Built Spark pipelines on AWS
+Senior Software Engineer
+Globex, 2016-2020
+- Built Spark pipelines on AWS
+Page 2 of 2
+EDUCATION
+BSc Computer Science, 2016
+HOBBIES
+Chess, hiking and photography
+References available upon request
+"""
+
+
+def test_clean_lines_removes_artifacts_and_boilerplate():
+    lines, removed = clean_lines("Jane GLYPH<c=1,font=/X> Doe\n\n<!-- image -->\n12\nResume\nPython")
+    assert lines == ["Jane Doe", "Python"]
+    assert removed == 3
+
+
+def test_clean_lines_keeps_lines_repeated_fewer_than_three_times():
+    lines, removed = clean_lines(RESUME)
+    assert lines.count("Senior Software Engineer") == 2
+    assert lines.count("- Built Spark pipelines on AWS") == 2
+    assert "Globex, 2016-2020" in lines
+    assert removed == 3
+
+
+def test_clean_lines_drops_repeated_page_headers():
+    text = "\n".join(f"Jane Doe - Resume\ncontent of page {page}" for page in range(1, 4))
+    lines, removed = clean_lines(text)
+    assert lines.count("Jane Doe - Resume") == 1
+    assert removed == 2
+
+
+def test_is_heading():
+    assert is_heading("WORK EXPERIENCE")
+    assert is_heading("Skills:")
+    assert is_heading("## Projects")
+    assert is_heading("About us")
+    assert not is_heading("Built Spark pipelines on AWS")
+    assert not is_heading("Skills and more skills, obviously.")
+
+
+def test_all_caps_lines_are_headings_only_with_a_section_word():
+    assert is_heading("PROFESSIONAL EXPERIENCE")
+    assert is_heading("CERTIFICATIONS & LICENSES")
+    assert not is_heading("JANE DOE")
+    assert not is_heading("PYTHON, SQL")
+
+
+def test_compact_text_keeps_a_name_in_all_caps_or_as_a_heading():
+    for name in ("JANE DOE", "# Jane Doe"):
+        result = compact_text(f"{name}\nSUMMARY\nBackend engineer.\nSKILLS\nPYTHON, SQL", 10_000)
+        assert result.text.startswith(name + "\nSUMMARY\n")
+        assert "PYTHON, SQL" in result.text
+
+
+def test_split_sections_keeps_the_contact_block_untitled():
+    lines, _ = clean_lines(RESUME)
+    sections = split_sections(lines)
+    assert [s.title for s in sections] == ["", "SUMMARY", "WORK EXPERIENCE", "EDUCATION", "HOBBIES"]
+    assert sections[0].lines == ["Jane Doe", "jane@example.com"]
+    assert sections[2].priority > sections[4].priority
+
+
+def test_compact_text_within_budget_only_cleans():
+    result = compact_text(RESUME, token_budget=10_000)
+    assert result.sections_dropped == []
+    assert "Globex, 2016-2020" in result.text
+    assert "References" not in result.text
+    assert result.tokens_after < result.tokens_before
+
+
+def test_compact_text_drops_the_least_relevant_sections_first():
+    result = compact_text(RESUME, token_budget=76)
+    assert estimate_tokens(result.text) <= 76
+    assert result.sections_kept == ["", "SUMMARY", "WORK EXPERIENCE", "EDUCATION"]
+    assert result.sections_dropped == ["HOBBIES"]
+    assert result.text.startswith("Jane Doe\n")
+
+
+def test_compact_text_ranks_sections_against_the_job_description():
+    text = "Jane Doe\nSKILLS\nPython, Spark, Kubernetes\nPROJECTS\nWood carving and pottery"
+    result = compact_text(text, token_budget=14, job_description="Kubernetes and Spark engineer")
+    assert result.sections_kept == ["", "SKILLS"]
+    assert result.sections_dropped == ["PROJECTS"]
+
+
+def test_compact_job_description_shortens_a_long_section_to_the_budget():
+    job_description = (
+        "Data Engineer\nREQUIREMENTS\n"
+        + "\n".join(f"- Experience with tool number {i} in production" for i in range(300))
+        + "\nWe are an equal opportunity employer."
+    )
+    result = compact_job_description(job_description)
+    assert "equal opportunity" not in result.text
+    assert result.sections_shortened == ["REQUIREMENTS"]
+    assert result.text.startswith("Data Engineer\nREQUIREMENTS\n- Experience with tool number 0 ")
+    assert result.tokens_after <= 800
+    assert result.to_dict()["ratio"] < 0.5
+
+
+def test_shortened_section_keeps_the_start_of_a_long_paragraph():
+    paragraph = " ".join(
+        f"Sentence {i} describes a backend platform I built and ran." for i in range(60)
+    )
+    text = f"Jane Doe\nSUMMARY\n{paragraph}"
+    result = compact_text(text, token_budget=100)
+    assert result.sections_shortened == ["SUMMARY"]
+    assert result.text.startswith("Jane Doe\nSUMMARY\nSentence 0 describes")
+    assert result.text.endswith("I built and ran.")
+    assert estimate_tokens(result.text) <= 100
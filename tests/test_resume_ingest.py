@@ -0,0 +1,89 @@
+import pytest
+
+from benchmarks.stubs import make_docx, make_pdf
+from cache import DiskCache
+from resume_ingest import DIRECT_TIER, ResumeIngestor, extract_docx_text, page_text_ok
+
+LINE = "Senior backend engineer building data platforms on AWS"
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """
+    An in-process ingestor whose docling tiers are stubbed: `ingestor.outputs` maps each tier to the text it
+    returns and `ingestor.calls` records the (tier, page_range) of every conversion.
+    """
+    ingestor = ResumeIngestor(DiskCache(str(tmp_path / "resumes.sqlite3")))
+    ingestor.outputs = {}
+    ingestor.calls = []
+
+    def run_docling(data, filename, page_range=None, tier=None):
+        ingestor.calls.append((tier, page_range))
+        return ingestor.outputs.get(tier, "")
+
+    ingestor._run_docling = run_docling
+    return ingestor
+
+
+def pdf(*pages):
+    # One PDF page per argument, each with three lines (an empty page has none)
+    return make_pdf("\n".join(line for page in pages for line in (page or ["", "", ""])), 3)
+
+
+def test_page_text_ok():
+    assert page_text_ok(LINE)
+    assert not page_text_ok("Jane Doe")
+    assert page_text_ok("Jane Doe", min_chars=5)
+    assert not page_text_ok("(cid:12)(cid:13)(cid:14) " + LINE)
+    assert not page_text_ok("�" * 10 + LINE)
+
+
+def test_extract_docx_text():
+    assert extract_docx_text(make_docx("Jane Doe\n\nPython, SQL")) == "Jane Doe\nPython, SQL"
+    assert extract_docx_text(b"not a zip file") is None
+    assert extract_docx_text(make_pdf("Jane Doe")) is None
+
+
+def test_iter_pages_reads_a_born_digital_pdf_directly(ingestor):
+    pages = list(ingestor.iter_pages(pdf([LINE] * 3, [LINE] * 3), "resume.pdf"))
+    assert [(number, count, tier) for number, count, _, tier in pages] == [
+        (1, 2, DIRECT_TIER),
+        (2, 2, DIRECT_TIER),
+    ]
+    assert LINE in pages[0][2]
+    assert ingestor.calls == []
+
+
+def test_iter_pages_escalates_a_poor_page_through_the_tiers(ingestor):
+    ingestor.outputs = {"ocr": "Scanned page: " + LINE}
+    pages = list(ingestor.iter_pages(pdf([LINE] * 3, None, [LINE] * 3), "resume.pdf"))
+    assert [tier for _, _, _, tier in pages] == [DIRECT_TIER, "ocr", DIRECT_TIER]
+    assert pages[1][2] == "Scanned page: " + LINE
+    assert ingestor.calls == [("layout", (2, 2)), ("ocr", (2, 2))]
+    stats = ingestor.stats()["tiers"]
+    assert (stats[DIRECT_TIER]["attempts"], stats[DIRECT_TIER]["accepted"]) == (3, 2)
+    assert (stats["layout"]["attempts"], stats["layout"]["accepted"]) == (1, 0)
+    assert (stats["ocr"]["attempts"], stats["ocr"]["accepted"]) == (1, 1)
+
+
+def test_iter_pages_escalates_a_mostly_unreadable_document_at_once(ingestor):
+    ingestor.outputs = {"layout": LINE}
+    pages = list(ingestor.iter_pages(pdf(None, None, [LINE] * 3), "scan.pdf"))
+    assert pages == [(3, 3, LINE, "layout")]
+    assert ingestor.calls == [("layout", None)]
+
+
+def test_documents_the_direct_tier_cannot_read_only_use_the_first_docling_tier(ingestor):
+    pages = list(ingestor.iter_pages(b"\xd0\xcf\x11\xe0 legacy word file", "resume.doc"))
+    assert pages == [(1, 1, "", "layout")]
+    assert ingestor.calls == [("layout", None)]
+
+
+def test_ingest_counts_memory_and_disk_hits(ingestor):
+    data = make_docx(LINE)
+    assert ingestor.ingest(data, "resume.docx") == LINE
+    assert ingestor.ingest(data, "resume.docx") == LINE
+    second = ResumeIngestor(ingestor.store)
+    assert second.ingest(data, "resume.docx") == LINE
+    assert (ingestor.conversions, ingestor.memory_hits) == (1, 1)
+    assert (second.conversions, second.disk_hits) == (0, 1)
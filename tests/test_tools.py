@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from config import search_settings
+
+
+class FakeBackend:
+    """
+    A search backend that answers from memory, fails queries containing "fail" and can be held on a gate.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def search(self, query, num_results):
+        self.calls.append(query)
+        self.entered.set()
+        self.gate.wait(5)
+        if "fail" in query:
+            raise RuntimeError(f"backend down for {query}")
+        # Earlier queries of a batch take longer, so they finish last
+        time.sleep(0.1 / len(self.calls))
+        return [{"title": query, "snippet": "", "link": f"https://example.com/{len(self.calls)}"}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """
+    The shared search service, rebuilt with an in-memory cache, no rate limit and a FakeBackend.
+    """
+    import tools
+
+    monkeypatch.setattr(tools, "_service", None)
+    monkeypatch.setitem(search_settings, "cache_path", None)
+    monkeypatch.setitem(search_settings, "cache_ttl_seconds", 0.2)
+    monkeypatch.setitem(search_settings, "rate_per_second", None)
+    tools.set_search_backend(FakeBackend())
+    return tools.get_search_service()
+
+
+def test_results_are_cached_until_their_ttl(service):
+    first = service.search("Data Engineer salary")
+    assert service.search("  data engineer   SALARY ") == first
+    assert service.backend.calls == ["Data Engineer salary"]
+    assert service.search("Data Engineer salary", num_results=3) != first
+    time.sleep(0.3)
+    assert service.search("Data Engineer salary") != first
+    assert len(service.backend.calls) == 3
+
+
+def test_identical_concurrent_queries_share_one_backend_call(service):
+    service.backend.gate.clear()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.search("SRE skills")))
+        for _ in range(3)
+    ]
+    threads[0].start()
+    assert service.backend.entered.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while service.stats()["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.backend.gate.set()
+    for thread in threads:
+        thread.join()
+    assert service.backend.calls == ["SRE skills"]
+    assert len(results) == 3 and results[0] == results[1] == results[2]
+    assert service.stats()["coalesced"] == 2
+
+
+def test_search_many_keeps_input_order_and_isolates_errors(service):
+    queries = ["first", "second fails", "third", "fourth"]
+    batch = service.search_many(queries)
+    assert [entry["query"] for entry in batch] == queries
+    assert [entry["results"][0]["title"] for entry in batch if not entry["error"]] == [
+        "first",
+        "third",
+        "fourth",
+    ]
+    assert batch[1]["results"] == []
+    assert batch[1]["error"] == "backend down for second fails"
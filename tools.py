@@ -1,11 +1,249 @@
+import contextvars
+import json
 import logging
-from duckduckgo_search import DDGS
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cache import DiskCache, TTLCache, content_key, normalize_prompt
+from concurrency import RateLimiter, SingleFlight
+from config import search_settings
+from telemetry import span
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(module)s - %(asctime)s - %(levelname)s - %(funcName)s - %(lineno)d - %(message)s",
-    filename="career_coach_log.log",
-)
+
+class DDGSBackend:
+    """
+    A search backend that queries DuckDuckGo through a pool of long-lived DDGS sessions.
+
+    Each DDGS object keeps its own HTTP client (connection pool and cookies). Sessions are checked out
+    of a pool for the duration of a query instead of being created per query, which avoids repeated
+    connection set-up and keeps concurrent queries from sharing one non-thread-safe session.
+
+    Any object with a `search(query, num_results)` method returning a list of result dictionaries can be
+    used in place of this backend (e.g., a local fake in tests and benchmarks).
+    """
+
+    def __init__(self, pool_size=4, timeout=10):
+        """
+        Initializes the backend. Sessions are created lazily, up to `pool_size` of them.
+
+        Parameters:
+            pool_size (int): Maximum number of DDGS sessions (default is 4).
+            timeout (int): HTTP timeout of each session in seconds (default is 10).
+        """
+        self.timeout = timeout
+        self._sessions = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def search(self, query, num_results):
+        """
+        Queries DuckDuckGo and formats the results.
+
+        Parameters:
+            query (str): The search term.
+            num_results (int): The maximum number of results to retrieve.
+
+        Returns:
+            list: A list of dictionaries with "title", "snippet" and "link" keys.
+        """
+        with self._slots:
+            try:
+                ddgs = self._sessions.get_nowait()
+            except queue.Empty:
+                from duckduckgo_search import DDGS
+
+                ddgs = DDGS(timeout=self.timeout)
+            results = ddgs.text(query, max_results=num_results)
+            # A session that raised above is dropped; healthy ones go back to the pool.
+            self._sessions.put(ddgs)
+        return [
+            {"title": r["title"], "snippet": r["body"], "link": r["href"]}
+            for r in results
+        ]
+
+
+class SearchService:
+    """
+    Caches, de-duplicates and measures the queries sent to a search backend.
+
+    Results are cached for a time-to-live, keyed on the normalized query and the number of results.
+    Concurrent requests for the same key share a single backend call, and backend calls are rate limited.
+    Batches of queries run concurrently on a bounded thread pool.
+
+    Attributes:
+        backend: The object performing the actual searches.
+        cache (TTLCache): Cache of serialized search results.
+        max_concurrency (int): Maximum number of queries of a batch running at once.
+        rate_limiter (RateLimiter): Limits how often the backend is called.
+    """
+
+    def __init__(self, backend, cache, max_concurrency=4, rate_limiter=None):
+        """
+        Initializes the service.
+
+        Parameters:
+            backend: Any object with a `search(query, num_results)` method.
+            cache: A cache with `get`/`set`/`stats` methods (e.g., TTLCache or DiskCache).
+            max_concurrency (int): Maximum number of queries of a batch running at once (default is 4).
+            rate_limiter (RateLimiter, optional): Limits how often the backend is called.
+        """
+        self.backend = backend
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter(None)
+        self._executor = None
+        self._flights = SingleFlight()
+        self._latencies = deque(maxlen=1024)
+        self._lock = threading.Lock()
+
+    def search(self, query, num_results=5):
+        """
+        Returns search results, from the cache when possible. Each call is recorded as a "search" span.
+
+        Parameters:
+            query (str): The search term.
+            num_results (int): The maximum number of results to retrieve (default is 5).
+
+        Returns:
+            list: A list of dictionaries with "title", "snippet" and "link" keys.
+        """
+        key = content_key("search", normalize_prompt(query), num_results)
+        with span("search", num_results=num_results) as search_span:
+            cached = self.cache.get(key)
+            search_span.set(cached=cached is not None)
+            if cached is not None:
+                logging.debug("Search cache hit for %r", query)
+                return json.loads(cached)
+            return json.loads(
+                self._flights.do(key, lambda: self._fetch(key, query, num_results))
+            )
+
+    def search_many(self, queries, num_results=5):
+        """
+        Runs several searches concurrently and returns their results in input order.
+
+        A failing query does not affect the others; its error is reported in its own entry.
+
+        Parameters:
+            queries (list): The search terms.
+            num_results (int): The maximum number of results per query (default is 5).
+
+        Returns:
+            list: One dictionary per query with "query", "results" and "error" keys.
+        """
+        futures = [
+            self._get_executor().submit(
+                contextvars.copy_context().run, self.search, query, num_results
+            )
+            for query in queries
+        ]
+        batch = []
+        for query, future in zip(queries, futures):
+            try:
+                batch.append({"query": query, "results": future.result(), "error": None})
+            except Exception as e:
+                logging.warning("Search for %r failed: %s", query, e)
+                batch.append({"query": query, "results": [], "error": str(e)})
+        return batch
+
+    def stats(self):
+        """
+        Returns latency, cache and coalescing statistics.
+
+        Returns:
+            dict: Backend call count and latency percentiles, cache statistics and coalesced calls.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        stats = {
+            "backend_calls": len(latencies),
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p95": _percentile(latencies, 0.95),
+            "cache": self.cache.stats(),
+        }
+        stats.update(self._flights.stats())
+        return stats
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="search"
+                )
+            return self._executor
+
+    def _fetch(self, key, query, num_results):
+        self.rate_limiter.acquire()
+        start = time.perf_counter()
+        results = self.backend.search(query, num_results)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+        logging.debug("Found %d results for %r in %.2fs", len(results), query, elapsed)
+        payload = json.dumps(results)
+        self.cache.set(key, payload)
+        return payload
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_search_service():
+    """
+    Returns the process-wide SearchService, creating it with the DuckDuckGo backend on first use.
+
+    Results are cached on disk when `search_settings["cache_path"]` is set, so every process of a
+    deployment shares them, and in memory otherwise.
+
+    Returns:
+        SearchService: The shared search service.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            if search_settings.get("cache_path"):
+                cache = DiskCache(
+                    search_settings["cache_path"],
+                    ttl_seconds=search_settings["cache_ttl_seconds"],
+                    max_bytes=search_settings.get("cache_max_bytes"),
+                )
+            else:
+                cache = TTLCache(
+                    ttl_seconds=search_settings["cache_ttl_seconds"],
+                    max_entries=search_settings["cache_max_entries"],
+                )
+            _service = SearchService(
+                DDGSBackend(
+                    pool_size=search_settings["pool_size"],
+                    timeout=search_settings["timeout_seconds"],
+                ),
+                cache,
+                max_concurrency=search_settings["max_concurrency"],
+                rate_limiter=RateLimiter(
+                    search_settings["rate_per_second"], search_settings["rate_burst"]
+                ),
+            )
+        return _service
+
+
+def set_search_backend(backend):
+    """
+    Replaces the backend of the shared search service (e.g., with a local fake for tests or benchmarks).
+
+    Parameters:
+        backend: Any object with a `search(query, num_results)` method.
+    """
+    service = get_search_service()
+    service.backend = backend
+    service.cache.clear()
 
 
 class DuckDuckGoTools:
@@ -14,14 +252,25 @@ class DuckDuckGoTools:
 
     This class provides methods to query the web and retrieve search results in a structured format.
     It is designed to be used as a tool by agents or other components of the application to fetch external data.
+    Queries go through a shared SearchService, which caches results and reuses DuckDuckGo sessions.
 
     Attributes:
-        None
+        service (SearchService): The search service used for queries.
 
     Methods:
         search_web(query, num_results): Searches the web using DuckDuckGo and returns a list of results.
+        search_many(queries, num_results): Runs several searches concurrently and returns all results.
     """
 
+    def __init__(self, service=None):
+        """
+        Initializes the tools.
+
+        Parameters:
+            service (SearchService, optional): The search service to use (default is the shared service).
+        """
+        self.service = service or get_search_service()
+
     def search_web(self, query: str, num_results: int = 5) -> list:
         """
         Searches the web using DuckDuckGo and retrieves a specified number of results.
@@ -39,11 +288,25 @@ class DuckDuckGoTools:
                 - "snippet": A brief description of the search result.
                 - "link": The URL of the search result.
         """
-        logging.debug(f"Searching for '{query}' with DuckDuckGo...")
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=num_results))
-        logging.debug(f"Found {len(results)} results for '{query}'")
-        return [
-            {"title": r["title"], "snippet": r["body"], "link": r["link"]}
-            for r in results
-        ]
+        logging.debug("Searching for %r with DuckDuckGo...", query)
+        return self.service.search(query, num_results)
+
+    def search_many(self, queries: list[str], num_results: int = 5) -> list:
+        """
+        Searches the web for several queries at once and returns the results in the same order.
+
+        Use this instead of repeated search_web calls when several facts are needed (e.g., salaries, skills
+        and demand for a role): the queries run concurrently, so the batch costs about one round trip.
+
+        Parameters:
+            queries (list[str]): The search terms or questions to query on DuckDuckGo.
+            num_results (int): The maximum number of results per query (default is 5).
+
+        Returns:
+            list: A list of dictionaries, one per query, where each dictionary contains:
+                - "query": The search term.
+                - "results": The search results, in the same format as search_web.
+                - "error": The error message if the search failed, otherwise None.
+        """
+        logging.debug("Searching for %d queries with DuckDuckGo...", len(queries))
+        return self.service.search_many(queries, num_results)
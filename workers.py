@@ -0,0 +1,138 @@
+"""
+Worker processes for CPU-bound work.
+
+Document conversion holds the GIL for seconds at a time, so in a single server process one upload stalls
+every other session. With `deployment_settings["worker_processes"]` set, such work is sent to a pool of
+worker processes instead and runs on all cores. The workers are started with "spawn", so they never
+inherit the server's threads, sockets or SQLite connections; results they cache go through the shared
+on-disk caches. Server processes forked from one parent (the API server's --workers) split the worker
+processes between them (see `share_worker_processes`).
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import deployment_settings
+
+
+class WorkerPool:
+    """
+    A lazily started process pool that replaces itself if a worker dies.
+
+    Attributes:
+        processes (int): Number of worker processes.
+        tasks (int): Tasks completed.
+        failures (int): Tasks lost because a worker process died.
+    """
+
+    def __init__(self, processes):
+        """
+        Initializes the pool; the processes start with the first task.
+
+        Parameters:
+            processes (int): Number of worker processes.
+        """
+        self.processes = processes
+        self.tasks = 0
+        self.failures = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args):
+        """
+        Runs a function in a worker process and waits for its result.
+
+        Parameters:
+            fn (callable): A module-level function (it is pickled by reference).
+            *args: Its picklable arguments.
+
+        Returns:
+            Any: The function's result.
+
+        Raises:
+            BrokenProcessPool: If the worker died (e.g., it ran out of memory); the next call gets a new pool.
+        """
+        executor = self._get_executor()
+        try:
+            result = executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            with self._lock:
+                self.failures += 1
+                if self._executor is executor:
+                    self._executor = None
+            logging.error("A worker process died running %s; restarting the pool", fn.__name__)
+            executor.shutdown(wait=False)
+            raise
+        with self._lock:
+            self.tasks += 1
+        return result
+
+    def stats(self):
+        """
+        Returns the pool's counters.
+
+        Returns:
+            dict: Number of processes, completed tasks and failures.
+        """
+        with self._lock:
+            return {"processes": self.processes, "tasks": self.tasks, "failures": self.failures}
+
+    def shutdown(self):
+        """
+        Stops the worker processes.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                logging.info("Starting %d worker processes", self.processes)
+                self._executor = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_server_processes = 1
+
+
+def share_worker_processes(server_processes):
+    """
+    Splits the worker processes between several forked server processes, each of which has its own pool.
+
+    Call it in every forked server process before the pool is first used.
+
+    Parameters:
+        server_processes (int): Number of server processes sharing the host.
+    """
+    global _server_processes
+    with _pool_lock:
+        _server_processes = max(1, server_processes)
+
+
+def get_worker_pool():
+    """
+    Returns the process-wide WorkerPool, or None if work runs in the calling process.
+
+    Returns:
+        WorkerPool: The pool sized by `deployment_settings["worker_processes"]` (None there means one process
+            per core), divided between the server processes sharing the host, or None if it is 0.
+    """
+    global _pool
+    processes = deployment_settings["worker_processes"]
+    # Worker processes (this pool's or batch screening's) do their work themselves
+    if processes == 0 or multiprocessing.parent_process() is not None:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            total = processes or os.cpu_count() or 1
+            _pool = WorkerPool(max(1, total // _server_processes))
+        return _pool